@@ -0,0 +1,170 @@
+"""Benchmark the cost of executing the network as circuits grow.
+
+Used in the Logic Simulator project to check that the time taken by one
+simulation cycle grows linearly with the number of devices, so that the
+per-gate cost stays flat from small to very large circuits.
+
+Usage
+-----
+Run from the directory containing logsim.py:
+python -m benchmarks.benchmark_network [-c] [-v] [-e] [-l] [-i] [number of gates ...]
+
+Options
+-------
+-c: also time the network lowered into flat arrays (compiled mode).
+-v: also time the compiled network with the gates executed by NumPy
+    (vectorized mode).
+-e: also time event-driven execution, which only executes the devices whose
+    inputs changed (event-driven mode).
+-l: also time execution of the gates in levelized order (levelized mode).
+-i: instead of timing, report the iterations saved in every cycle by the
+    levelized order on a clocked circuit.
+"""
+import getopt
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def build_circuit(gates: int, seed: int = 0) -> Tuple[Names, Devices, Network]:
+    """Build a random combinational circuit with the given number of gates.
+
+    Every gate is a two-input NAND gate whose inputs are driven by switches
+    or by gates defined before it, so the circuit is free of loops.
+    """
+    rng = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [I1, I2] = names.lookup(["I1", "I2"])
+
+    switch_ids = names.lookup(["SW" + str(number) for number in range(16)])
+    for switch_id in switch_ids:
+        devices.make_device(switch_id, devices.SWITCH, rng.choice([0, 1]))
+
+    driver_ids = list(switch_ids)
+    gate_ids = names.lookup(["G" + str(number) for number in range(gates)])
+    for gate_id in gate_ids:
+        devices.make_device(gate_id, devices.NAND, 2)
+        for input_id in [I1, I2]:
+            network.make_connection(rng.choice(driver_ids), None, gate_id, input_id)
+        driver_ids.append(gate_id)
+
+    return names, devices, network
+
+
+def build_clocked_circuit(gates: int, seed: int = 0) -> Tuple[Names, Devices, Network]:
+    """Build a random clocked circuit with the given number of gates.
+
+    Eight D-types are clocked by one clock, and their data inputs are driven
+    by a loop-free circuit of two-input NAND gates fed by the clock, switches
+    and D-type outputs. Gates are defined in a random order, as they may be in
+    a definition file.
+    """
+    rng = random.Random(seed)
+    names = Names()
+    devices = Devices(names, seed)
+    network = Network(names, devices)
+    [I1, I2, CLK1] = names.lookup(["I1", "I2", "CLK1"])
+
+    devices.make_device(CLK1, devices.CLOCK, 2)
+    switch_ids = names.lookup(["SW" + str(number) for number in range(8)])
+    for switch_id in switch_ids:
+        devices.make_device(switch_id, devices.SWITCH, rng.choice([0, 1]))
+    dtype_ids = names.lookup(["DT" + str(number) for number in range(8)])
+    for dtype_id in dtype_ids:
+        devices.make_device(dtype_id, devices.D_TYPE)
+
+    gate_ids = names.lookup(["G" + str(number) for number in range(gates)])
+    for gate_id in rng.sample(gate_ids, gates):
+        devices.make_device(gate_id, devices.NAND, 2)
+
+    drivers = [(CLK1, None)] + [(switch_id, None) for switch_id in switch_ids]
+    drivers += [(dtype_id, port_id) for dtype_id in dtype_ids
+                for port_id in [devices.Q_ID, devices.QBAR_ID]]
+    for gate_id in gate_ids:
+        for input_id in [I1, I2]:
+            network.make_connection(*rng.choice(drivers), gate_id, input_id)
+        drivers.append((gate_id, None))
+    for dtype_id in dtype_ids:
+        network.make_connection(CLK1, None, dtype_id, devices.CLK_ID)
+        network.make_connection(switch_ids[0], None, dtype_id, devices.SET_ID)
+        network.make_connection(switch_ids[0], None, dtype_id, devices.CLEAR_ID)
+        network.make_connection(rng.choice(gate_ids), None, dtype_id, devices.DATA_ID)
+    devices.set_switch(switch_ids[0], devices.LOW)
+
+    devices.cold_startup()
+    return names, devices, network
+
+
+def report_iterations(gates: int, cycles: int) -> None:
+    """Print the iterations taken by every cycle with and without levelized order."""
+    __, __, network = build_clocked_circuit(gates)
+    network.set_levelized_mode(count_saved_iterations=True)
+
+    print(f"{'cycle':>6} {'interpreted':>12} {'levelized':>10} {'saved':>6}")
+    total_saved = 0
+    for cycle in range(cycles):
+        if not network.execute_network():
+            print(f"{cycle:>6} circuit does not settle")
+            continue
+        saved = network.iterations_saved
+        total_saved += saved
+        print(f"{cycle:>6} {network.iterations + saved:>12} {network.iterations:>10} {saved:>6}")
+    print(f"{gates} gates: {total_saved / cycles:.2f} iterations saved per cycle")
+
+
+def time_cycles(network: Network, cycles: int) -> float:
+    """Return the mean wall-clock time in seconds of one simulation cycle."""
+    network.execute_network()  # settle the circuit from its initial state
+    start = time.perf_counter()
+    for _ in range(cycles):
+        if not network.execute_network():
+            raise RuntimeError("Benchmark circuit oscillates")
+    return (time.perf_counter() - start) / cycles
+
+
+# {option: execution mode timed as well as the interpreted one}
+MODE_OPTIONS = {"-c": "compiled", "-v": "vectorized", "-e": "event-driven", "-l": "levelized"}
+
+
+def time_mode(mode: str, gates: int) -> None:
+    """Print the per-cycle and per-gate cost of the circuit of the given size in the given mode."""
+    start = time.perf_counter()
+    names, devices, network = build_circuit(gates)
+    network.set_compiled_mode(mode in ["compiled", "vectorized"], mode == "vectorized")
+    network.set_event_driven_mode(mode == "event-driven")
+    network.set_levelized_mode(mode == "levelized")
+    build_time = time.perf_counter() - start
+
+    cycles = max(1, 100000 // gates)
+    cycle_time = time_cycles(network, cycles)
+    print(f"{mode:>12} {gates:>10} {build_time:>12.3f} {cycle_time * 1e3:>12.3f} "
+          f"{cycle_time / gates * 1e6:>14.3f}")
+
+
+def main(arg_list: List[str]) -> None:
+    """Print the per-cycle and per-gate cost for each circuit size."""
+    options, arguments = getopt.getopt(arg_list, "cveli")
+    sizes = [int(argument) for argument in arguments] or DEFAULT_SIZES
+    if ("-i", "") in options:
+        for gates in sizes:
+            report_iterations(gates, cycles=20)
+        return
+
+    modes = ["interpreted"] + [MODE_OPTIONS[option] for option, __ in options]
+    print(f"{'mode':>12} {'gates':>10} {'build (s)':>12} {'cycle (ms)':>12} {'per gate (us)':>14}")
+    for gates in sizes:
+        for mode in modes:
+            time_mode(mode, gates)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -9,27 +9,52 @@ Usage
 Show help: logsim.py -h
 Command line user interface: logsim.py -c <file path>
 Graphical user interface: logsim.py <file path>
+Batch of simulation jobs: logsim.py -b <jobs file path> [-j <workers>] <file path>
+Seed the random cold start-up: logsim.py -s <seed> ...
+Store monitor traces as their changes: logsim.py -r ...
+Limit the memory of monitor traces: logsim.py -m <megabytes> ...
+Stream monitored signals to a VCD file: logsim.py -o <VCD file path> -c <file path>
+Keep monitored signals only in the VCD file: logsim.py -o <VCD file path> -d -c <file path>
+Keep parsed circuits in the netlist cache: logsim.py -p ...
+Let signals settle for more iterations: logsim.py -i <iterations> ...
 """
 import getopt
 import os
 import sys
 from contextlib import contextmanager
-from typing import List
+from typing import List, Tuple
 
 from logsim.base_app import App
 from logsim.names import Names
 from logsim.devices import Devices
 from logsim.network import Network
 from logsim.monitors import Monitors
-from logsim.scanner import Scanner
+from logsim.scanner import BufferedScanner
 from logsim.parse import Parser
 from logsim.userint import UserInterface
 from logsim.gui import Gui
+from logsim.batch import read_jobs, run_batch, print_results
+from logsim.vcd_writer import VcdWriter
+from logsim.netlist_cache import NetlistCache
+
+usage_message = ("Usage:\n"
+                 "Show help: logsim.py -h\n"
+                 "Command line user interface: logsim.py -c <file path>\n"
+                 "Graphical user interface: logsim.py <file path>\n"
+                 "Batch of simulation jobs: logsim.py -b <jobs file path> [-j <workers>] <file path>\n"
+                 "Seed the random cold start-up: logsim.py -s <seed> ...\n"
+                 "Store monitor traces as their changes: logsim.py -r ...\n"
+                 "Limit the memory of monitor traces: logsim.py -m <megabytes> ...\n"
+                 "Stream monitored signals to a VCD file: logsim.py -o <VCD file path> -c <file path>\n"
+                 "Keep monitored signals only in the VCD file: logsim.py -o <VCD file path> -d -c <file path>\n"
+                 "Keep parsed circuits in the netlist cache: logsim.py -p ...\n"
+                 "Let signals settle for more iterations: logsim.py -i <iterations> ...")
+parsing_message = "Assembling logic circuit..."
 
 
 @contextmanager
 def scanner_init_error_handler(path: str) -> None:
-    """Context manager to handle initialization errors for scanner"""
+    """Context manager to handle errors opening or decoding the file for the scanner"""
     try:
         yield
     except FileNotFoundError:
@@ -40,68 +65,179 @@ def scanner_init_error_handler(path: str) -> None:
         sys.exit()
 
 
+def read_iteration_limit(value: str) -> int:
+    """Return the iteration limit given on the command line, which must be positive."""
+    iteration_limit = int(value)
+    if iteration_limit < 1:
+        raise ValueError("the iteration limit must be positive")
+    return iteration_limit
+
+
+# Simulator settings and their values when no option chooses them
+default_settings = {
+    "workers": None,  # number of worker processes for batch jobs
+    "seed": None,  # seed of the random cold start-up
+    "run_length": False,  # store monitor traces as their changes
+    "memory_budget": None,  # bytes of monitor traces held in memory
+    "vcd_path": None,  # VCD file streaming the monitored signals
+    "keep_traces": True,  # keep the monitored signals in memory as well
+    "cache": None,  # parsed circuits, by the hash of their file
+    "iteration_limit": None,  # iterations for the signals to settle in a cycle
+}
+
+# {option: (setting, function returning the setting from the option value)}
+setting_options = {
+    "-j": ("workers", int),
+    "-s": ("seed", int),
+    "-r": ("run_length", lambda value: True),
+    "-m": ("memory_budget", lambda value: int(float(value) * 2 ** 20)),
+    "-o": ("vcd_path", str),
+    "-d": ("keep_traces", lambda value: False),
+    "-p": ("cache", lambda value: NetlistCache()),
+    "-i": ("iteration_limit", read_iteration_limit),
+}
+
+
+def read_settings(options: List[Tuple[str, str]]) -> dict:
+    """Return the simulator settings chosen by the command line options.
+
+    Raise ValueError if an option value is invalid.
+    """
+    settings = dict(default_settings)
+    for option, value in options:
+        if option in setting_options:
+            setting, read_value = setting_options[option]
+            settings[setting] = read_value(value)
+    if not settings["keep_traces"] and settings["vcd_path"] is None:
+        raise ValueError("traces can only be dropped when streamed to a VCD file")
+    if settings["vcd_path"] is not None and "-c" not in [option for option, __ in options]:
+        raise ValueError("signals are only streamed to a VCD file by the command line user interface")
+    return settings
+
+
+def exit_with_usage(error: str) -> None:
+    """Print the error and the usage message, and exit."""
+    print(f"Error: {error}\n")
+    print(usage_message)
+    sys.exit()
+
+
+def make_simulator(settings: dict) -> Tuple[Names, Devices, Network, Monitors]:
+    """Return instances of the four inner simulator classes, set up as the settings choose."""
+    names = Names()
+    devices = Devices(names, settings["seed"])
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network, settings["run_length"], settings["memory_budget"])
+    if settings["iteration_limit"] is not None:
+        network.set_iteration_limit(settings["iteration_limit"])
+    if not settings["keep_traces"]:
+        monitors.set_keep_traces(False)
+    return names, devices, network, monitors
+
+
+def print_parse_errors(path: str, parser: Parser) -> None:
+    """Print the errors found in the specification file."""
+    print(f"\u001b[31m\nError in the specification file\n{path}.\u001b[0m")
+    for error in parser.fetch_error_output():
+        print(error)
+
+
+def run_command_interface(path: str, simulator: Tuple[Names, Devices, Network, Monitors], settings: dict) -> None:
+    """Parse the file at path and run the command line user interface."""
+    with scanner_init_error_handler(path):  # the file is only decoded while it is parsed
+        scanner = BufferedScanner(path, simulator[0])
+        parser = Parser(*simulator, scanner, settings["cache"])
+        print(parsing_message)
+        parsed = parser.parse_network()
+    if not parsed:
+        print_parse_errors(path, parser)
+        return
+    for warning in parser.fetch_warning_output():
+        print(f"\u001b[33m{warning}\u001b[0m")
+    # Initialise an instance of the userint.UserInterface() class
+    userint = UserInterface(*simulator)
+    if settings["vcd_path"] is None:
+        userint.command_interface()
+        return
+    try:
+        vcd_writer = VcdWriter(settings["vcd_path"], parser.monitors)
+    except OSError as error:
+        print(f"Error: {error}")
+        sys.exit()
+    with vcd_writer:
+        parser.monitors.add_trace_writer(vcd_writer)
+        userint.command_interface()
+
+
+def run_batch_jobs(jobs_path: str, arguments: List[str], simulator: Tuple[Names, Devices, Network, Monitors],
+                   settings: dict) -> None:
+    """Parse the file given in arguments, and run and print the batch of jobs in the file at jobs_path."""
+    if len(arguments) != 1:  # wrong number of arguments
+        exit_with_usage("one file path required")
+    [definition_path] = arguments
+    with scanner_init_error_handler(definition_path):  # the file is only decoded while it is parsed
+        scanner = BufferedScanner(definition_path, simulator[0])
+        parser = Parser(*simulator, scanner, settings["cache"])
+        print(parsing_message)
+        parsed = parser.parse_network()
+    if not parsed:
+        print_parse_errors(definition_path, parser)
+        sys.exit()
+    try:
+        jobs = read_jobs(jobs_path)
+        print_results(run_batch(definition_path, jobs, settings["workers"], settings["iteration_limit"]),
+                      parser.devices)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+
+
+def run_graphical_interface(arguments: List[str], simulator: Tuple[Names, Devices, Network, Monitors],
+                            settings: dict) -> None:
+    """Run the graphical user interface on the file given in arguments."""
+    if len(arguments) != 1:  # wrong number of arguments
+        exit_with_usage("one file path required")
+
+    [path] = arguments
+    with scanner_init_error_handler(path):
+        scanner = BufferedScanner(path, simulator[0])
+    parser = Parser(*simulator, scanner, settings["cache"])
+
+    # It is possible to provide a file that is wrong initially
+    # An error will be given in the GUI terminal
+    # Initialise an instance of the gui.Gui() class
+    language = os.environ.get("LANG")
+    app = App(language)
+    gui = Gui(u"Logic Simulator", path, parser)
+    gui.Show(True)
+    app.MainLoop()
+
+
 def main(arg_list: List[str]) -> None:
     """Parse the command line options and arguments specified in arg_list.
 
     Run either the command line user interface, the graphical user interface,
-    or display the usage message.
+    a batch of simulation jobs, or display the usage message.
     """
-    usage_message = ("Usage:\n"
-                     "Show help: logsim.py -h\n"
-                     "Command line user interface: logsim.py -c <file path>\n"
-                     "Graphical user interface: logsim.py <file path>")
-    parsing_message = "Assembling logic circuit..."
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:")
-    except getopt.GetoptError:
-        print("Error: invalid command line arguments\n")
-        print(usage_message)
-        sys.exit()
+        options, arguments = getopt.getopt(arg_list, "hc:b:j:s:rm:o:dpi:")
+        settings = read_settings(options)
+    except (getopt.GetoptError, ValueError):
+        exit_with_usage("invalid command line arguments")
 
-    # Initialise instances of the four inner simulator classes
-    names = Names()
-    devices = Devices(names)
-    network = Network(names, devices)
-    monitors = Monitors(names, devices, network)
+    simulator = make_simulator(settings)
 
     for option, path in options:
         if option == "-h":  # print the usage message
             print(usage_message)
             sys.exit()
         elif option == "-c":  # use the command line user interface
-            with scanner_init_error_handler(path):
-                scanner = Scanner(path, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            print(parsing_message)
-            if parser.parse_network():
-                # Initialise an instance of the userint.UserInterface() class
-                userint = UserInterface(names, devices, network, monitors)
-                userint.command_interface()
-            else:
-                print(f"\u001b[31m\nError in the specification file\n{path}.\u001b[0m")
-                for error in parser.fetch_error_output():
-                    print(error)
-
-    if not options:  # no option given, use the graphical user interface
-
-        if len(arguments) != 1:  # wrong number of arguments
-            print("Error: one file path required\n")
-            print(usage_message)
-            sys.exit()
+            run_command_interface(path, simulator, settings)
+        elif option == "-b":  # run a batch of simulation jobs
+            run_batch_jobs(path, arguments, simulator, settings)
 
-        [path] = arguments
-        with scanner_init_error_handler(path):
-            scanner = Scanner(path, names)
-        parser = Parser(names, devices, network, monitors, scanner)
-
-        # It is possible to provide a file that is wrong initially
-        # An error will be given in the GUI terminal
-        # Initialise an instance of the gui.Gui() class
-        language = os.environ.get("LANG")
-        app = App(language)
-        gui = Gui(u"Logic Simulator", path, parser)
-        gui.Show(True)
-        app.MainLoop()
+    if not [option for option, __ in options if option in ["-h", "-c", "-b"]]:
+        # no interface option given, use the graphical user interface
+        run_graphical_interface(arguments, simulator, settings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""Run many simulations of one definition file in parallel.
+
+Used in the Logic Simulator project for regression sweeps. Every job sets the
+switches, seeds the random cold start-up and runs the network for a number of
+cycles. Jobs are shared out across a pool of worker processes, each of which
+parses the definition file once and reuses its network for all its jobs.
+
+Classes
+-------
+BatchJob - settings of one simulation run.
+BatchResult - monitor traces of one simulation run.
+BatchSimulator - parses a definition file once and runs jobs on it.
+
+Functions
+---------
+read_jobs - reads the jobs in a jobs file.
+run_batch - runs jobs across a pool of worker processes.
+print_results - displays the results of a batch in the text console.
+"""
+import concurrent.futures
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+from logsim.scanner import BufferedScanner
+from logsim.parse import Parser
+
+
+class BatchJob(NamedTuple):
+
+    """Settings of one simulation run.
+
+    Parameters
+    ----------
+    cycles: number of simulation cycles to run.
+    seed: seed of the random cold start-up of D-types and clocks.
+    switch_states: {switch name: state} for the switches to set before the
+                   run. Other switches keep their state from the file.
+    """
+
+    cycles: int
+    seed: int
+    switch_states: Dict[str, int]
+
+
+class BatchResult(NamedTuple):
+
+    """Monitor traces of one simulation run.
+
+    Parameters
+    ----------
+    job: the job that was run.
+    completed: False if the network oscillated before the end of the run.
+    traces: {monitor identifier: [signal list]}, in the order of the
+            definition file. Traces stop at the cycle that did not settle.
+    """
+
+    job: BatchJob
+    completed: bool
+    traces: Dict[str, List[int]]
+
+
+class BatchSimulator:
+
+    """Parse a definition file once and run simulation jobs on it.
+
+    The state of the network after parsing is kept, and restored before every
+    job, so each job gives the same traces as running it on a freshly parsed
+    network.
+
+    Parameters
+    ----------
+    path: path of the circuit definition file.
+    iteration_limit: iterations the signals are given to settle in every
+                     cycle, or None for the default of the network.
+
+    Public methods
+    --------------
+    run_job(self, job): Runs the job and returns its monitor traces.
+    """
+
+    def __init__(self, path: str, iteration_limit: Optional[int] = None):
+        """Parse the definition file and keep the initial state of the network."""
+        self.names = Names()
+        self.devices = Devices(self.names)
+        self.network = Network(self.names, self.devices)
+        if iteration_limit is not None:
+            self.network.set_iteration_limit(iteration_limit)
+        self.monitors = Monitors(self.names, self.devices, self.network)
+        parser = Parser(self.names, self.devices, self.network, self.monitors,
+                        BufferedScanner(path, self.names))
+        if not parser.parse_network():
+            raise ValueError(f"Error in the specification file {path}")
+
+        self.initial_outputs = {device.device_id: dict(device.outputs)
+                                for device in self.devices.devices_list}
+        self.initial_switch_states = {switch_id: self.devices.get_device(switch_id).switch_state
+                                      for switch_id in self.devices.find_devices(self.devices.SWITCH)}
+
+    def run_job(self, job: BatchJob) -> BatchResult:
+        """Run the job from the initial state and return its monitor traces."""
+        for device in self.devices.devices_list:
+            device.outputs.update(self.initial_outputs[device.device_id])
+        for switch_id, state in self.initial_switch_states.items():
+            self.devices.set_switch(switch_id, state)
+        for switch_name, state in job.switch_states.items():
+            switch_id = self.names.query(switch_name)
+            if (state not in [self.devices.LOW, self.devices.HIGH] or switch_id is None
+                    or not self.devices.set_switch(switch_id, state)):
+                raise ValueError(f"Invalid switch setting {switch_name}={state}")
+
+        self.devices.set_seed(job.seed)
+        self.devices.cold_startup()
+        self.monitors.reset_monitors()
+        completed = True
+        cycle = 0
+        while cycle < job.cycles:
+            if not self.network.execute_network():
+                completed = False
+                break
+            self.monitors.record_signals()
+            cycle += 1
+
+            idle_cycles = self.network.get_idle_cycles(job.cycles - cycle)
+            self.network.skip_cycles(idle_cycles)
+            self.monitors.record_repeated_signals(idle_cycles)
+            cycle += idle_cycles
+
+        traces = {identifier: list(self.monitors.signals_dictionary[port])
+                  for identifier, port in self.monitors.identifier_to_port.items()}
+        return BatchResult(job, completed, traces)
+
+
+# The simulator of each worker process, made once by initialise_worker
+worker_simulator = None
+
+
+def initialise_worker(path: str, iteration_limit: Optional[int] = None) -> None:
+    """Parse the definition file in a new worker process."""
+    global worker_simulator
+    worker_simulator = BatchSimulator(path, iteration_limit)
+
+
+def run_worker_job(job: BatchJob) -> BatchResult:
+    """Run the job on the simulator of this worker process."""
+    return worker_simulator.run_job(job)
+
+
+def read_jobs(path: str) -> List[BatchJob]:
+    """Read the jobs in the jobs file.
+
+    Each line holds one job: the number of cycles, the seed, then any number
+    of SWITCH=STATE settings, separated by spaces. Empty lines and lines
+    starting with # are ignored. Raise ValueError if a line is invalid.
+    """
+    jobs = []
+    with open(path) as jobs_file:
+        for line_number, line in enumerate(jobs_file, 1):
+            words = line.split()
+            if not words or words[0].startswith("#"):
+                continue
+            try:
+                switch_states = {}
+                for setting in words[2:]:
+                    switch_name, state = setting.split("=")
+                    switch_states[switch_name] = int(state)
+                jobs.append(BatchJob(int(words[0]), int(words[1]), switch_states))
+            except ValueError:
+                raise ValueError(f"Invalid job on line {line_number} of {path}")
+    return jobs
+
+
+def run_batch(path: str, jobs: List[BatchJob], workers: Optional[int] = None,
+              iteration_limit: Optional[int] = None) -> List[BatchResult]:
+    """Run the jobs on the definition file and return their results in order.
+
+    Jobs are shared out across the given number of worker processes, or one
+    per CPU if workers is None. With a single worker, the jobs are run in this
+    process. iteration_limit is passed to every BatchSimulator.
+    """
+    if workers == 1:
+        simulator = BatchSimulator(path, iteration_limit)
+        return [simulator.run_job(job) for job in jobs]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initialise_worker,
+                                                initargs=(path, iteration_limit)) as executor:
+        chunk_size = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        return list(executor.map(run_worker_job, jobs, chunksize=chunk_size))
+
+
+def print_results(results: List[BatchResult], devices: Devices) -> None:
+    """Display the monitor traces of every job in the text console."""
+    symbols = {devices.HIGH: "-", devices.LOW: "_", devices.RISING: "/",
+               devices.FALLING: "\\", devices.BLANK: " "}
+    for job_number, result in enumerate(results, 1):
+        settings = " ".join(f"{switch_name}={state}"
+                            for switch_name, state in result.job.switch_states.items())
+        print(f"Job {job_number}: {result.job.cycles} cycles, seed {result.job.seed} {settings}")
+        if not result.completed:
+            print("Error! Network oscillating.")
+        margin = max((len(identifier) for identifier in result.traces), default=0)
+        for identifier, signal_list in result.traces.items():
+            print(identifier.ljust(margin) + ": " + "".join(symbols[signal] for signal in signal_list))
@@ -0,0 +1,265 @@
+"""Execute the network for many switch settings at once.
+
+Used in the Logic Simulator project to test circuits exhaustively. Up to 64
+switch settings (scenarios) are packed into the bits of one word per signal,
+so that one pass through the gate logic executes all of them.
+
+Classes
+-------
+BitParallelNetwork - executes the network for a word of scenarios.
+
+Functions
+---------
+run_scenarios - runs the network for every scenario and returns the monitor
+                traces of each.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from logsim.compiled_network import CompiledNetwork
+from logsim.devices import Devices
+from logsim.monitors import Monitors
+from logsim.network import Network
+
+WORD_SIZE = 64  # scenarios executed together
+
+
+class BitParallelNetwork(CompiledNetwork):
+
+    """Execute the network for a word of switch settings at once.
+
+    Every signal is stored as two bitplanes, with bit i holding scenario i:
+
+    level: 1 for HIGH and RISING, 0 for LOW and FALLING.
+    edge: 1 for RISING and FALLING, 0 for LOW and HIGH.
+
+    Updating a signal towards target T (Network.update_signal) is then
+    level = T and edge = old level ^ T in every scenario at once, and each
+    device kind is a few bitwise operations on whole words.
+
+    Every scenario starts from the current state of the Device objects, which
+    are never modified. Clocks and RCs do not depend on the switches, so
+    their counters are kept once for all scenarios.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+    switch_settings: list of {switch_id: switch state}, one per scenario.
+                     Switches not in a setting keep their current state.
+
+    Public methods
+    --------------
+    load_state(self): Reloads every signal from the Device objects.
+
+    execute(self, iteration_limit, scenarios): Executes all the devices for
+                                               one simulation cycle.
+
+    get_signal(self, slot, scenario): Returns the signal of the slot in the
+                                      given scenario.
+    """
+
+    def __init__(self, devices: Devices, switch_settings: List[Dict[int, int]]):
+        """Lower the devices and pack the switch settings into words."""
+        self.switch_settings = switch_settings
+        self.all_scenarios = (1 << len(switch_settings)) - 1  # one bit per scenario
+        super().__init__(devices)
+
+    def build_plan(self) -> None:
+        """Build the per-kind tuples and the switch state words."""
+        super().build_plan()
+        devices = self.devices
+        self.switch_words = []  # one word of switch states per switch_plan entry
+        for device, __ in self.switch_plan:
+            word = 0
+            for scenario, switch_setting in enumerate(self.switch_settings):
+                if switch_setting.get(device.device_id, device.switch_state) == devices.HIGH:
+                    word |= 1 << scenario
+            self.switch_words.append(word)
+        self.clock_devices = [device for device in self.device_list
+                              if device.device_kind == devices.CLOCK]
+        self.rc_devices = [device for device in self.device_list
+                           if device.device_kind == devices.RC]
+
+    def load_state(self) -> None:
+        """Reload every signal, D-type memory and counter from the Device objects."""
+        devices = self.devices
+        self.valid = True
+        self.level = [0] * len(self.slot_ports)
+        self.edge = [0] * len(self.slot_ports)
+        for slot in range(len(self.slot_ports)):
+            signal = self.slot_outputs[slot][self.slot_ports[slot]]
+            if signal not in devices.signal_types[:4]:  # not LOW, HIGH, RISING or FALLING
+                self.valid = False
+            if signal in [devices.HIGH, devices.RISING]:
+                self.level[slot] = self.all_scenarios
+            if signal in [devices.RISING, devices.FALLING]:
+                self.edge[slot] = self.all_scenarios
+
+        self.memory = [self.all_scenarios if device.dtype_memory == devices.HIGH else 0
+                       for device, *__ in self.dtype_plan]
+        self.clock_counters = [device.clock_counter for device in self.clock_devices]
+        self.rc_counters = [device.rc_counter for device in self.rc_devices]
+
+    def get_signal(self, slot: int, scenario: int) -> int:
+        """Return the signal of the slot in the given scenario."""
+        level = self.level[slot] >> scenario & 1
+        edge = self.edge[slot] >> scenario & 1
+        if edge:
+            return self.devices.RISING if level else self.devices.FALLING
+        return self.devices.HIGH if level else self.devices.LOW
+
+    def update_sources(self) -> None:
+        """Set clock and RC signals to RISING or FALLING, as in Network.update_clocks."""
+        for index, device in enumerate(self.clock_devices):
+            if self.clock_counters[index] == device.clock_half_period:
+                self.clock_counters[index] = 0
+                output_slot = self.clock_plan[index]
+                if not self.edge[output_slot]:  # HIGH or LOW in every scenario
+                    self.level[output_slot] ^= self.all_scenarios
+                    self.edge[output_slot] = self.all_scenarios
+            self.clock_counters[index] += 1
+
+        for index, device in enumerate(self.rc_devices):
+            if self.rc_counters[index] == device.trigger_cycle:
+                output_slot = self.rc_plan[index]
+                self.level[output_slot] = 0
+                self.edge[output_slot] = self.all_scenarios
+            self.rc_counters[index] += 1
+
+    def execute(self, iteration_limit: int, scenarios: Optional[int] = None) -> int:
+        """Execute all the devices for one simulation cycle.
+
+        Settling stops once every scenario in the scenarios word has settled.
+        Return the word of scenarios that settled, which is 0 if the network
+        has unconnected inputs or invalid signals.
+        """
+        if scenarios is None:
+            scenarios = self.all_scenarios
+        if self.unconnected or not self.valid:
+            return 0
+        self.update_sources()
+
+        sweep = [self.execute_switches, self.execute_d_types, self.execute_clocks,
+                 self.execute_gates, self.execute_xors, self.execute_rcs]
+        iterations = 0
+        changed = scenarios
+        while iterations < iteration_limit and changed & scenarios:
+            iterations += 1
+            changed = 0
+            for execute_kind in sweep:
+                changed |= execute_kind()
+        self.iterations = iterations
+        return scenarios & ~changed
+
+    def update(self, slot: int, target: int) -> int:
+        """Update the slot towards the target word and return the changed scenarios."""
+        level = self.level[slot]
+        edge = level ^ target
+        changed = (level ^ target) | (self.edge[slot] ^ edge)
+        self.level[slot] = target
+        self.edge[slot] = edge
+        return changed
+
+    def execute_switches(self) -> int:
+        """Execute the switches and return the scenarios in which a signal changed."""
+        changed = 0
+        for (__, output_slot), switch_word in zip(self.switch_plan, self.switch_words):
+            changed |= self.update(output_slot, switch_word)
+        return changed
+
+    def execute_d_types(self) -> int:
+        """Execute the D-types and return the scenarios in which a signal changed."""
+        level = self.level
+        edge = self.edge
+        changed = 0
+        for index, (__, clk, set_, clear, data, q_slot, qbar_slot) in enumerate(self.dtype_plan):
+            rising_clock = level[clk] & edge[clk]
+            high_data = level[data] ^ edge[data]  # HIGH or FALLING
+            memory = (rising_clock & high_data) | (~rising_clock & self.memory[index])
+            memory |= level[set_] & ~edge[set_]  # SET is HIGH
+            memory &= ~(level[clear] & ~edge[clear])  # CLEAR is HIGH
+            memory &= self.all_scenarios
+            self.memory[index] = memory
+            changed |= self.update(q_slot, memory)
+            changed |= self.update(qbar_slot, ~memory & self.all_scenarios)
+        return changed
+
+    def execute_clocks(self) -> int:
+        """Complete the clock transitions and return the scenarios in which a signal changed."""
+        changed = 0
+        for output_slot in self.clock_plan:
+            changed |= self.update(output_slot, self.level[output_slot])
+        return changed
+
+    def execute_gates(self) -> int:
+        """Execute the AND, OR, NAND and NOR gates and return the scenarios in which a signal changed."""
+        level = self.level
+        edge = self.edge
+        all_scenarios = self.all_scenarios
+        changed = 0
+        for output_slot, x, y, __, fanin in self.gate_plan:
+            all_x = all_scenarios  # scenarios in which all inputs are x
+            for input_slot in fanin:
+                if x == self.devices.HIGH:
+                    all_x &= level[input_slot] & ~edge[input_slot]
+                else:
+                    all_x &= ~(level[input_slot] | edge[input_slot])
+            target = all_x if y == self.devices.HIGH else ~all_x & all_scenarios
+            changed |= self.update(output_slot, target)
+        return changed
+
+    def execute_xors(self) -> int:
+        """Execute the XOR gates and return the scenarios in which a signal changed."""
+        level = self.level
+        edge = self.edge
+        changed = 0
+        for output_slot, first_slot, second_slot in self.xor_plan:
+            # Output is high only if both inputs are different
+            target = (level[first_slot] ^ level[second_slot]) | (edge[first_slot] ^ edge[second_slot])
+            changed |= self.update(output_slot, target)
+        return changed
+
+    def execute_rcs(self) -> int:
+        """Complete the RC transitions and return the scenarios in which a signal changed."""
+        changed = 0
+        for output_slot in self.rc_plan:
+            changed |= self.update(output_slot, self.level[output_slot])
+        return changed
+
+
+def run_scenarios(network: Network, monitors: Monitors, switch_settings: List[Dict[int, int]],
+                  cycles: int) -> List[Dict[Tuple[int, Optional[int]], List[int]]]:
+    """Run the network for the given number of cycles under every switch setting.
+
+    Every scenario starts from the current state of the devices, as if the
+    switches were set and the network run on its own. Return one dictionary
+    per scenario, shaped like Monitors.signals_dictionary. As in a normal run,
+    the traces of a scenario stop at the first cycle in which its network
+    does not settle.
+    """
+    traces = []
+    for start in range(0, len(switch_settings), WORD_SIZE):
+        word_settings = switch_settings[start:start + WORD_SIZE]
+        bit_parallel_network = BitParallelNetwork(network.devices, word_settings)
+
+        # Monitored inputs record the output they are connected to
+        monitor_slots = {}  # {(device_id, port_id): slot}
+        for device_id, port_id in monitors.signals_dictionary:
+            device = network.devices.get_device(device_id)
+            if port_id in device.outputs:
+                monitor_slots[(device_id, port_id)] = bit_parallel_network.slot_of[(device_id, port_id)]
+            else:
+                monitor_slots[(device_id, port_id)] = bit_parallel_network.slot_of.get(
+                    device.inputs[port_id])
+
+        word_traces = [{monitor: [] for monitor in monitor_slots} for __ in word_settings]
+        running = bit_parallel_network.all_scenarios
+        for __ in range(cycles):
+            running = bit_parallel_network.execute(network.iteration_limit, running)
+            if not running:
+                break
+            for scenario, scenario_traces in enumerate(word_traces):
+                if running >> scenario & 1:
+                    for monitor, slot in monitor_slots.items():
+                        scenario_traces[monitor].append(bit_parallel_network.get_signal(slot, scenario))
+        traces += word_traces
+    return traces
@@ -0,0 +1,121 @@
+"""Keep checkpoints of the simulation state.
+
+Used in the Logic Simulator project to resume a simulation from an earlier
+cycle without simulating again from the cold start-up, for example to try a
+different switch setting from that cycle on.
+
+Classes
+-------
+CheckpointStore - stores snapshots of the network state by cycle.
+"""
+import bisect
+import collections
+from typing import Optional
+
+from logsim.network import Network
+
+
+class CheckpointStore:
+
+    """Store snapshots of the network state by cycle.
+
+    A checkpoint at cycle n is the state after n simulation cycles, so the
+    checkpoint at cycle 0 is the state straight after the cold start-up.
+    Snapshots are taken with Network.get_state(). When more than
+    max_checkpoints are stored, the least recently saved or restored one is
+    deleted.
+
+    Parameters
+    ----------
+    network: instance of the network.Network() class.
+    interval: number of cycles between the checkpoints taken by record().
+    max_checkpoints: largest number of checkpoints kept.
+
+    Public methods
+    --------------
+    record(self, cycle): Takes a checkpoint if cycle is a multiple of the
+                         interval.
+
+    save(self, cycle): Takes a checkpoint of the current state at cycle.
+
+    find_checkpoint(self, cycle): Returns the latest checkpointed cycle at or
+                                  before cycle.
+
+    restore(self, cycle): Restores the latest checkpoint at or before cycle
+                          and returns its cycle.
+
+    discard_after(self, cycle): Deletes the checkpoints after cycle.
+
+    clear(self): Deletes every checkpoint.
+    """
+
+    def __init__(self, network: Network, interval: int = 100, max_checkpoints: int = 64):
+        """Initialise an empty store."""
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        if max_checkpoints < 1:
+            raise ValueError("max_checkpoints must be at least 1")
+        self.network = network
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+
+        self.states = collections.OrderedDict()  # {cycle: state}, least recently used first
+        self.cycles = []  # checkpointed cycles in increasing order
+
+    def __len__(self) -> int:
+        """Return the number of checkpoints."""
+        return len(self.states)
+
+    def __contains__(self, cycle: int) -> bool:
+        """Return True if there is a checkpoint at cycle."""
+        return cycle in self.states
+
+    def record(self, cycle: int) -> None:
+        """Take a checkpoint if cycle is a multiple of the interval."""
+        if cycle % self.interval == 0:
+            self.save(cycle)
+
+    def save(self, cycle: int) -> None:
+        """Take a checkpoint of the current state at cycle."""
+        if cycle not in self.states:
+            bisect.insort(self.cycles, cycle)
+        self.states[cycle] = self.network.get_state()
+        self.states.move_to_end(cycle)
+        while len(self.states) > self.max_checkpoints:
+            old_cycle, __ = self.states.popitem(last=False)
+            del self.cycles[bisect.bisect_left(self.cycles, old_cycle)]
+
+    def find_checkpoint(self, cycle: int) -> Optional[int]:
+        """Return the latest checkpointed cycle at or before cycle.
+
+        Return None if there is none.
+        """
+        position = bisect.bisect_right(self.cycles, cycle)
+        if position == 0:
+            return None
+        return self.cycles[position - 1]
+
+    def restore(self, cycle: int) -> int:
+        """Restore the latest checkpoint at or before cycle.
+
+        Return the cycle of the restored checkpoint; the caller simulates the
+        remaining cycles up to cycle. Raise KeyError if there is none.
+        """
+        checkpoint_cycle = self.find_checkpoint(cycle)
+        if checkpoint_cycle is None:
+            raise KeyError(cycle)
+        self.network.set_state(self.states[checkpoint_cycle])
+        self.states.move_to_end(checkpoint_cycle)
+        return checkpoint_cycle
+
+    def discard_after(self, cycle: int) -> None:
+        """Delete the checkpoints after cycle, which a new branch replaces."""
+        position = bisect.bisect_right(self.cycles, cycle)
+        for later_cycle in self.cycles[position:]:
+            del self.states[later_cycle]
+        del self.cycles[position:]
+
+    def clear(self) -> None:
+        """Delete every checkpoint."""
+        self.states.clear()
+        self.cycles.clear()
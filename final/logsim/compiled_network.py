@@ -0,0 +1,349 @@
+"""Lower the network into flat arrays and execute it.
+
+Used in the Logic Simulator project to execute large networks quickly. The
+devices and connections are lowered once into flat integer arrays, which are
+then swept with the same semantics as Network.execute_network, without any
+dictionary lookups in the inner loop.
+
+Classes
+-------
+CompiledNetwork - lowers the network into arrays and executes it.
+"""
+from array import array
+from typing import List
+
+from logsim.devices import Devices
+
+
+class CompiledNetwork:
+
+    """Lower the network into flat integer arrays and execute it.
+
+    Every device output is given a signal slot, and every device is given a
+    kind code, a range in the input offset table and, for each input, the
+    slot of the output it is connected to (its fanin). Devices are stored in
+    the order Network.execute_network executes them, so one sweep over the
+    arrays updates the signals exactly as one iteration of the original.
+
+    While the compiled network is in use, it owns the gate and D-type output
+    signals. Switch, clock and RC signals are reloaded from the Device
+    objects before every cycle, and changed signals are written back to the
+    Device objects after every cycle so that monitors see them. Call
+    load_state() after editing device outputs directly.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    is_stale(self): Returns True if devices were added after compilation.
+
+    load_state(self): Reloads every signal slot from the Device objects.
+
+    execute(self, iteration_limit): Executes all the devices for one
+                                    simulation cycle.
+    """
+
+    # Kind codes, in the order the devices are executed
+    kind_codes = [SWITCH, D_TYPE, CLOCK, AND, OR, NAND, NOR, XOR, RC] = range(9)
+
+    # UPDATE_TABLE[2 * signal + target] is the result of Network.update_signal
+    # for a LOW (0) or HIGH (1) target
+    UPDATE_TABLE = [0, 2,  # LOW
+                    3, 1,  # HIGH
+                    3, 1,  # RISING
+                    0, 2]  # FALLING
+
+    def __init__(self, devices: Devices):
+        """Lower the devices and their connections into flat arrays."""
+        self.devices = devices
+        self.device_count = len(devices.devices_list)
+
+        execution_order = [(self.SWITCH, devices.SWITCH), (self.D_TYPE, devices.D_TYPE),
+                           (self.CLOCK, devices.CLOCK), (self.AND, devices.AND),
+                           (self.OR, devices.OR), (self.NAND, devices.NAND),
+                           (self.NOR, devices.NOR), (self.XOR, devices.XOR),
+                           (self.RC, devices.RC)]
+
+        # Devices in execution order, with their kind codes
+        self.device_list = []
+        self.kind = array("b")
+        for kind_code, device_kind in execution_order:
+            for device_id in devices.find_devices(device_kind):
+                self.device_list.append(devices.get_device(device_id))
+                self.kind.append(kind_code)
+
+        # Signal slots: one per device output. slot_outputs and slot_ports
+        # locate the Device.outputs entry each slot mirrors
+        self.output_offsets = array("l")
+        self.slot_outputs = []
+        self.slot_ports = []
+        self.slot_of = {}  # {(device_id, port_id): slot}
+        for device in self.device_list:
+            self.output_offsets.append(len(self.slot_ports))
+            for port_id in device.outputs:
+                self.slot_of[(device.device_id, port_id)] = len(self.slot_ports)
+                self.slot_outputs.append(device.outputs)
+                self.slot_ports.append(port_id)
+        self.output_offsets.append(len(self.slot_ports))
+
+        # Input offset table and fanin: the slot driving every input, or -1
+        # if the input is unconnected. D-type inputs are stored in the order
+        # CLK, SET, CLEAR, DATA
+        self.input_offsets = array("l")
+        self.fanin = array("l")
+        for device in self.device_list:
+            self.input_offsets.append(len(self.fanin))
+            if device.device_kind == devices.D_TYPE:
+                input_ids = devices.dtype_input_ids
+            else:
+                input_ids = list(device.inputs)
+            for input_id in input_ids:
+                self.fanin.append(self.slot_of.get(device.inputs.get(input_id), -1))
+        self.input_offsets.append(len(self.fanin))
+
+        self.unconnected = -1 in self.fanin
+
+        self.signals = [devices.LOW] * len(self.slot_ports)
+        self.valid = True
+        self.iterations = 0  # iterations taken by the last simulation cycle
+        self.oscillating = False  # True if the last cycle returned to an earlier state
+        self.build_plan()
+        self.load_state()
+
+    def build_plan(self) -> None:
+        """Build the per-kind tuples swept by execute() from the arrays."""
+        devices = self.devices
+        self.switch_plan = []  # [(device, output slot)]
+        self.dtype_plan = []  # [(device, CLK, SET, CLEAR, DATA, Q, QBAR slots)]
+        self.clock_plan = []  # [output slot]
+        self.gate_plan = []  # [(output slot, x, y, not y, fanin slots)]
+        self.xor_plan = []  # [(output slot, first input slot, second input slot)]
+        self.rc_plan = []  # [output slot]
+
+        # Gate rule: if all inputs are x, the output target is y, else not y
+        gate_rules = {self.AND: (devices.HIGH, devices.HIGH), self.OR: (devices.LOW, devices.LOW),
+                      self.NAND: (devices.HIGH, devices.LOW), self.NOR: (devices.LOW, devices.HIGH)}
+
+        for index, device in enumerate(self.device_list):
+            kind = self.kind[index]
+            output_slot = self.output_offsets[index]
+            fanin = tuple(self.fanin[self.input_offsets[index]:self.input_offsets[index + 1]])
+            if kind == self.SWITCH:
+                self.switch_plan.append((device, output_slot))
+            elif kind == self.D_TYPE:
+                q_slot = output_slot + list(device.outputs).index(devices.Q_ID)
+                qbar_slot = output_slot + list(device.outputs).index(devices.QBAR_ID)
+                self.dtype_plan.append((device, *fanin, q_slot, qbar_slot))
+            elif kind == self.CLOCK:
+                self.clock_plan.append(output_slot)
+            elif kind == self.XOR:
+                self.xor_plan.append((output_slot, *fanin))
+            elif kind == self.RC:
+                self.rc_plan.append(output_slot)
+            else:
+                x, y = gate_rules[kind]
+                self.gate_plan.append((output_slot, x, y, 1 - y, fanin))
+
+        # Signals that can be changed outside execute(), reloaded every cycle
+        self.source_slots = [output_slot for __, output_slot in self.switch_plan]
+        self.source_slots += self.clock_plan + self.rc_plan
+
+    def is_stale(self) -> bool:
+        """Return True if devices were added after the network was compiled."""
+        return len(self.devices.devices_list) != self.device_count
+
+    def load_slots(self, slots: List[int]) -> None:
+        """Load the given signal slots from the Device objects."""
+        signals = self.signals
+        slot_outputs = self.slot_outputs
+        slot_ports = self.slot_ports
+        for slot in slots:
+            signal = slot_outputs[slot][slot_ports[slot]]
+            if signal not in self.devices.signal_types[:4]:  # not LOW, HIGH, RISING or FALLING
+                self.valid = False
+            signals[slot] = signal
+
+    def load_state(self) -> None:
+        """Reload every signal slot from the Device objects."""
+        self.valid = True
+        self.load_slots(range(len(self.slot_ports)))
+
+    def store_slots(self, slots: List[int]) -> None:
+        """Write the given signal slots back to the Device objects."""
+        signals = self.signals
+        slot_outputs = self.slot_outputs
+        slot_ports = self.slot_ports
+        for slot in slots:
+            slot_outputs[slot][slot_ports[slot]] = signals[slot]
+
+    def execute(self, iteration_limit: int) -> bool:
+        """Execute all the devices for one simulation cycle.
+
+        Clock and RC signals must already have been updated for this cycle.
+        Return True if successful and the network does not oscillate.
+        """
+        self.iterations = 0
+        self.oscillating = False
+        if self.unconnected:
+            return False
+        self.load_slots(self.source_slots)
+        if not self.valid:
+            return False
+
+        # D-types are executed before clocks to catch the rising edge
+        sweep = [self.execute_switches, self.execute_d_types, self.execute_clocks,
+                 self.execute_gates, self.execute_xors, self.execute_rcs]
+        changed_slots = []
+
+        seen_states = set()
+        iterations = 0
+        steady_state = False
+        while iterations < iteration_limit:
+            iterations += 1
+            steady_state = True
+            for execute_kind in sweep:
+                if not execute_kind(changed_slots):
+                    steady_state = False
+            if steady_state:
+                break
+            # Cycles settling within two sweeps are never hashed
+            if iterations > 1:
+                state = self.get_signal_state()
+                if state in seen_states:
+                    self.oscillating = True
+                    break
+                seen_states.add(state)
+
+        self.iterations = iterations
+        self.store_slots(changed_slots)
+        return steady_state
+
+    def get_signal_state(self) -> tuple:
+        """Return every signal slot and D-type memory."""
+        return tuple(self.signals), tuple(dtype[0].dtype_memory for dtype in self.dtype_plan)
+
+    def execute_switches(self, changed_slots: List[int]) -> bool:
+        """Execute the switches, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        update = self.UPDATE_TABLE
+        LOW = self.devices.LOW
+        steady_state = True
+        for device, output_slot in self.switch_plan:
+            signal = signals[output_slot]
+            new_signal = update[2 * signal + (device.switch_state != LOW)]
+            if new_signal != signal:
+                signals[output_slot] = new_signal
+                changed_slots.append(output_slot)
+                steady_state = False
+        return steady_state
+
+    def execute_d_types(self, changed_slots: List[int]) -> bool:
+        """Execute the D-types, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        update = self.UPDATE_TABLE
+        LOW, HIGH, RISING, FALLING = self.devices.signal_types[:4]
+        steady_state = True
+        for device, clk, set_, clear, data, q_slot, qbar_slot in self.dtype_plan:
+            if signals[clk] == RISING:
+                data_signal = signals[data]
+                if data_signal == HIGH or data_signal == FALLING:
+                    device.dtype_memory = HIGH
+                else:
+                    device.dtype_memory = LOW
+            if signals[set_] == HIGH:
+                device.dtype_memory = HIGH
+            if signals[clear] == HIGH:
+                device.dtype_memory = LOW
+
+            memory = device.dtype_memory
+            signal = signals[q_slot]
+            new_signal = update[2 * signal + (memory != LOW)]
+            if new_signal != signal:
+                signals[q_slot] = new_signal
+                changed_slots.append(q_slot)
+                steady_state = False
+            signal = signals[qbar_slot]
+            new_signal = update[2 * signal + (memory != HIGH)]
+            if new_signal != signal:
+                signals[qbar_slot] = new_signal
+                changed_slots.append(qbar_slot)
+                steady_state = False
+        return steady_state
+
+    def execute_clocks(self, changed_slots: List[int]) -> bool:
+        """Complete the clock transitions, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        LOW, HIGH, RISING, FALLING = self.devices.signal_types[:4]
+        steady_state = True
+        for output_slot in self.clock_plan:
+            signal = signals[output_slot]
+            if signal == RISING or signal == FALLING:
+                signals[output_slot] = HIGH if signal == RISING else LOW
+                changed_slots.append(output_slot)
+                steady_state = False
+        return steady_state
+
+    def execute_gates(self, changed_slots: List[int]) -> bool:
+        """Execute the AND, OR, NAND and NOR gates, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        update = self.UPDATE_TABLE
+        steady_state = True
+        for output_slot, x, target, inverse_target, fanin in self.gate_plan:
+            for input_slot in fanin:
+                if signals[input_slot] != x:
+                    target = inverse_target
+                    break
+            signal = signals[output_slot]
+            new_signal = update[2 * signal + target]
+            if new_signal != signal:
+                signals[output_slot] = new_signal
+                changed_slots.append(output_slot)
+                steady_state = False
+        return steady_state
+
+    def execute_xors(self, changed_slots: List[int]) -> bool:
+        """Execute the XOR gates, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        update = self.UPDATE_TABLE
+        steady_state = True
+        for output_slot, first_slot, second_slot in self.xor_plan:
+            target = signals[first_slot] != signals[second_slot]
+            signal = signals[output_slot]
+            new_signal = update[2 * signal + target]
+            if new_signal != signal:
+                signals[output_slot] = new_signal
+                changed_slots.append(output_slot)
+                steady_state = False
+        return steady_state
+
+    def execute_rcs(self, changed_slots: List[int]) -> bool:
+        """Complete the RC transitions, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        LOW, HIGH, RISING, FALLING = self.devices.signal_types[:4]
+        steady_state = True
+        for output_slot in self.rc_plan:
+            if signals[output_slot] == FALLING:
+                signals[output_slot] = LOW
+                changed_slots.append(output_slot)
+                steady_state = False
+        return steady_state
@@ -8,27 +8,37 @@ Classes
 Device - stores device properties.
 Devices - makes and stores all the devices in the logic network.
 """
+import collections
 import random
+from array import array
 
 from typing import List, Optional
 from logsim.names import Names
+from logsim.scheduler import EventScheduler
 
 
 class Device:
 
     """Store device properties.
 
+    The clock and RC counters are kept as the cycle of the scheduler at
+    which they were 0, so that they advance with every cycle of the
+    scheduler. Setting a counter reschedules the clock edge or RC trigger.
+
     Parameters
     ----------
     device_id: device ID.
+    scheduler: instance of the scheduler.EventScheduler() class shared by the
+               devices, or None for a scheduler of this device only.
 
     Public methods
     --------------
     No public methods.
     """
 
-    def __init__(self, device_id: int):
+    def __init__(self, device_id: int, scheduler: Optional[EventScheduler] = None):
         """Initialise device properties."""
+        self.scheduler = scheduler if scheduler is not None else EventScheduler()
 
         self.device_id = device_id
 
@@ -41,11 +51,37 @@ class Device:
 
         self.device_kind = None
         self.clock_half_period = None
-        self.clock_counter = None
+        self.clock_start = None  # scheduler cycle at which clock_counter was 0
         self.switch_state = None
         self.dtype_memory = None
         self.trigger_cycle = None
-        self.rc_counter = None
+        self.rc_start = None  # scheduler cycle at which rc_counter was 0
+
+    @property
+    def clock_counter(self) -> Optional[int]:
+        """Return the number of cycles since the clock counter was 0."""
+        if self.clock_start is None:
+            return None
+        return self.scheduler.cycle - self.clock_start
+
+    @clock_counter.setter
+    def clock_counter(self, counter: Optional[int]) -> None:
+        """Set the clock counter and reschedule the next clock edge."""
+        self.clock_start = None if counter is None else self.scheduler.cycle - counter
+        self.scheduler.reschedule(self)
+
+    @property
+    def rc_counter(self) -> Optional[int]:
+        """Return the number of cycles since the RC counter was 0."""
+        if self.rc_start is None:
+            return None
+        return self.scheduler.cycle - self.rc_start
+
+    @rc_counter.setter
+    def rc_counter(self, counter: Optional[int]) -> None:
+        """Set the RC counter and reschedule the RC trigger."""
+        self.rc_start = None if counter is None else self.scheduler.cycle - counter
+        self.scheduler.reschedule(self)
 
 
 class Devices:
@@ -58,6 +94,8 @@ class Devices:
     Parameters
     ----------
     names: instance of the names.Names() class.
+    seed: seed of the random cold start-up. If None, every run starts from a
+          different random state.
 
     Public methods
     --------------
@@ -96,18 +134,49 @@ class Devices:
 
     make_d_type(self, device_id): Makes a D-type device.
 
-    cold_startup(self): Simulates cold start-up of D-types and clocks.
+    set_seed(self, seed): Seeds the random cold start-up.
+
+    cold_startup(self, startup_state=None): Simulates cold start-up of
+                                            D-types and clocks.
+
+    get_startup_state(self): Returns the state chosen by the last cold
+                             start-up.
+
+    get_state(self): Returns a compact binary snapshot of every output
+                     signal, D-type memory, switch state and counter.
+
+    set_state(self, state): Restores a snapshot returned by get_state().
 
     make_device(self, device_id, device_kind, device_property=None): Creates
                        the specified device and returns errors if unsuccessful.
     """
 
-    def __init__(self, names: Names):
+    def __init__(self, names: Names, seed: Optional[int] = None):
         """Initialise devices list and constants."""
 
         self.names = names
 
+        # Random number generator of the cold start-up, and the state it chose
+        # last: {device_id: D-type memory, or (clock signal, clock counter)}
+        self.random = random.Random(seed)
+        self.startup_state = {}
+
+        # Counts the cycles, and schedules the clock edges and RC triggers
+        # from the counters of the devices
+        self.scheduler = EventScheduler()
+
         self.devices_list = []
+        self.id_to_device = {}  # {device_id: Device}, kept in sync with devices_list
+
+        # Device IDs in order of creation, both in total and per device kind
+        self.device_ids = []
+        self.kind_to_device_ids = collections.defaultdict(list)  # {device_kind: [device_id]}
+
+        # Pins not in any connection yet, in the order they were added, as
+        # {(device_id, port_id): None}. Added by add_input and add_output, and
+        # removed by Network.make_connection
+        self.unconnected_inputs = {}
+        self.unused_outputs = {}
 
         gate_strings = ["AND", "OR", "NAND", "NOR", "XOR"]
         device_strings = ["CLOCK", "SWITCH", "DTYPE", "RC"]
@@ -132,31 +201,34 @@ class Devices:
         self.max_gate_inputs = 16
 
     def get_device(self, device_id: int) -> Device or None:
-        """Return the Device object corresponding to device_id."""
-        for device in self.devices_list:
-            if device.device_id == device_id:
-                return device
-        return None
+        """Return the Device object corresponding to device_id.
+
+        Return None if device_id is not a device in the network.
+        """
+        return self.id_to_device.get(device_id)
 
     def find_devices(self, device_kind: int = None) -> List[int]:
         """Return a list of device IDs of the specified device_kind.
 
         Return a list of all device IDs in the network if no device_kind is
-        specified.
+        specified. The list is a copy of the one kept by add_device, so
+        changing it leaves the devices unchanged.
         """
-        device_id_list = []
-        for device in self.devices_list:
-            if device_kind is None:
-                device_id_list.append(device.device_id)
-            elif device.device_kind == device_kind:
-                device_id_list.append(device.device_id)
-        return device_id_list
+        if device_kind is None:
+            return list(self.device_ids)
+        elif device_kind in self.kind_to_device_ids:
+            return list(self.kind_to_device_ids[device_kind])
+        else:
+            return []
 
     def add_device(self, device_id: int, device_kind: int) -> None:
         """Add the specified device to the network."""
-        new_device = Device(device_id)
+        new_device = Device(device_id, self.scheduler)
         new_device.device_kind = device_kind
         self.devices_list.append(new_device)
+        self.id_to_device[device_id] = new_device
+        self.device_ids.append(device_id)
+        self.kind_to_device_ids[device_kind].append(device_id)
 
     def add_input(self, device_id: int, input_id: int) -> bool:
         """Add the specified input to the specified device.
@@ -165,7 +237,9 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
-            device.inputs.setdefault(input_id)
+            if input_id not in device.inputs:
+                device.inputs[input_id] = None
+                self.unconnected_inputs[(device_id, input_id)] = None
             return True
         else:
             return False
@@ -177,6 +251,8 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
+            if output_id not in device.outputs:
+                self.unused_outputs[(device_id, output_id)] = None
             device.outputs[output_id] = signal
             return True
         else:
@@ -273,29 +349,106 @@ class Devices:
         device.outputs[None] = self.HIGH
         device.trigger_cycle = trigger_cycle
 
-    def cold_startup(self):
+    def set_seed(self, seed: Optional[int]) -> None:
+        """Seed the random cold start-up, so that it can be repeated."""
+        self.random.seed(seed)
+
+    def cold_startup(self, startup_state: Optional[dict] = None) -> None:
         """Simulate cold start-up of D-types, clocks and RCs.
 
         Set the memory of the D-types to a random state and make the clocks
-        begin from a random point in their cycles.
+        begin from a random point in their cycles. Devices in startup_state, as
+        returned by get_startup_state(), are set to their recorded state
+        instead.
 
         Set RCs to high again and reset rc_counters.
         """
+        if startup_state is None:
+            startup_state = {}
         for device in self.devices_list:
             if device.device_kind == self.D_TYPE:
-                device.dtype_memory = random.choice([self.LOW, self.HIGH])
+                if device.device_id in startup_state:
+                    device.dtype_memory = startup_state[device.device_id]
+                else:
+                    device.dtype_memory = self.random.choice([self.LOW, self.HIGH])
+                self.startup_state[device.device_id] = device.dtype_memory
 
             elif device.device_kind == self.CLOCK:
-                clock_signal = random.choice([self.LOW, self.HIGH])
+                if device.device_id in startup_state:
+                    clock_signal, device.clock_counter = startup_state[device.device_id]
+                else:
+                    clock_signal = self.random.choice([self.LOW, self.HIGH])
+                    # Initialise it to a random point in its cycle.
+                    device.clock_counter = \
+                        self.random.randrange(device.clock_half_period)
                 self.add_output(device.device_id, output_id=None,
                                 signal=clock_signal)
-                # Initialise it to a random point in its cycle.
-                device.clock_counter = \
-                    random.randrange(device.clock_half_period)
+                self.startup_state[device.device_id] = (clock_signal, device.clock_counter)
             elif device.device_kind == self.RC:
                 device.outputs[None] = self.HIGH
                 device.rc_counter = 0
 
+    def get_startup_state(self) -> dict:
+        """Return the state chosen by the last cold start-up.
+
+        The state is {device_id: D-type memory, or (clock signal, clock
+        counter)}, and can be passed back to cold_startup() to replay it.
+        """
+        return dict(self.startup_state)
+
+    def get_state(self) -> bytes:
+        """Return a compact binary snapshot of the simulation state.
+
+        The snapshot holds every output signal, D-type memory and switch
+        state as one byte, followed by the clock and RC counters as eight
+        bytes each, in the order of devices_list. Unset values are stored
+        as -1. It can only be restored into the same circuit.
+        """
+        signals = array("b")
+        counters = array("q")
+        for device in self.devices_list:
+            signals.extend(device.outputs.values())
+            if device.device_kind == self.D_TYPE:
+                signals.append(-1 if device.dtype_memory is None else device.dtype_memory)
+            elif device.device_kind == self.SWITCH:
+                signals.append(-1 if device.switch_state is None else device.switch_state)
+            elif device.device_kind == self.CLOCK:
+                counters.append(-1 if device.clock_counter is None else device.clock_counter)
+            elif device.device_kind == self.RC:
+                counters.append(-1 if device.rc_counter is None else device.rc_counter)
+        return signals.tobytes() + counters.tobytes()
+
+    def set_state(self, state: bytes) -> None:
+        """Restore a snapshot returned by get_state().
+
+        Output dictionaries are updated in place, so that references held
+        by the network are kept. Raise ValueError if the snapshot was taken
+        from a different circuit.
+        """
+        signal_count = (sum(len(device.outputs) for device in self.devices_list)
+                        + len(self.find_devices(self.D_TYPE)) + len(self.find_devices(self.SWITCH)))
+        counter_count = len(self.find_devices(self.CLOCK)) + len(self.find_devices(self.RC))
+        if len(state) != signal_count + counter_count * array("q").itemsize:
+            raise ValueError("snapshot does not match the devices")
+        signals = iter(array("b", state[:signal_count]))
+        counters = iter(array("q", state[signal_count:]))
+        for device in self.devices_list:
+            outputs = device.outputs
+            for output_id in outputs:
+                outputs[output_id] = next(signals)
+            if device.device_kind == self.D_TYPE:
+                memory = next(signals)
+                device.dtype_memory = None if memory == -1 else memory
+            elif device.device_kind == self.SWITCH:
+                switch_state = next(signals)
+                device.switch_state = None if switch_state == -1 else switch_state
+            elif device.device_kind == self.CLOCK:
+                counter = next(counters)
+                device.clock_counter = None if counter == -1 else counter
+            elif device.device_kind == self.RC:
+                counter = next(counters)
+                device.rc_counter = None if counter == -1 else counter
+
     def make_device(self, device_id: int, device_kind: int, device_property: int = None) -> int:
         """Create the specified device.
 
@@ -21,6 +21,7 @@ from logsim.gui_widgets.monitor import MonitorsList
 
 from logsim.internationalization import _
 from logsim.parse import Parser
+from logsim.simulation import Simulation
 
 
 class Gui(wx.Frame):
@@ -56,6 +57,10 @@ class Gui(wx.Frame):
 
     continue_simulation(self): Continues the simulation and plot the monitored traces.
 
+    set_switch(self, switch_id, state): Sets a switch from the chosen cycle and plots the traces simulated again.
+
+    plot_traces(self, reset_cycle, first_cycle): Plots the monitored traces up to the last simulated cycle.
+
     toggle_theme(self, event): Event handler for when the user changes the color theme.
     """
 
@@ -69,6 +74,7 @@ class Gui(wx.Frame):
         self.network = parser.network
         self.monitors = parser.monitors
         self.parser = parser
+        self.simulation = Simulation(self.devices, self.network, self.monitors)
 
         self.num_cycles = 10
         self.total_cycles = self.num_cycles
@@ -132,7 +138,16 @@ class Gui(wx.Frame):
 
     def check_errors(self, filename: str, parser: Parser) -> bool:
         """Handles the error checking when a file is uploaded."""
-        if parser.parse_network():
+        try:
+            parsed = parser.parse_network()
+        except UnicodeDecodeError:  # the scanner only reads the file when it is parsed
+            self.terminal.append_text(Color.terminal_error_color,
+                                      f"\nError: file '{filename}' is not a unicode text file")
+            self.disable_monitor_buttons()
+            self.disable_simulation_buttons()
+            return False
+
+        if parsed:
 
             # Message on terminal
             self.terminal.append_text(Color.terminal_success_color,
@@ -149,6 +164,10 @@ class Gui(wx.Frame):
             self.continue_button.Disable()
             self.continue_button.SetBackgroundColour(Color.color_disabled)
 
+            # Printing the warning messages in the GUI terminal
+            for warning in parser.fetch_warning_output():
+                self.terminal.append_text(Color.terminal_warning_color, f"\n{warning}")
+
             return True
         else:
             # Message on terminal
@@ -175,6 +194,7 @@ class Gui(wx.Frame):
         self.network = parser.network
         self.monitors = parser.monitors
         self.parser = parser
+        self.simulation = Simulation(self.devices, self.network, self.monitors)
 
     def disable_monitor_buttons(self) -> None:
         """Disable buttons controlling monitor."""
@@ -192,6 +212,7 @@ class Gui(wx.Frame):
         """Reset gui display when new file is uploaded."""
         self.monitors_list.monitors_scrolled_sizer.Clear(True)
         self.switch.switches_scrolled_sizer.Clear(True)
+        self.switch.update_cycle_range(0)
 
     def update_add_remove_button_states(self) -> None:
         """Updates the enabled/disabled state of the add and remove buttons."""
@@ -199,41 +220,77 @@ class Gui(wx.Frame):
 
     def run_simulation(self) -> bool:
         """Runs the simulation and plot the monitored traces."""
-        self.monitors.reset_monitors()
+        # Running the simulation, keeping checkpoints for switch changes
+        if not self.simulation.run(self.num_cycles):
+            self.print_network_error()
 
-        # Running the simulation
-        self.devices.cold_startup()
-        for __ in range(self.num_cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                self.terminal.append_text(Color.terminal_error_color,
-                                          _(u"\n\nError: network oscillating!!"))
-
-                self.disable_simulation_buttons()
-                return False
+            self.disable_simulation_buttons()
+            return False
 
-        self.signals_dictionary = self.monitors.get_all_monitor_signal()
-        self.total_cycles = self.num_cycles
-        self.canvas.update_cycle(self.total_cycles)
-        self.canvas.render("", self.signals_dictionary)
+        self.plot_traces()
         return True
 
+    def print_network_error(self) -> None:
+        """Print why the last simulation cycle failed on the terminal, naming the oscillating devices if known."""
+        loops = self.network.find_oscillating_loops() if self.network.oscillating else []
+        if loops:
+            devices = "; ".join(", ".join(self.names.get_name_string(device_id) for device_id in loop)
+                                for loop in loops)
+            message = _(u"\n\nError: network oscillating in {devices}!!").format(devices=devices)
+        elif not self.network.steady_state and self.network.iterations == self.network.iteration_limit:
+            message = (_(u"\n\nError: network did not settle within {iterations} iterations!!")
+                       .format(iterations=self.network.iteration_limit))
+        else:
+            message = _(u"\n\nError: network oscillating!!")
+        self.terminal.append_text(Color.terminal_error_color, message)
+
     def continue_simulation(self) -> bool:
         """Continues the simulation and plot the monitored traces."""
         # Running the simulation
-        for _ in range(self.num_cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                self.disable_simulation_buttons()
-                return False
+        first_cycle = self.simulation.cycles_completed
+        if not self.simulation.continue_run(self.num_cycles):
+            self.print_network_error()
+
+            self.disable_simulation_buttons()
+            return False
+
+        self.plot_traces(first_cycle=first_cycle)
+        return True
+
+    def set_switch(self, switch_id: int, state: int) -> bool:
+        """Sets a switch from the cycle chosen in the switches section.
+
+        Cycles already simulated from that cycle are simulated again from the latest checkpoint before it,
+        and the traces are plotted again.
+        """
+        cycle = self.switch.cycle_spin.GetValue()
+        if cycle >= self.simulation.cycles_completed:
+            return self.simulation.set_switch(switch_id, state)  # applies to the next cycles simulated
 
+        self.terminal.append_text(Color.terminal_text_color,
+                                  _(u"\n\nSimulating again from cycle {cycle}...").format(cycle=cycle))
+        if not self.simulation.set_switch(switch_id, state, cycle):
+            self.print_network_error()
+
+            self.disable_simulation_buttons()
+            self.plot_traces()
+            return False
+
+        self.plot_traces(reset_cycle=False, first_cycle=cycle)
+        return True
+
+    def plot_traces(self, reset_cycle: bool = True, first_cycle: int = 0) -> None:
+        """Plots the monitored traces up to the last simulated cycle.
+
+        If reset_cycle is True, switch changes are set to apply from the last simulated cycle.
+        Only the cycles from first_cycle onwards are read from the monitors again.
+        """
         self.signals_dictionary = self.monitors.get_all_monitor_signal()
-        self.total_cycles += self.num_cycles
+        self.total_cycles = self.simulation.cycles_completed
+        self.switch.update_cycle_range(self.total_cycles, reset_cycle)
         self.canvas.update_cycle(self.total_cycles)
-        self.canvas.render("", self.signals_dictionary)
-        return True
+        self.canvas.update_traces(self.signals_dictionary, first_cycle)
+        self.canvas.render("")
 
     def toggle_theme(self, event) -> None:
         """Handle the event when the user presses the toggle switch menu item to switch between colour themes."""
@@ -262,6 +319,9 @@ class Gui(wx.Frame):
             self.switch.switches_text.SetForegroundColour(Color.dark_text_color)
             self.switch.switches_scrolled.SetBackgroundColour(Color.dark_background_secondary)
             self.switch.switches_scrolled.SetForegroundColour(Color.dark_background_secondary)
+            self.switch.cycle_text.SetForegroundColour(Color.dark_text_color)
+            self.switch.cycle_spin.SetBackgroundColour(Color.dark_background_secondary)
+            self.switch.cycle_spin.SetForegroundColour(Color.dark_text_color)
 
             for child in self.monitors_list.monitors_scrolled.GetChildren():
                 if isinstance(child, wx.StaticText):
@@ -302,6 +362,9 @@ class Gui(wx.Frame):
             self.switch.switches_text.SetForegroundColour(Color.light_text_color)
             self.switch.switches_scrolled.SetBackgroundColour(Color.light_background_secondary)
             self.switch.switches_scrolled.SetForegroundColour(Color.light_background_secondary)
+            self.switch.cycle_text.SetForegroundColour(Color.light_text_color)
+            self.switch.cycle_spin.SetBackgroundColour(Color.light_background_secondary)
+            self.switch.cycle_spin.SetForegroundColour(Color.light_text_color)
 
             for child in self.monitors_list.monitors_scrolled.GetChildren():
                 if isinstance(child, wx.StaticText):
@@ -179,11 +179,11 @@ class MonitorRemoveButton(wx.Button):
         """Handle the click event of the remove monitor button."""
         dialog = CustomDialogBox(self.gui, _(u"Remove Monitor"), _(u"Select a Monitor to Remove:"),
                                  list(self.gui.monitors.get_all_identifiers()),
-                                 self.gui.theme)
+                                 self.gui.theme, multiple=True)
         if dialog.ShowModal() == wx.ID_OK:
-            identifier = dialog.get_selected_item()
-            if identifier:
-                self.gui.monitors.remove_monitor_by_identifier(identifier)
+            identifiers = dialog.get_selected_items()
+            if identifiers:
+                self.gui.monitors.remove_monitors_by_identifier(identifiers)
                 self.gui.monitors_list.update_monitors_list()
                 self.gui.update_add_remove_button_states()
 
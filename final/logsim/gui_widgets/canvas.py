@@ -39,6 +39,8 @@ class Canvas(wxcanvas.GLCanvas):
 
     on_size(self, event): Handles the canvas resize event.
 
+    update_traces(self, signals, first_cycle): Updates the signal levels drawn from first_cycle onwards.
+
     on_mouse(self, event): Handles mouse events.
 
     render_text(self, text, x_pos, y_pos): Handles text drawing
@@ -75,6 +77,7 @@ class Canvas(wxcanvas.GLCanvas):
         self.no_cycles = 0
         self.total_cycles = 0
         self.signals = {}
+        self.trace_levels = {}  # {(device_id, port_id): [signal levels drawn]}
 
         self.mode = "2D"  # 2D or 3D
         self.theme = "light"
@@ -229,7 +232,7 @@ class Canvas(wxcanvas.GLCanvas):
         GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
 
         if signals:
-            self.signals = signals  # updating the dictionary of signal values
+            self.update_traces(signals)  # updating the dictionary of signal values
 
         if self.signals:
             identifier_dict = self.gui.monitors.fetch_identifier_to_device_port_name()
@@ -254,7 +257,7 @@ class Canvas(wxcanvas.GLCanvas):
                 for index, (identifier, (device_name, port_name)) in enumerate(identifier_dict.items()):
                     device_id = self.gui.names.query(device_name)
                     port_id = self.gui.names.query(port_name) if port_name else None
-                    trace = self.signals[(device_id, port_id)]
+                    trace = self.get_levels((device_id, port_id))
 
                     # Update y
                     y = y_start + index * y_diff
@@ -313,7 +316,7 @@ class Canvas(wxcanvas.GLCanvas):
                 for index, (identifier, (device_name, port_name)) in enumerate(identifier_dict.items()):
                     device_id = self.gui.names.query(device_name)
                     port_id = self.gui.names.query(port_name) if port_name else None
-                    trace = self.signals[(device_id, port_id)]
+                    trace = self.get_levels((device_id, port_id))
 
                     # Initialize z position for the current trace
                     z_pos = z_start - index * z_spacing
@@ -348,6 +351,31 @@ class Canvas(wxcanvas.GLCanvas):
         GL.glFlush()
         self.SwapBuffers()
 
+    def update_traces(self, signals: dict, first_cycle: int = 0) -> None:
+        """Updates the signal levels drawn from first_cycle onwards.
+
+        Levels drawn for earlier cycles are kept, so after a re-simulation from
+        first_cycle only the end of each trace is read again.
+        """
+        self.signals = signals
+        trace_levels = {}
+        for key, trace in signals.items():
+            levels = self.trace_levels.get(key, [])
+            # Traces of monitors made during the run start after cycle 0
+            kept = max(min(first_cycle - (self.total_cycles - len(trace)), len(levels), len(trace)), 0)
+            del levels[kept:]
+            levels.extend(trace[kept:])
+            trace_levels[key] = levels
+        self.trace_levels = trace_levels
+
+    def get_levels(self, key: tuple) -> list:
+        """Returns the signal levels drawn for the monitor at key."""
+        trace = self.signals[key]
+        levels = self.trace_levels.get(key)
+        if levels is None or len(levels) != len(trace):  # monitor made or remade since the last update
+            levels = self.trace_levels[key] = list(trace)
+        return levels
+
     def plot_grid(self, x_start: int, no_of_monitors: int, cycles: int) -> None:
         """Adds grid lines to the plot in 2D."""
         width = 30
@@ -652,6 +680,7 @@ class Canvas(wxcanvas.GLCanvas):
         self.SetCurrent(self.context)
         GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
         self.signals.clear()
+        self.trace_levels.clear()
         self.init = False
         self.Refresh()
 
@@ -7,7 +7,7 @@ Classes:
 CustomDialogBox - custom dialog box for the add and remove buttons.
 IdentifierInputDialog - custom dialog box to input an identifier for the monitor.
 """
-from typing import Optional
+from typing import List, Optional
 
 import wx
 
@@ -25,13 +25,16 @@ class CustomDialogBox(wx.Dialog):
     message: message to display on the dialog box.
     choices: options listed in the dialog box. 
     theme: colour theme of the GUI.
+    multiple: if True, several options can be selected.
 
     Public methods
     --------------
     get_selected_item(self): Return the selected item.
+
+    get_selected_items(self): Return all the selected items.
     """
 
-    def __init__(self, parent, title: str, message: str, choices: list, theme: str):
+    def __init__(self, parent, title: str, message: str, choices: list, theme: str, multiple: bool = False):
         """Initializes the layout and styling of the dialog box."""
         super().__init__(parent, title=title)
         self.selection = None
@@ -41,7 +44,8 @@ class CustomDialogBox(wx.Dialog):
         text = wx.StaticText(self, label=message)
         sizer.Add(text, flag=wx.ALL, border=5)
 
-        self.list_box = wx.ListBox(self, choices=choices, style=wx.LB_SINGLE | wx.LB_NEEDED_SB)
+        selection_style = wx.LB_EXTENDED if multiple else wx.LB_SINGLE
+        self.list_box = wx.ListBox(self, choices=choices, style=selection_style | wx.LB_NEEDED_SB)
         self.list_box.SetSizeHints(minSize=(250, 150))
 
         if theme == "light":
@@ -72,6 +76,10 @@ class CustomDialogBox(wx.Dialog):
             return self.list_box.GetString(selection_index)
         return None
 
+    def get_selected_items(self) -> List[str]:
+        """Return all the selected items."""
+        return [self.list_box.GetString(selection_index) for selection_index in self.list_box.GetSelections()]
+
 
 class IdentifierInputDialog(wx.Dialog):
 
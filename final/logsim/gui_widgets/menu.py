@@ -16,7 +16,7 @@ from logsim.names import Names
 from logsim.devices import Devices
 from logsim.network import Network
 from logsim.monitors import Monitors
-from logsim.scanner import Scanner
+from logsim.scanner import BufferedScanner
 from logsim.parse import Parser
 
 from logsim.gui_widgets.color import Color
@@ -172,16 +172,8 @@ class MenuBar(wx.MenuBar):
                 network = Network(names, devices)
                 monitors = Monitors(names, devices, network)
 
-                try:
-                    scanner = Scanner(path, names)
-                except UnicodeDecodeError:
-                    self.gui.terminal.append_text(Color.terminal_error_color,
-                                                  f"\nError: file '{path}' is not a unicode text file")
-
-                    self.gui.disable_monitor_buttons()
-                    self.gui.disable_simulation_buttons()
-                    return
-                parser = Parser(names, devices, network, monitors, scanner)
+                scanner = BufferedScanner(path, names)
+                parser = Parser(names, devices, network, monitors, scanner, self.gui.parser.cache)
 
                 # Progress bar mock progress
                 for i in range(100):
@@ -28,6 +28,8 @@ class Switch:
     on_toggle_switch(self, event): Handle the event when the user toggles a switch.
 
     update_switches_display(self): Handle the event of updating the displayed list of switches.
+
+    update_cycle_range(self, cycles, reset_cycle=True): Allow switch changes from any cycle up to the given one.
     """
 
     def __init__(self, parent):
@@ -49,8 +51,17 @@ class Switch:
         self.switches_scrolled.SetMinSize((250, 150))
         self.switches_scrolled.SetBackgroundColour(Color.light_background_secondary)
 
+        # Cycle from which toggled switches apply. Cycles already simulated from it are simulated again
+        self.cycle_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.cycle_text = wx.StaticText(parent, wx.ID_ANY, _(u"Apply from cycle"))
+        self.cycle_spin = wx.SpinCtrl(parent, wx.ID_ANY, "0")
+        self.cycle_spin.SetRange(0, 0)
+        self.cycle_sizer.Add(self.cycle_text, 1, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        self.cycle_sizer.Add(self.cycle_spin, 0, wx.ALIGN_CENTER_VERTICAL)
+
         self.switches_sizer.Add(self.switches_text, 0, wx.ALL, 5)
         self.switches_sizer.Add(self.switches_scrolled, 1, wx.EXPAND | wx.ALL, 5)
+        self.switches_sizer.Add(self.cycle_sizer, 0, wx.EXPAND | wx.ALL, 5)
 
     def on_toggle_switch(self, event) -> None:
         """Handle the event when the user toggles a switch."""
@@ -62,11 +73,11 @@ class Switch:
         if is_on:
             button.SetLabel("1")
             self.switches_dict[switch_name] = 1
-            self.gui.devices.set_switch(switch_id, 1)
+            self.gui.set_switch(switch_id, 1)
         else:
             button.SetLabel("0")
             self.switches_dict[switch_name] = 0
-            self.gui.devices.set_switch(switch_id, 0)
+            self.gui.set_switch(switch_id, 0)
         self.gui.Refresh()
 
     def update_switches_display(self) -> None:
@@ -113,3 +124,12 @@ class Switch:
         self.switches_scrolled.Layout()
         self.switches_scrolled_sizer.FitInside(self.switches_scrolled)
         self.switches_scrolled_sizer.Layout()
+
+    def update_cycle_range(self, cycles: int, reset_cycle: bool = True) -> None:
+        """Allow switch changes from any cycle up to the given number of simulated cycles.
+
+        If reset_cycle is True, switch changes apply from the last cycle, that is, to the cycles simulated next.
+        """
+        self.cycle_spin.SetRange(0, cycles)
+        if reset_cycle:
+            self.cycle_spin.SetValue(cycles)
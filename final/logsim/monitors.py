@@ -9,11 +9,13 @@ Monitors - records and displays specified output signals.
 
 """
 import collections
+import shutil
 
-from typing import List, Optional, Union
+from typing import Iterable, List, Optional, Tuple, Union
 from logsim.names import Names
 from logsim.devices import Devices
 from logsim.network import Network
+from logsim.traces import MemoryBudget, RunLengthTrace, SignalTrace, SpillingTrace
 
 
 class Monitors:
@@ -28,9 +30,28 @@ class Monitors:
     names: instance of the names.Names() class.
     devices: instance of the devices.Devices() class.
     network: instance of the network.Network() class.
+    run_length: if True, traces store only the cycles at which the signal
+                changes (traces.RunLengthTrace), which suits long runs of
+                mostly idle signals.
+    memory_budget: if not None, the number of bytes of samples the traces
+                   may hold in memory before moving older samples to disk
+                   (traces.SpillingTrace). Ignored for run-length traces.
 
     Public methods
     --------------
+    set_run_length_encoding(self, run_length): Chooses how traces are stored.
+
+    set_memory_budget(self, memory_budget, directory): Limits the memory held
+                                                       by traces.
+
+    set_keep_traces(self, keep_traces): Chooses whether traces are kept in
+                                        memory.
+
+    add_trace_writer(self, writer): Passes every recorded cycle to a writer.
+
+    remove_trace_writer(self, writer): Stops passing recorded cycles to a
+                                       writer.
+
     make_monitor(self, device_id, port_id): Sets a specified monitor on the
                                               specified output.
 
@@ -40,42 +61,128 @@ class Monitors:
     remove_monitor_by_identifier(self, device_id, identifier): Removes a monitor from the
                                                 specified output by its identifier (alias).
 
+    make_monitors(self, monitors, cycles_completed): Sets a list of monitors.
+
+    remove_monitors_by_port(self, ports): Removes the monitors from a list of
+                                          outputs.
+
+    remove_monitors_by_identifier(self, identifiers): Removes a list of
+                                                      monitors by identifier.
+
     get_monitor_signal(self, device_id, port_id): Returns the signal level of
                                                     the specified monitor.
 
     record_signals(self): Records the current signal level of all monitors.
 
+    record_repeated_signals(self, cycles): Records the current signal level of
+                                           all monitors for several cycles.
+
     get_signal_names(self): Returns two lists of signal names: monitored and
                             not monitored.
 
     reset_monitors(self): Clears the memory of all monitors.
 
+    rewind_monitors(self, cycles): Removes the signal levels recorded in the
+                                   last cycles from all monitors.
+
     get_margin(self): Returns the length of the longest monitor's name.
 
-    display_signals(self): Displays signal trace(s) in the text console.
+    display_signals(self, start, end, width): Displays signal trace(s) in the
+                                              text console.
     """
 
-    def __init__(self, names: Names, devices: Devices, network: Network):
+    def __init__(self, names: Names, devices: Devices, network: Network, run_length: bool = False,
+                 memory_budget: Optional[int] = None):
         """Initialise the monitors dictionary and monitor errors."""
         self.names = names
         self.network = network
         self.devices = devices
 
         # signals_dictionary stores
-        # {(device_id, port_id): [signal_list]}
+        # {(device_id, port_id): trace}, where trace is a list-like
+        # SignalTrace using one byte per sample, a RunLengthTrace or a
+        # SpillingTrace, made by new_trace
         self.signals_dictionary = dict()
+        self.run_length = run_length
+        self.memory_budget = MemoryBudget(memory_budget) if memory_budget is not None else None
+        self.keep_traces = True
+
+        # Writers, such as vcd_writer.VcdWriter, whose record method is
+        # passed {(device_id, port_id): signal level} every recorded cycle,
+        # and whose record_repeated method is passed the levels and the
+        # number of cycles they are repeated for. Their restart method is
+        # called when the monitors are reset for a new run
+        self.trace_writers = []
+
+        # The gather plan resolves every monitored port once to
+        # [((device_id, port_id), trace append method, outputs dictionary,
+        # output_id)], where outputs[output_id] is the signal to record. It
+        # is rebuilt when monitors or traces change, or connections are made
+        self.gather_plan = None
+        self.plan_connection_count = None  # network.connection_count when the plan was built
 
-        # identifier_to_port stores
+        # port_to_identifier stores
         # {(device_id, port_id): {identifier}}
         self.port_to_identifier = collections.defaultdict(set)
 
-        # port_to_identifier stores
+        # identifier_to_port stores
         # {identifier: (device_id, port_id)}
         self.identifier_to_port = collections.OrderedDict()
 
         [self.NO_ERROR, self.MONITOR_IDENTIFIER_PRESENT, self.MONITOR_DEVICE_ABSENT, self.MONITOR_PORT_ABSENT] = (
             self.names.unique_error_codes(4))
 
+    def new_trace(self, signals: Iterable[int] = ()) -> Union[SignalTrace, RunLengthTrace, SpillingTrace]:
+        """Return a new trace of the given signal levels, stored as currently chosen."""
+        if self.run_length:
+            return RunLengthTrace(signals)
+        if self.memory_budget is not None:
+            return SpillingTrace(signals, self.memory_budget)
+        return SignalTrace(signals)
+
+    def convert_traces(self) -> None:
+        """Store the traces already recorded as currently chosen."""
+        for port, trace in self.signals_dictionary.items():
+            self.signals_dictionary[port] = self.new_trace(trace)
+            trace.clear()  # releases the memory budget of a spilling trace
+        self.gather_plan = None
+
+    def set_run_length_encoding(self, run_length: bool = True) -> None:
+        """Store traces as their changes if run_length is True, or one byte per sample if not.
+
+        Traces already recorded are converted.
+        """
+        self.run_length = run_length
+        self.convert_traces()
+
+    def set_memory_budget(self, memory_budget: Optional[int], directory: Optional[str] = None) -> None:
+        """Limit the samples held in memory by traces to memory_budget bytes.
+
+        Older samples are moved to files in the given directory, or the
+        default temporary directory. If memory_budget is None, all samples
+        are held in memory. Traces already recorded are converted.
+        """
+        self.memory_budget = MemoryBudget(memory_budget, directory) if memory_budget is not None else None
+        self.convert_traces()
+
+    def set_keep_traces(self, keep_traces: bool = True) -> None:
+        """Keep recorded signals in the traces if keep_traces is True.
+
+        If keep_traces is False, the traces are emptied and stay empty, so
+        that long runs only stream their signals to the trace writers.
+        """
+        self.keep_traces = keep_traces
+        if not keep_traces:
+            self.reset_monitors()
+
+    def add_trace_writer(self, writer) -> None:
+        """Pass the signal levels of every recorded cycle to the writer."""
+        self.trace_writers.append(writer)
+
+    def remove_trace_writer(self, writer) -> None:
+        """Stop passing recorded signal levels to the writer."""
+        self.trace_writers.remove(writer)
+
     def make_monitor(self, device_id: int, port_id: Optional[int],
                      identifier: str, cycles_completed: int = 0) -> int:
         """Add the specified signal to the monitors dictionary.
@@ -95,8 +202,9 @@ class Monitors:
             # of BLANK signals. Otherwise, initialise the trace with an empty
             # list.
             if (device_id, port_id) not in self.signals_dictionary:
-                self.signals_dictionary[(device_id, port_id)] = [
-                    self.devices.BLANK] * cycles_completed
+                self.signals_dictionary[(device_id, port_id)] = self.new_trace(
+                    [self.devices.BLANK] * cycles_completed if self.keep_traces else [])
+                self.gather_plan = None
 
             self.port_to_identifier[(device_id, port_id)].add(identifier)
             self.identifier_to_port[identifier] = (device_id, port_id)
@@ -112,10 +220,9 @@ class Monitors:
             return False
         else:
             del self.signals_dictionary[(device_id, port_id)]
-            del self.port_to_identifier[(device_id, port_id)]
-            for identifier, port in self.identifier_to_port.copy().items():
-                if port == (device_id, port_id):
-                    del self.identifier_to_port[identifier]
+            self.gather_plan = None
+            for identifier in self.port_to_identifier.pop((device_id, port_id)):
+                del self.identifier_to_port[identifier]
             return True
 
     def remove_monitor_by_identifier(self, identifier: str) -> bool:
@@ -127,16 +234,39 @@ class Monitors:
         if identifier not in self.identifier_to_port:
             return False
         else:
-            del self.identifier_to_port[identifier]
-            for port, identifier_set in self.port_to_identifier.copy().items():
-                if identifier in identifier_set:
-                    if len(identifier_set) == 1:  # only one identifier associated to the port
-                        del self.signals_dictionary[port]
-                        del self.port_to_identifier[port]
-                    else:
-                        self.port_to_identifier[port].remove(identifier)
+            port = self.identifier_to_port.pop(identifier)
+            identifier_set = self.port_to_identifier[port]
+            if len(identifier_set) == 1:  # only one identifier associated to the port
+                del self.signals_dictionary[port]
+                del self.port_to_identifier[port]
+                self.gather_plan = None
+            else:
+                identifier_set.remove(identifier)
             return True
 
+    def make_monitors(self, monitors: List[Tuple[int, Optional[int], str]],
+                      cycles_completed: int = 0) -> List[int]:
+        """Add every (device_id, port_id, identifier) monitor in the list.
+
+        Return the NO_ERROR or error code of each, as make_monitor does.
+        """
+        return [self.make_monitor(device_id, port_id, identifier, cycles_completed)
+                for device_id, port_id, identifier in monitors]
+
+    def remove_monitors_by_port(self, ports: List[Tuple[int, Optional[int]]]) -> List[bool]:
+        """Remove the monitors on every (device_id, port_id) in the list.
+
+        Return True for each port whose monitors were removed.
+        """
+        return [self.remove_monitor_by_port(device_id, port_id) for device_id, port_id in ports]
+
+    def remove_monitors_by_identifier(self, identifiers: List[str]) -> List[bool]:
+        """Remove the monitor of every identifier in the list.
+
+        Return True for each identifier whose monitor was removed.
+        """
+        return [self.remove_monitor_by_identifier(identifier) for identifier in identifiers]
+
     def get_monitor_signal(self, device_id: int, port_id: int) -> Optional[int]:
         """Return the signal level of the specified monitor.
 
@@ -151,15 +281,62 @@ class Monitors:
         else:
             return None
 
+    def build_gather_plan(self) -> None:
+        """Resolve every monitored port to the outputs dictionary holding its signal.
+
+        A monitored input reads the output it is connected to, and an
+        unconnected input always reads BLANK, as its trace stores no None.
+        """
+        self.gather_plan = []
+        for (device_id, port_id), trace in self.signals_dictionary.items():
+            device = self.devices.get_device(device_id)
+            if port_id in device.outputs:
+                outputs, output_id = device.outputs, port_id
+            elif device.inputs[port_id] is not None:
+                output_device_id, output_id = device.inputs[port_id]
+                outputs = self.devices.get_device(output_device_id).outputs
+            else:
+                outputs, output_id = {None: self.devices.BLANK}, None
+            self.gather_plan.append(((device_id, port_id), trace.append, outputs, output_id))
+        self.plan_connection_count = self.network.connection_count
+
     def record_signals(self) -> None:
         """Record the current signal level for every monitor.
 
         This function is called at every simulation cycle.
         """
-        for device_id, port_id in self.signals_dictionary:
-            signal_level = self.get_monitor_signal(device_id, port_id)
-            self.signals_dictionary[(device_id,
-                                     port_id)].append(signal_level)
+        if self.gather_plan is None or self.plan_connection_count != self.network.connection_count:
+            self.build_gather_plan()
+
+        if self.trace_writers:
+            signal_levels = {port: outputs[output_id]
+                             for port, __, outputs, output_id in self.gather_plan}
+            if self.keep_traces:
+                for port, signal_level in signal_levels.items():
+                    self.signals_dictionary[port].append(signal_level)
+            for writer in self.trace_writers:
+                writer.record(signal_levels)
+        elif self.keep_traces:
+            for __, append, outputs, output_id in self.gather_plan:
+                append(outputs[output_id])
+
+    def record_repeated_signals(self, cycles: int) -> None:
+        """Record the current signal level of every monitor for the given number of cycles.
+
+        Used for the idle cycles skipped by Network.skip_cycles(), in which
+        no signal changes, so the traces are filled in bulk.
+        """
+        if cycles <= 0:
+            return
+        if self.gather_plan is None or self.plan_connection_count != self.network.connection_count:
+            self.build_gather_plan()
+
+        signal_levels = {port: outputs[output_id] for port, __, outputs, output_id in self.gather_plan}
+        if self.keep_traces:
+            for port, signal_level in signal_levels.items():
+                self.signals_dictionary[port].append_repeated(signal_level, cycles)
+        for writer in self.trace_writers:
+            writer.record_repeated(signal_levels, cycles)
 
     def get_signal_names(self) -> List[List[Optional[str]]]:
         """Return two signal name lists: monitored and not monitored."""
@@ -182,10 +359,23 @@ class Monitors:
     def reset_monitors(self) -> None:
         """Clear the memory of all the monitors.
 
-        The list of stored signal levels for each monitor is deleted.
+        The list of stored signal levels for each monitor is deleted, and
+        the trace writers restart.
         """
         for device_id, port_id in self.signals_dictionary:
-            self.signals_dictionary[(device_id, port_id)] = []
+            self.signals_dictionary[(device_id, port_id)].clear()
+            self.signals_dictionary[(device_id, port_id)] = self.new_trace()
+        self.gather_plan = None
+        for writer in self.trace_writers:
+            writer.restart()
+
+    def rewind_monitors(self, cycles: int) -> None:
+        """Remove the signal levels recorded in the last cycles from all monitors.
+
+        Traces of monitors made later than that are emptied.
+        """
+        for trace in self.signals_dictionary.values():
+            trace.truncate(max(len(trace) - cycles, 0))
 
     def get_margin(self) -> Optional[int]:
         """Return the length of the longest monitor's name.
@@ -205,26 +395,49 @@ class Monitors:
         else:
             return None
 
-    def display_signals(self) -> None:
-        """Display the signal trace(s) in the text console."""
+    def render_trace(self, trace, start: int, end: int, cycles_per_column: int) -> str:
+        """Return the text row of the trace from cycle start to end.
+
+        Each character shows cycles_per_column cycles. It is the symbol of
+        their signal level if it does not change, or ~ if it does.
+        """
+        symbols = {self.devices.HIGH: "-", self.devices.LOW: "_", self.devices.RISING: "/",
+                   self.devices.FALLING: "\\", self.devices.BLANK: " "}
+        if cycles_per_column == 1:
+            return "".join([symbols.get(signal, "") for signal in trace[start:end]])
+
+        row = []
+        for column_start in range(start, end, cycles_per_column):
+            column_signals = set(trace[column_start:min(column_start + cycles_per_column, end)])
+            if not column_signals:  # past the end of the trace
+                break
+            row.append(symbols.get(column_signals.pop(), "") if len(column_signals) == 1 else "~")
+        return "".join(row)
+
+    def display_signals(self, start: int = 0, end: Optional[int] = None, width: Optional[int] = None) -> None:
+        """Display the signal trace(s) from cycle start to end in the text console.
+
+        By default, the whole trace is displayed. If the cycles do not fit in
+        the width, by default that of the terminal, each character summarises
+        several cycles.
+        """
         margin = self.get_margin()
+        if margin is None:  # no monitors
+            return
+
+        cycles = max(len(trace) for trace in self.signals_dictionary.values())
+        end = cycles if end is None else min(end, cycles)
+        start = min(start, end)
+        if width is None:
+            width = shutil.get_terminal_size().columns
+        columns = max(width - margin - 2, 1)
+        cycles_per_column = max(1, -(-(end - start) // columns))  # rounded up
+        if cycles_per_column > 1:
+            print(f"Cycles {start} to {end}, {cycles_per_column} cycles per character (~: changing)")
 
         for identifier, (device_id, port_id) in self.identifier_to_port.items():
-            name_length = len(identifier)
-            signal_list = self.signals_dictionary[(device_id, port_id)]
-            print(identifier + (margin - name_length) * " ", end=": ")
-            for signal in signal_list:
-                if signal == self.devices.HIGH:
-                    print("-", end="")
-                if signal == self.devices.LOW:
-                    print("_", end="")
-                if signal == self.devices.RISING:
-                    print("/", end="")
-                if signal == self.devices.FALLING:
-                    print("\\", end="")
-                if signal == self.devices.BLANK:
-                    print(" ", end="")
-            print("\n", end="")
+            trace = self.signals_dictionary[(device_id, port_id)]
+            print(identifier.ljust(margin) + ": " + self.render_trace(trace, start, end, cycles_per_column))
 
     def fetch_identifier_to_device_port_name(self) -> dict:
         """Fetch device name and port name from a given identifier."""
@@ -0,0 +1,212 @@
+"""Cache parsed circuits on disk.
+
+Used in the Logic Simulator project to skip scanning and parsing a circuit
+definition file that has been parsed before. The devices, connections and
+monitors made by the parser are stored as plain data in a JSON file named by
+a hash of the definition file contents, and made again through the public
+methods of the simulator classes when the same contents are opened again.
+
+Classes
+-------
+NetlistCache - stores and loads parsed circuits by the hash of their file.
+"""
+import gc
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+from logsim.names import Names
+from logsim.devices import Device, Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+
+
+class NetlistCache:
+
+    """Store and load parsed circuits by the hash of their definition file.
+
+    Only circuits parsed without errors are stored. A cache file holds only
+    data, as a JSON object with these members:
+
+    format: "logsim netlist cache".
+    version: VERSION, changed whenever the stored data changes.
+    names: every name string, in the order of their name IDs.
+    devices: [device ID, device kind, device property] of every device, in
+             the order they were made, as passed to Devices.make_device.
+    connections: [output device ID, output port ID, input device ID, input
+                 port ID] of every connection.
+    monitors: [device ID, port ID, identifier] of every monitor.
+
+    A cached circuit is made again in the given Names, Devices, Network and
+    Monitors objects by calling their lookup, make_device, make_connection
+    and make_monitor methods, so the simulator settings of the current run,
+    such as the trace encoding and the simulation mode, are kept. As the
+    devices are made in the order they were parsed, the random cold start-up
+    is the same as parsing gives for the same seed.
+
+    Cache files that cannot be read, or do not hold a circuit these objects
+    can be given, are ignored. The least recently used files beyond
+    max_entries are deleted.
+
+    Parameters
+    ----------
+    directory: directory of the cache files, or None for the logsim
+               directory of the user's cache directory.
+    max_entries: largest number of circuits kept.
+
+    Public methods
+    --------------
+    get_key(self, path): Returns the hash of the contents of the file.
+
+    load(self, path, names, devices, network, monitors): Makes the cached
+                                   circuit of the file, if any, in the given
+                                   objects and returns True if it was found.
+
+    save(self, path, names, devices, network, monitors): Stores the circuit
+                                   parsed from the file.
+    """
+
+    FORMAT = "logsim netlist cache"
+    VERSION = 3  # changed whenever the stored data changes
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 32):
+        """Set the cache directory, without creating it yet."""
+        if directory is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            directory = os.path.join(cache_home, "logsim")
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def get_key(self, path: str) -> str:
+        """Return the hash of the contents of the file at path."""
+        file_hash = hashlib.sha256(f"logsim netlist {self.VERSION}\n".encode())
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def get_cache_path(self, key: str) -> str:
+        """Return the path of the cache file of the given key."""
+        return os.path.join(self.directory, key + ".json")
+
+    def load(self, path: str, names: Names, devices: Devices, network: Network, monitors: Monitors) -> bool:
+        """Make the cached circuit of the file at path in the given objects.
+
+        Return True if the circuit was cached, and False, leaving the objects
+        unchanged, if it was not. Raise ValueError if the cache file holds a
+        circuit that passes is_valid but cannot be made, which only a file
+        changed by hand can.
+        """
+        try:
+            cache_path = self.get_cache_path(self.get_key(path))
+            with open(cache_path, encoding="utf-8") as cache_file:
+                circuit = json.load(cache_file)
+            os.utime(cache_path)  # mark as recently used
+        except (OSError, ValueError):
+            return False
+        if not self.is_valid(circuit, names):
+            return False
+
+        # The garbage collector would scan the many new objects repeatedly
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            names.lookup(circuit["names"])
+            errors = [devices.make_device(*device) != devices.NO_ERROR for device in circuit["devices"]]
+            errors += [network.make_connection(*connection) != network.NO_ERROR
+                       for connection in circuit["connections"]]
+            errors += [monitors.make_monitor(*monitor) != monitors.NO_ERROR for monitor in circuit["monitors"]]
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if any(errors):
+            raise ValueError(f"the circuit in the netlist cache file {cache_path} cannot be made")
+        return True
+
+    def is_valid(self, circuit, names: Names) -> bool:
+        """Return True if the data loaded from a cache file is a circuit of this version.
+
+        The names must start with the names already looked up, so that the
+        stored name IDs stay the same, and every device, connection and
+        monitor must refer to stored names.
+        """
+        if not (isinstance(circuit, dict) and circuit.get("format") == self.FORMAT
+                and circuit.get("version") == self.VERSION):
+            return False
+        name_strings = circuit.get("names")
+        if not (isinstance(name_strings, list) and all(isinstance(name, str) for name in name_strings)
+                and len(set(name_strings)) == len(name_strings)):
+            return False
+        if name_strings[:names.id_count] != [names.get_name_string(name_id) for name_id in range(names.id_count)]:
+            return False
+
+        def is_name_id(value, optional: bool = False) -> bool:
+            """Return True if the value is a stored name ID, or None when optional."""
+            return (value is None and optional) or (type(value) is int and 0 <= value < len(name_strings))
+
+        def is_table(key: str, checks: list) -> bool:
+            """Return True if the member is a list of rows whose fields pass the checks."""
+            rows = circuit.get(key)
+            return isinstance(rows, list) and all(
+                isinstance(row, list) and len(row) == len(checks)
+                and all(check(value) for check, value in zip(checks, row)) for row in rows)
+
+        return (is_table("devices", [is_name_id, is_name_id, lambda value: value is None or type(value) is int])
+                and is_table("connections", [is_name_id, lambda value: is_name_id(value, optional=True),
+                                             is_name_id, is_name_id])
+                and is_table("monitors", [is_name_id, lambda value: is_name_id(value, optional=True),
+                                          lambda value: isinstance(value, str)]))
+
+    def get_device_property(self, devices: Devices, device: Device) -> Optional[int]:
+        """Return the device property that Devices.make_device was given to make the device."""
+        if device.device_kind == devices.SWITCH:
+            return device.switch_state
+        if device.device_kind == devices.CLOCK:
+            return device.clock_half_period
+        if device.device_kind == devices.RC:
+            return device.trigger_cycle
+        if device.device_kind in devices.gate_types and device.device_kind != devices.XOR:
+            return len(device.inputs)
+        return None
+
+    def save(self, path: str, names: Names, devices: Devices, network: Network, monitors: Monitors) -> None:
+        """Store the circuit parsed from the file at path.
+
+        Errors writing the cache are ignored.
+        """
+        circuit = {"format": self.FORMAT,
+                   "version": self.VERSION,
+                   "names": [names.get_name_string(name_id) for name_id in range(names.id_count)],
+                   "devices": [[device.device_id, device.device_kind, self.get_device_property(devices, device)]
+                               for device in devices.devices_list],
+                   "connections": [[*connected_output, device.device_id, input_id]
+                                   for device in devices.devices_list
+                                   for input_id, connected_output in device.inputs.items()
+                                   if connected_output is not None],
+                   "monitors": [[device_id, port_id, identifier]
+                                for identifier, (device_id, port_id) in monitors.identifier_to_port.items()]}
+        try:
+            cache_path = self.get_cache_path(self.get_key(path))
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first, so that no other run reads a partial file
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as cache_file:
+                    json.dump(circuit, cache_file, separators=(",", ":"))
+                os.replace(temporary_path, cache_path)
+            except OSError:
+                os.remove(temporary_path)
+                raise
+            self.remove_old_entries()
+        except OSError:
+            pass
+
+    def remove_old_entries(self) -> None:
+        """Delete the least recently used cache files beyond max_entries."""
+        cache_paths = [os.path.join(self.directory, file_name) for file_name in os.listdir(self.directory)
+                       if file_name.endswith(".json")]
+        cache_paths.sort(key=os.path.getmtime, reverse=True)
+        for cache_path in cache_paths[self.max_entries:]:
+            os.remove(cache_path)
@@ -6,10 +6,14 @@ Classes
 --------
 Network - builds and executes the network.
 """
-from typing import Optional, Tuple
+import collections
+import heapq
+from typing import Callable, List, Optional, Tuple
 
+from logsim.compiled_network import CompiledNetwork
 from logsim.devices import Devices
 from logsim.names import Names
+from logsim.vectorized_network import VectorizedNetwork
 
 
 class Network:
@@ -41,6 +45,24 @@ class Network:
 
     check_network(self): Checks if all inputs in the network are connected.
 
+    set_iteration_limit(self, iteration_limit): Sets the number of iterations
+                                    the signals are given to settle in a cycle.
+
+    find_oscillating_loops(self): Returns the loops of devices that kept the
+                                  last cycle from settling.
+
+    get_state(self): Returns a compact binary snapshot of the simulation
+                     state.
+
+    set_state(self, state): Restores a snapshot returned by get_state().
+
+    get_unconnected_inputs(self): Returns every input that is not connected.
+
+    get_unused_outputs(self): Returns every output not connected to an input.
+
+    get_undriven_outputs(self): Returns every gate output that no switch,
+                                clock, RC or D-type drives.
+
     update_signal(self, signal, target): Updates the signal in the direction of
                                          the target.
 
@@ -61,8 +83,40 @@ class Network:
     update_clocks(self): If it is time to do so, sets clock signals to RISING
                          or FALLING.
 
+    update_rc(self): If it is time to do so, sets RC signals to FALLING.
+
+    get_scheduled_events(self, cycles): Returns the clock edges and RC
+                                        triggers in the next cycles.
+
+    set_idle_skipping(self, skip_idle): Turns skipping of cycles in which no
+                                        signal can change on or off.
+
+    get_idle_cycles(self, max_cycles): Returns the number of next cycles, up
+                                       to max_cycles, in which no signal can
+                                       change.
+
+    skip_cycles(self, cycles): Advances the clocks and RCs over idle cycles
+                               without executing the network.
+
     execute_network(self): Executes all the devices in the network for one
                            simulation cycle.
+
+    set_compiled_mode(self, compiled, vectorized): Turns execution of the
+                                                   network lowered into flat
+                                                   arrays on or off.
+
+    set_event_driven_mode(self, event_driven): Turns event-driven execution
+                                               of the network on or off.
+
+    set_levelized_mode(self, levelized, count_saved_iterations): Turns
+                                  execution of the gates in levelized order,
+                                  and counting the iterations it saves, on or
+                                  off.
+
+    get_execution_mode(self): Returns the mode execute_network runs in.
+
+    get_kind_order_gates(self, loops=None): Returns the gates that keep the
+                                            kind order in levelized mode.
     """
 
     def __init__(self, names: Names, devices: Devices):
@@ -75,6 +129,59 @@ class Network:
             self.names.unique_error_codes(6))
         self.steady_state = True  # for checking if signals have settled
 
+        # Number of iterations to wait for the signals to settle before
+        # declaring the network unstable
+        self.iteration_limit = 20
+        self.iterations = 0  # iterations taken by the last simulation cycle
+        # True if the last simulation cycle stopped because the signals
+        # returned to a state they were in earlier in the cycle
+        self.oscillating = False
+
+        # Cycles in which no clock edge or RC trigger is due are skipped by
+        # advancing the counters, as the settled signals cannot change
+        self.skip_idle = True
+
+        # In compiled mode the network is lowered into flat arrays, which are
+        # rebuilt whenever devices or connections are added
+        self.compiled_mode = False
+        self.vectorized_mode = False  # execute the gates with NumPy
+        self.compiled_network = None
+
+        # In event-driven mode only the devices whose inputs changed are
+        # executed again. The fanout map is rebuilt whenever devices or
+        # connections are added
+        self.event_driven_mode = False
+        self.fanout = None  # {(device_id, port_id): [execution positions]}
+        self.execution_list = []  # [(device_id, execution function)]
+        self.source_positions = []  # [(position, device_id)] of the clocks and RCs
+        self.unconnected = False  # True if any input is unconnected
+        self.dirty_positions = set()  # devices left to execute by the last cycle
+        self.source_signals = {}  # {device_id: clock or RC output at the end of the last cycle}
+
+        # In levelized mode the gates are executed in the order of the
+        # connections between them. The order is rebuilt whenever devices or
+        # connections are added
+        self.levelized_mode = False
+        self.levelized_list = None  # [(device_id, execution function)]
+        self.count_saved_iterations = False
+        # Iterations the kind order took more than the levelized order in the
+        # last cycle, if counted. The kind order stops at the iteration limit
+        self.iterations_saved = None
+
+        # Method executing one simulation cycle in each execution mode
+        self.execute_functions = {"compiled": self.execute_compiled_network,
+                                  "event-driven": self.execute_event_driven_network,
+                                  "levelized": self.execute_levelized_network,
+                                  "interpreted": self.execute_interpreted_network}
+
+        # Number of connections made, so that users of the connections, such
+        # as the monitor gather plan, can tell when to rebuild
+        self.connection_count = 0
+
+        # Number of inputs connected to each output, updated by
+        # make_connection: {(device_id, output_id): number of inputs}
+        self.output_loads = collections.Counter()
+
     def get_connected_output(self, device_id: int, input_id: int) -> Optional[Tuple[int, Optional[int]]]:
         """Return the output connected to the given input.
 
@@ -131,6 +238,13 @@ class Network:
                     error_type = self.INPUT_CONNECTED
                 else:
                     input_device.inputs[input_port_id] = (output_device_id, output_port_id)
+                    self.compiled_network = None
+                    self.fanout = None
+                    self.levelized_list = None
+                    self.connection_count += 1
+                    self.output_loads[(output_device_id, output_port_id)] += 1
+                    self.devices.unconnected_inputs.pop((input_device_id, input_port_id), None)
+                    self.devices.unused_outputs.pop((output_device_id, output_port_id), None)
                     error_type = self.NO_ERROR
             else:
                 error_type = self.INPUT_PORT_ABSENT
@@ -142,12 +256,61 @@ class Network:
 
     def check_network(self) -> bool:
         """Return True if all inputs in the network are connected."""
-        for device_id in self.devices.find_devices():
-            device = self.devices.get_device(device_id)
-            for input_id in device.inputs:
-                if self.get_connected_output(device_id, input_id) is None:
-                    return False
-        return True
+        return not self.devices.unconnected_inputs
+
+    def get_state(self) -> bytes:
+        """Return a compact binary snapshot of the simulation state.
+
+        See Devices.get_state(). Every engine keeps its own state in the
+        Device objects between cycles, so the snapshot is complete.
+        """
+        return self.devices.get_state()
+
+    def set_state(self, state: bytes) -> None:
+        """Restore a snapshot returned by get_state().
+
+        Simulation continues from the restored state in every mode: the
+        compiled network reloads its signal slots and the event-driven
+        mode executes every device in the next cycle.
+        """
+        self.devices.set_state(state)
+        if self.compiled_network is not None:
+            self.compiled_network.load_state()
+        self.fanout = None
+
+    def get_unconnected_inputs(self) -> List[Tuple[int, int]]:
+        """Return the (device_id, input_id) of every unconnected input, in the order the inputs were added."""
+        return list(self.devices.unconnected_inputs)
+
+    def get_unused_outputs(self) -> List[Tuple[int, Optional[int]]]:
+        """Return the (device_id, output_id) of every output not connected to any input.
+
+        The outputs are in the order they were added.
+        """
+        return list(self.devices.unused_outputs)
+
+    def get_undriven_outputs(self) -> List[Tuple[int, Optional[int]]]:
+        """Return the (device_id, output_id) of every gate output no switch, clock, RC or D-type drives.
+
+        Such gates are only connected to each other, so their outputs only
+        keep the levels they start with. The outputs are in the order the
+        devices were made.
+        """
+        devices_list = self.devices.devices_list
+        loads = collections.defaultdict(list)  # {output device ID: [input device IDs]}
+        for device in devices_list:
+            for connected_output in device.inputs.values():
+                if connected_output is not None:
+                    loads[connected_output[0]].append(device.device_id)
+        driven = {device.device_id for device in devices_list if device.device_kind not in self.devices.gate_types}
+        pending = list(driven)
+        while pending:
+            for device_id in loads.get(pending.pop(), []):
+                if device_id not in driven:
+                    driven.add(device_id)
+                    pending.append(device_id)
+        return [(device.device_id, output_id) for device in devices_list if device.device_id not in driven
+                for output_id in device.outputs]
 
     def update_signal(self, signal: int, target: int) -> Optional[int]:
         """Update the signal in the direction of the target.
@@ -200,13 +363,27 @@ class Network:
             device.outputs[None] = updated_signal
             return True
 
-    def execute_gate(self, device_id: int, x: Optional[int] = None, y: Optional[int] = None) -> bool:
+    def settle_signal(self, signal: int) -> int:
+        """Return the level the signal is settling to.
+
+        RISING signals settle to HIGH and FALLING signals settle to LOW.
+        """
+        if signal == self.devices.RISING:
+            return self.devices.HIGH
+        elif signal == self.devices.FALLING:
+            return self.devices.LOW
+        return signal
+
+    def execute_gate(self, device_id: int, x: Optional[int] = None, y: Optional[int] = None,
+                     settle_inputs: bool = False) -> bool:
         """Simulate a logic gate and update its output signal value.
 
         The rule is: if all its inputs are x, then its output is y, else its
         output is the inverse of y.
         Note: (x,y) pairs for AND, OR, NOR, NAND, XOR are: (HIGH, HIGH), (LOW,
         LOW), (LOW, HIGH), (HIGH, LOW), (None, None).
+        If settle_inputs is True, RISING and FALLING inputs are read as the
+        levels they are settling to.
         Return True if successful.
         """
         device = self.devices.get_device(device_id)
@@ -218,6 +395,8 @@ class Network:
         input_signal_list = []
         for input_id in device.inputs:
             input_signal = self.get_input_signal(device_id, input_id)
+            if settle_inputs:
+                input_signal = self.settle_signal(input_signal)
             input_signal_list.append(input_signal)
             if device.device_kind != self.devices.XOR:
                 if input_signal != x:
@@ -338,43 +517,565 @@ class Network:
             return False
 
     def update_clocks(self) -> None:
-        """If it is time to do so, set clock signals to RISING or FALLING."""
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
-        for device_id in clock_devices:
-            device = self.devices.get_device(device_id)
-            if device.clock_counter == device.clock_half_period:
-                device.clock_counter = 0
-                output_signal = self.get_output_signal(device_id,
-                                                       output_id=None)
-                if output_signal == self.devices.HIGH:
-                    device.outputs[None] = self.devices.FALLING
-                elif output_signal == self.devices.LOW:
-                    device.outputs[None] = self.devices.RISING
-            device.clock_counter += 1
+        """If it is time to do so, set clock signals to RISING or FALLING.
+
+        This starts the next cycle of the scheduler of the devices, and only
+        the clocks whose counter reaches its half period in it are updated.
+        """
+        scheduler = self.devices.scheduler
+        scheduler.advance()
+        for device in scheduler.pop_clock_events():
+            output_signal = device.outputs[None]
+            if output_signal == self.devices.HIGH:
+                device.outputs[None] = self.devices.FALLING
+            elif output_signal == self.devices.LOW:
+                device.outputs[None] = self.devices.RISING
 
     def update_rc(self) -> None:
         """If it is time to lower the RC signal to LOW, set it to LOW."""
-        rc_devices = self.devices.find_devices(self.devices.RC)
-        for device_id in rc_devices:
+        for device in self.devices.scheduler.pop_rc_events():
+            device.outputs[None] = self.devices.FALLING
+
+    def get_scheduled_events(self, cycles: int) -> List[Tuple[int, int]]:
+        """Return the (cycle, device ID) of every clock edge and RC trigger in the next cycles.
+
+        Cycles are counted from the next one, which is 1, and the events are
+        in order of cycle.
+        """
+        return self.devices.scheduler.get_events(cycles)
+
+    def set_idle_skipping(self, skip_idle: bool = True) -> None:
+        """Turn skipping of cycles in which no signal can change on or off."""
+        self.skip_idle = skip_idle
+
+    def get_idle_cycles(self, max_cycles: int) -> int:
+        """Return the number of next cycles, up to max_cycles, in which no signal can change.
+
+        Must be called straight after a successful execute_network(), or
+        skip_cycles(), with no switch or state changed since. The signals
+        are then settled, and a sweep changes nothing until the next cycle
+        in which a clock counter reaches its half period or an RC counter
+        its trigger cycle. Return 0 if idle skipping is off.
+        """
+        if not self.skip_idle or not self.steady_state:
+            return 0
+        idle_cycles = self.devices.scheduler.get_idle_cycles()
+        if idle_cycles is None:
+            return max_cycles
+        return max(min(idle_cycles, max_cycles), 0)
+
+    def skip_cycles(self, cycles: int) -> None:
+        """Advance the clocks and RCs over idle cycles without executing the network.
+
+        cycles must be no more than get_idle_cycles() returned, so that the
+        signals are the same as if the cycles had been executed.
+        """
+        self.devices.scheduler.skip(cycles)
+
+    def set_compiled_mode(self, compiled: bool = True, vectorized: bool = False) -> None:
+        """Turn execution of the network lowered into flat arrays on or off.
+
+        If vectorized is True, the gates are executed in batches with NumPy.
+        """
+        self.compiled_mode = compiled
+        self.vectorized_mode = compiled and vectorized
+        self.compiled_network = None
+
+    def execute_compiled_network(self) -> bool:
+        """Execute the network lowered into flat arrays for one simulation cycle.
+
+        The network is compiled on first use, and again whenever devices or
+        connections have been added since. Return True if successful and the
+        network does not oscillate.
+        """
+        if self.compiled_network is None or self.compiled_network.is_stale():
+            if self.vectorized_mode:
+                self.compiled_network = VectorizedNetwork(self.devices)
+            else:
+                self.compiled_network = CompiledNetwork(self.devices)
+
+        self.update_clocks()
+        self.update_rc()
+
+        self.steady_state = self.compiled_network.execute(self.iteration_limit)
+        self.iterations = self.compiled_network.iterations
+        self.oscillating = self.compiled_network.oscillating
+        return self.steady_state
+
+    def set_event_driven_mode(self, event_driven: bool = True) -> None:
+        """Turn event-driven execution of the network on or off."""
+        self.event_driven_mode = event_driven
+        self.fanout = None
+
+    def build_fanout(self) -> None:
+        """Build the fanout map used by event-driven execution.
+
+        Devices are given positions in the order execute_network executes
+        them, and every output is mapped to the positions of the devices
+        connected to it. All devices are marked to be executed.
+        """
+        devices = self.devices
+        self.execution_list = self.get_execution_list()
+
+        self.fanout = {}
+        self.source_positions = []
+        self.unconnected = False
+        for position, (device_id, __) in enumerate(self.execution_list):
             device = self.devices.get_device(device_id)
-            if device.rc_counter == device.trigger_cycle:
-                device.outputs[None] = self.devices.FALLING
-            device.rc_counter += 1
+            for port_id in device.outputs:
+                self.fanout.setdefault((device_id, port_id), [])
+            for connected_output in device.inputs.values():
+                if connected_output is None:
+                    self.unconnected = True
+                else:
+                    self.fanout.setdefault(connected_output, []).append(position)
+            if device.device_kind in [devices.CLOCK, devices.RC]:
+                self.source_positions.append((position, device_id))
+
+        self.dirty_positions = set(range(len(self.execution_list)))
+        self.source_signals = {}
+
+    def get_gate_function(self, x: Optional[int], y: Optional[int],
+                          settle_inputs: bool = False) -> Callable[[int], bool]:
+        """Return a function executing the gate of the given device ID with the given rule (see execute_gate).
+
+        A closure is called faster than a partial function with keyword
+        arguments, which would merge them into a new dictionary every call.
+        """
+        execute_gate = self.execute_gate
+        return lambda device_id: execute_gate(device_id, x, y, settle_inputs)
+
+    def get_execution_list(self) -> List[Tuple[int, Callable[[int], bool]]]:
+        """Return the (device_id, execution function) of every device, in the order execute_network executes them."""
+        devices = self.devices
+        execution_order = [(devices.SWITCH, self.execute_switch),
+                           (devices.D_TYPE, self.execute_d_type),
+                           (devices.CLOCK, self.execute_clock),
+                           (devices.AND, self.get_gate_function(devices.HIGH, devices.HIGH)),
+                           (devices.OR, self.get_gate_function(devices.LOW, devices.LOW)),
+                           (devices.NAND, self.get_gate_function(devices.HIGH, devices.LOW)),
+                           (devices.NOR, self.get_gate_function(devices.LOW, devices.HIGH)),
+                           (devices.XOR, self.execute_gate),
+                           (devices.RC, self.execute_rc)]
+
+        execution_list = []
+        for device_kind, execute_function in execution_order:
+            for device_id in devices.find_devices(device_kind):
+                execution_list.append((device_id, execute_function))
+        return execution_list
+
+    def set_iteration_limit(self, iteration_limit: int) -> None:
+        """Set the number of iterations the signals are given to settle in every cycle."""
+        if iteration_limit < 1:
+            raise ValueError("Expected the iteration limit to be a positive integer.")
+        self.iteration_limit = iteration_limit
+
+    def get_signal_state(self) -> tuple:
+        """Return every output signal and D-type memory in the network."""
+        state = []
+        for device in self.devices.devices_list:
+            state.extend(device.outputs.values())
+            state.append(device.dtype_memory)
+        return tuple(state)
+
+    def is_repeated_state(self, seen_states: set) -> bool:
+        """Return True if the network is in a state it was in earlier in the cycle.
+
+        seen_states holds the earlier states, found by their hashes and
+        compared in full, and the current state is added to it. A sweep only
+        depends on the state before it, so a repeated state means the
+        signals oscillate and will never settle.
+        """
+        state = self.get_signal_state()
+        if state in seen_states:
+            return True
+        seen_states.add(state)
+        return False
+
+    def find_oscillating_loops(self) -> List[List[int]]:
+        """Return the loops of devices whose signals kept the last cycle from settling.
+
+        One more sweep of execute_network is run from the current signals,
+        and undone afterwards, to find the devices whose outputs still
+        change. Every loop of gates, as found by find_gate_loops, holding
+        such a device is returned. If the changing devices are in no loop
+        of gates, for example because the loop passes through a D-type,
+        they are returned as a single group.
+        """
+        devices_list = self.devices.devices_list
+        old_outputs = [dict(device.outputs) for device in devices_list]
+        old_memories = [device.dtype_memory for device in devices_list]
+        steady_state = self.steady_state
+        for device_id, execute_function in self.get_execution_list():
+            execute_function(device_id)
+        changing_ids = {device.device_id for device, outputs in zip(devices_list, old_outputs)
+                        if device.outputs != outputs}
+        for device, outputs, memory in zip(devices_list, old_outputs, old_memories):
+            device.outputs.update(outputs)  # the same dictionaries, which compiled networks refer to
+            device.dtype_memory = memory
+        self.steady_state = steady_state
+
+        loops = []
+        for loop in self.find_gate_loops():
+            if len(loop) == 1 and (loop[0], None) not in self.devices.get_device(loop[0]).inputs.values():
+                continue  # not a loop
+            if changing_ids.intersection(loop):
+                loops.append(loop)
+                changing_ids.difference_update(loop)
+        if changing_ids:
+            loops.append([device.device_id for device in devices_list if device.device_id in changing_ids])
+        return loops
+
+    def execute_event_driven_network(self) -> bool:
+        """Execute only the devices whose inputs changed for one simulation cycle.
+
+        Every sweep executes the marked devices in the same order as
+        execute_network, so signals settle, or fail to settle, after exactly
+        the same number of iterations. A device is marked when one of its
+        inputs changes, and stays marked while its output is RISING or
+        FALLING. Switches and D-types are always executed in the first sweep,
+        and clocks and RCs whose outputs changed between cycles mark the
+        devices they drive. Return True if successful and the network does
+        not oscillate.
+        """
+        if self.fanout is None or len(self.execution_list) != len(self.devices.devices_list):
+            self.build_fanout()
+
+        self.oscillating = False
+        self.update_clocks()
+        self.update_rc()
+
+        if self.unconnected:
+            return False
+
+        dirty_positions = self.get_first_dirty_positions()
+        # The state is hashed incrementally: every change of an output or
+        # D-type memory swaps its old hash for its new one, so equal states
+        # in the cycle have equal hashes without hashing every device. Equal
+        # hashes are confirmed from the changes made in the cycle
+        state_hash = 0
+        changes = []  # [(position, port ID or "memory", old level)] made in the cycle
+        seen_states = collections.defaultdict(list)  # {state hash: [number of changes made before the state]}
+        iterations = 0
+        while iterations < self.iteration_limit:
+            iterations += 1
+            self.steady_state = True
+            sweep = self.execute_dirty_positions(dirty_positions, state_hash, changes)
+            if sweep is None:
+                self.fanout = None
+                return False
+            dirty_positions, state_hash = sweep
+            if self.steady_state:
+                break
+            if iterations > 1:
+                if self.is_repeated_change_state(seen_states[state_hash], changes):
+                    self.oscillating = True
+                    break
+                seen_states[state_hash].append(len(changes))
+
+        self.iterations = iterations
+        self.dirty_positions = dirty_positions
+        for __, device_id in self.source_positions:
+            self.source_signals[device_id] = self.devices.get_device(device_id).outputs[None]
+        return self.steady_state
+
+    def get_first_dirty_positions(self) -> set:
+        """Return the positions of the devices to execute in the first sweep of an event-driven cycle.
+
+        These are the devices left to execute by the last cycle, every
+        switch and D-type, and the clocks and RCs whose outputs changed
+        between cycles with the devices they drive.
+        """
+        # Switches and D-types come first in the execution order
+        switch_count = len(self.devices.find_devices(self.devices.SWITCH))
+        dtype_count = len(self.devices.find_devices(self.devices.D_TYPE))
+        dirty_positions = self.dirty_positions
+        dirty_positions.update(range(switch_count + dtype_count))
+        for position, device_id in self.source_positions:
+            if self.devices.get_device(device_id).outputs[None] != self.source_signals.get(device_id):
+                dirty_positions.add(position)
+                dirty_positions.update(self.fanout[(device_id, None)])
+        return dirty_positions
+
+    def execute_dirty_positions(self, dirty_positions: set, state_hash: int,
+                                changes: List[tuple]) -> Optional[Tuple[set, int]]:
+        """Execute the devices at the dirty positions in one event-driven sweep.
+
+        Devices after the current one whose inputs change are executed in
+        this sweep, the others in the next one, and every change is added to
+        changes. Return the positions to execute in the next sweep with the
+        state hash updated for the changes, or None if a device failed to
+        execute.
+        """
+        queue = list(dirty_positions)
+        heapq.heapify(queue)
+        next_dirty_positions = set()
+        while queue:
+            position = heapq.heappop(queue)
+            device_id, execute_function = self.execution_list[position]
+            device = self.devices.get_device(device_id)
+            old_outputs = dict(device.outputs)
+            old_memory = device.dtype_memory
+            if not execute_function(device_id):
+                return None
+            if device.dtype_memory != old_memory:
+                changes.append((position, "memory", old_memory))
+                state_hash ^= hash((position, "memory", old_memory)) ^ hash((position, "memory", device.dtype_memory))
+            for port_id, signal in device.outputs.items():
+                if signal != old_outputs[port_id]:
+                    changes.append((position, port_id, old_outputs[port_id]))
+                    state_hash ^= self.mark_changed_output(position, port_id, old_outputs[port_id], signal,
+                                                           dirty_positions, next_dirty_positions, queue)
+        return next_dirty_positions, state_hash
+
+    def mark_changed_output(self, position: int, port_id: Optional[int], old_signal: int, signal: int,
+                            dirty_positions: set, next_dirty_positions: set, queue: List[int]) -> int:
+        """Mark the devices driven by an output that changed in an event-driven sweep.
+
+        Devices after the changed one are pushed onto the queue of this
+        sweep, and the others marked for the next sweep, as is the changed
+        device itself while its output is RISING or FALLING. Return the
+        change of the state hash.
+        """
+        if signal in [self.devices.RISING, self.devices.FALLING]:
+            next_dirty_positions.add(position)
+        device_id = self.execution_list[position][0]
+        for fanout_position in self.fanout[(device_id, port_id)]:
+            if fanout_position > position and fanout_position not in dirty_positions:
+                dirty_positions.add(fanout_position)
+                heapq.heappush(queue, fanout_position)
+            elif fanout_position <= position:
+                next_dirty_positions.add(fanout_position)
+        return hash((position, port_id, old_signal)) ^ hash((position, port_id, signal))
+
+    def is_repeated_change_state(self, change_counts: List[int], changes: List[tuple]) -> bool:
+        """Return True if the state after any of the given numbers of changes in the cycle is the current state.
+
+        That state differs from the current one only in the levels changed
+        since, each of which was the old level of its first later change.
+        """
+        for change_count in change_counts:
+            earlier_levels = {}
+            for position, port_id, old_level in changes[change_count:]:
+                earlier_levels.setdefault((position, port_id), old_level)
+            if all(self.get_changed_level(position, port_id) == level
+                   for (position, port_id), level in earlier_levels.items()):
+                return True
+        return False
+
+    def get_changed_level(self, position: int, port_id) -> int:
+        """Return the current level of an output or, for port ID "memory", D-type memory in a change."""
+        device = self.devices.get_device(self.execution_list[position][0])
+        return device.dtype_memory if port_id == "memory" else device.outputs[port_id]
+
+    def set_levelized_mode(self, levelized: bool = True, count_saved_iterations: bool = False) -> None:
+        """Turn execution of the gates in levelized order on or off.
+
+        Gates whose order could change the results keep the kind order of
+        execute_network. If count_saved_iterations is True, every cycle also
+        counts the iterations the kind order would have taken, which doubles
+        its cost, and stores how many fewer were taken in iterations_saved.
+        """
+        self.levelized_mode = levelized
+        self.levelized_list = None
+        self.count_saved_iterations = levelized and count_saved_iterations
+        self.iterations_saved = None
+
+    def find_gate_loops(self) -> List[List[int]]:
+        """Return the gates grouped into loops, in levelized order.
+
+        Gates are connected to the gates driving their inputs. Switches,
+        clocks, RCs and D-types cut the connection graph, since their outputs
+        do not follow their inputs within a sweep. Every group is either a
+        single gate outside any loop, or all the gates of one loop, in the
+        order execute_network executes them. A group only depends on the
+        groups before it.
+        """
+        gate_kinds = [self.devices.AND, self.devices.OR, self.devices.NAND,
+                      self.devices.NOR, self.devices.XOR]
+        gate_ids = []
+        for device_kind in gate_kinds:
+            gate_ids += self.devices.find_devices(device_kind)
+        position = {gate_id: index for index, gate_id in enumerate(gate_ids)}
+        drivers = [[position[connected_output[0]]
+                    for connected_output in self.devices.get_device(gate_id).inputs.values()
+                    if connected_output is not None and connected_output[0] in position]
+                   for gate_id in gate_ids]
+
+        return [[gate_ids[member] for member in sorted(loop)] for loop in self.find_loops(drivers)]
+
+    def find_loops(self, drivers: List[List[int]]) -> List[List[int]]:
+        """Return the loops of the graph in which node n is connected to the nodes drivers[n].
+
+        Loops are the strongly connected components, found by Tarjan's
+        algorithm, drivers first. It is run without recursion so that long
+        chains of gates do not exceed the recursion limit.
+        """
+        index_of = [None] * len(drivers)
+        lowlink = [0] * len(drivers)
+        on_stack = [False] * len(drivers)
+        stack = []
+        loops = []
+        next_index = 0
+        for root in range(len(drivers)):
+            if index_of[root] is not None:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, driver_number = work.pop()
+                if driver_number == 0:
+                    index_of[node] = lowlink[node] = next_index
+                    next_index += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                elif on_stack[drivers[node][driver_number - 1]]:  # back from a driver
+                    lowlink[node] = min(lowlink[node], lowlink[drivers[node][driver_number - 1]])
+                if driver_number < len(drivers[node]):
+                    work.append((node, driver_number + 1))
+                    driver = drivers[node][driver_number]
+                    if index_of[driver] is None:
+                        work.append((driver, 0))
+                elif lowlink[node] == index_of[node]:
+                    loops.append(self.pop_loop(stack, on_stack, node))
+        return loops
+
+    def pop_loop(self, stack: List[int], on_stack: List[bool], root: int) -> List[int]:
+        """Pop the nodes of the loop found at root off the stack of find_loops."""
+        loop = []
+        while True:
+            node = stack.pop()
+            on_stack[node] = False
+            loop.append(node)
+            if node == root:
+                return loop
+
+    def get_kind_order_gates(self, loops: Optional[List[List[int]]] = None) -> set:
+        """Return the gates that keep the kind order in levelized mode.
+
+        The settled outputs of gates outside loops do not depend on the order
+        in which the gates are executed, but the RISING and FALLING signals
+        on the way do. Gates in loops see them, as do gates driving the CLK,
+        SET or CLEAR of a D-type, or the DATA of a D-type not clocked by a
+        switch, clock or RC. These gates, and every gate driving them, keep
+        the kind order. None of them is driven by a levelized gate, so their
+        signals change exactly as in the kind order, and the levelized gates
+        settle to the same levels. loops is the result of find_gate_loops(),
+        if known.
+        """
+        devices = self.devices
+        if loops is None:
+            loops = self.find_gate_loops()
+        kind_order_gates = set()
+        for loop in loops:
+            if len(loop) > 1 or (loop[0], None) in devices.get_device(loop[0]).inputs.values():
+                kind_order_gates.update(loop)
+
+        for device_id in devices.find_devices(devices.D_TYPE):
+            inputs = devices.get_device(device_id).inputs
+            watched_inputs = [devices.CLK_ID, devices.SET_ID, devices.CLEAR_ID]
+            clock_output = inputs.get(devices.CLK_ID)
+            if (clock_output is None or devices.get_device(clock_output[0]).device_kind
+                    not in [devices.SWITCH, devices.CLOCK, devices.RC]):
+                watched_inputs.append(devices.DATA_ID)
+            kind_order_gates.update(inputs[input_id][0] for input_id in watched_inputs
+                                    if inputs.get(input_id) is not None)
+
+        # Every loop comes after the loops driving it, so the drivers of the
+        # gates keeping the kind order are found in one pass backwards
+        for loop in reversed(loops):
+            for gate_id in loop:
+                if gate_id in kind_order_gates:
+                    kind_order_gates.update(connected_output[0]
+                                            for connected_output in devices.get_device(gate_id).inputs.values()
+                                            if connected_output is not None)
+        return {gate_id for loop in loops for gate_id in loop if gate_id in kind_order_gates}
+
+    def build_levelized_list(self) -> None:
+        """Build the list of devices executed in levelized order.
+
+        Switches, D-types and clocks are executed first and RCs last, as in
+        execute_network. The gates that keep the kind order (see
+        get_kind_order_gates) come next, in the order of execute_network, and
+        are settled by repeated sweeps. The other gates follow in levelized
+        order, reading their inputs as the levels they are settling to, so a
+        change crosses any depth of them in a single sweep.
+        """
+        devices = self.devices
+        gate_rules = {devices.AND: (devices.HIGH, devices.HIGH), devices.OR: (devices.LOW, devices.LOW),
+                      devices.NAND: (devices.HIGH, devices.LOW), devices.NOR: (devices.LOW, devices.HIGH),
+                      devices.XOR: (None, None)}
+
+        self.levelized_list = []
+        for device_kind, execute_function in [(devices.SWITCH, self.execute_switch),
+                                              (devices.D_TYPE, self.execute_d_type),
+                                              (devices.CLOCK, self.execute_clock)]:
+            for device_id in devices.find_devices(device_kind):
+                self.levelized_list.append((device_id, execute_function))
+        loops = self.find_gate_loops()
+        kind_order_gates = self.get_kind_order_gates(loops)
+        for device_kind in [devices.AND, devices.OR, devices.NAND, devices.NOR, devices.XOR]:
+            execute_gate = self.get_gate_function(*gate_rules[device_kind])
+            for gate_id in devices.find_devices(device_kind):
+                if gate_id in kind_order_gates:
+                    self.levelized_list.append((gate_id, execute_gate))
+        for loop in loops:
+            for gate_id in loop:
+                if gate_id not in kind_order_gates:
+                    x, y = gate_rules[devices.get_device(gate_id).device_kind]
+                    self.levelized_list.append((gate_id, self.get_gate_function(x, y, settle_inputs=True)))
+        for device_id in devices.find_devices(devices.RC):
+            self.levelized_list.append((device_id, self.execute_rc))
+
+    def execute_levelized_network(self) -> bool:
+        """Execute all the devices in levelized order for one simulation cycle.
+
+        If the saved iterations are counted, the cycle is first executed in
+        the kind order from a snapshot of the state, which is then restored.
+        Return True if successful and the network does not oscillate.
+        """
+        if self.levelized_list is None or len(self.levelized_list) != len(self.devices.devices_list):
+            self.build_levelized_list()
+
+        if self.count_saved_iterations:
+            state = self.get_state()
+            self.execute_interpreted_network()
+            kind_order_iterations = self.iterations
+            self.set_state(state)
+
+        self.oscillating = False
+        self.update_clocks()
+        self.update_rc()
+        steady_state = self.sweep_until_settled(self.levelized_list)
+        if self.count_saved_iterations:
+            self.iterations_saved = kind_order_iterations - self.iterations
+        return steady_state
+
+    def get_execution_mode(self) -> str:
+        """Return the mode execute_network runs in.
+
+        Compiled mode takes precedence over event-driven mode, which takes
+        precedence over levelized mode. With none of them turned on, the
+        network is interpreted.
+        """
+        modes = [("compiled", self.compiled_mode), ("event-driven", self.event_driven_mode),
+                 ("levelized", self.levelized_mode)]
+        return next((mode for mode, turned_on in modes if turned_on), "interpreted")
 
     def execute_network(self) -> bool:
         """Execute all the devices in the network for one simulation cycle.
 
         Return True if successful and the network does not oscillate.
         """
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
-        switch_devices = self.devices.find_devices(self.devices.SWITCH)
-        d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
-        and_devices = self.devices.find_devices(self.devices.AND)
-        or_devices = self.devices.find_devices(self.devices.OR)
-        nand_devices = self.devices.find_devices(self.devices.NAND)
-        nor_devices = self.devices.find_devices(self.devices.NOR)
-        xor_devices = self.devices.find_devices(self.devices.XOR)
-        rc_devices = self.devices.find_devices(self.devices.RC)
+        return self.execute_functions[self.get_execution_mode()]()
+
+    def execute_interpreted_network(self) -> bool:
+        """Execute all the devices in the order of their kinds for one simulation cycle.
+
+        D-types are executed before clocks to catch the rising edge of the
+        clock. Return True if successful and the network does not oscillate.
+        """
+        execution_list = self.get_execution_list()
+        self.oscillating = False
 
         # This sets clock signals to RISING or FALLING, where necessary
         self.update_clocks()
@@ -382,48 +1083,28 @@ class Network:
         # Checks if any RC has to be triggered
         self.update_rc()
 
-        # Number of iterations to wait for the signals to settle before
-        # declaring the network unstable
-        iteration_limit = 20
+        return self.sweep_until_settled(execution_list)
 
+    def sweep_until_settled(self, execution_list: List[Tuple[int, Callable[[int], bool]]]) -> bool:
+        """Execute the devices in the order of execution_list until the signals settle.
+
+        The sweeps stop early if the network returns to a state it was in
+        earlier in the cycle. Return True if successful and the network does
+        not oscillate.
+        """
+        seen_states = set()
         iterations = 0
-        while iterations < iteration_limit:
+        while iterations < self.iteration_limit:
             iterations += 1
             self.steady_state = True
-
-            for device_id in switch_devices:  # execute switch devices
-                if not self.execute_switch(device_id):
-                    return False
-            # Execute D-type devices before clocks to catch the rising edge of
-            # the clock
-            for device_id in d_type_devices:  # execute DTYPE devices
-                if not self.execute_d_type(device_id):
-                    return False
-            for device_id in clock_devices:  # complete clock executions
-                if not self.execute_clock(device_id):
-                    return False
-            for device_id in and_devices:  # execute AND gate devices
-                if not self.execute_gate(device_id, self.devices.HIGH,
-                                         self.devices.HIGH):
-                    return False
-            for device_id in or_devices:  # execute OR gate devices
-                if not self.execute_gate(device_id, self.devices.LOW,
-                                         self.devices.LOW):
-                    return False
-            for device_id in nand_devices:  # execute NAND gate devices
-                if not self.execute_gate(device_id, self.devices.HIGH,
-                                         self.devices.LOW):
-                    return False
-            for device_id in nor_devices:  # execute NOR gate devices
-                if not self.execute_gate(device_id, self.devices.LOW,
-                                         self.devices.HIGH):
-                    return False
-            for device_id in xor_devices:  # execute XOR devices
-                if not self.execute_gate(device_id, None, None):
-                    return False
-            for device_id in rc_devices:  # execute RC devices
-                if not self.execute_rc(device_id):
+            for device_id, execute_function in execution_list:
+                if not execute_function(device_id):
                     return False
             if self.steady_state:
                 break
+            # Cycles settling within two sweeps are never hashed
+            if iterations > 1 and self.is_repeated_state(seen_states):
+                self.oscillating = True
+                break
+        self.iterations = iterations
         return self.steady_state
@@ -9,16 +9,16 @@ Classes
 Parser - parses the definition file and builds the logic network.
 """
 
-from typing import List, Union
+from typing import List, Optional, Union
 from collections import OrderedDict
-from copy import copy
 
 from logsim.names import Names
 from logsim.devices import Devices
 from logsim.network import Network
 from logsim.monitors import Monitors
 from logsim.scanner import Scanner
-from logsim.parser_handler import ParserErrorHandler, LineTerminalOutput, FileTerminalOutput
+from logsim.netlist_cache import NetlistCache
+from logsim.parser_handler import ParserErrorHandler, LineTerminalOutput, FileTerminalOutput, FileTerminalWarning
 from logsim.scanner import Symbol
 
 
@@ -32,6 +32,10 @@ class Parser:
     the parser detects this and tries to recover from it, giving helpful
     error messages.
 
+    The scanner translates the whole file into a TokenStream first, and the
+    parser loads each symbol from it in turn into the same Symbol object.
+    Symbols kept for later are read back from the stream by their index.
+
     Parameters
     ----------
     names: instance of the names.Names() class.
@@ -39,10 +43,16 @@ class Parser:
     network: instance of the network.Network() class.
     monitors: instance of the monitors.Monitors() class.
     scanner: instance of the scanner.Scanner() class.
+    cache: instance of the netlist_cache.NetlistCache() class, or None to
+           always parse the file.
 
     Public methods
     --------------
     parse_network(self): Parses the circuit definition file.
+
+    fetch_error_output(self): Returns the errors found in the file.
+
+    fetch_warning_output(self): Returns the warnings about the circuit.
     """
 
     DTYPE_PIN_IN = ["DATA", "CLK", "SET", "CLEAR"]
@@ -52,16 +62,20 @@ class Parser:
     INITIAL_STATE = ["0", "1"]
     RC = "RC"
 
-    def __init__(self, names: Names, devices: Devices, network: Network, monitors: Monitors, scanner: Scanner):
+    def __init__(self, names: Names, devices: Devices, network: Network, monitors: Monitors, scanner: Scanner,
+                 cache: Optional[NetlistCache] = None):
         """Initialise constants."""
         self.names = names
         self.devices = devices
         self.network = network
         self.monitors = monitors
         self.scanner = scanner
+        self.cache = cache
         self.error_handler = ParserErrorHandler(names=names, devices=devices, network=network, monitors=monitors,
                                                 scanner=scanner)
         self.symbol = None
+        self.tokens = None  # TokenStream of the whole file
+        self.token_index = -1  # index of the current symbol in tokens
         self.block_parse_flags = {"DEVICE": False,
                                   "SWITCH": False,
                                   "CLOCK": False,
@@ -77,46 +91,54 @@ class Parser:
         self.current_device_kind = None
 
     def parse_network(self) -> bool:
+        """Parse the circuit definition file, or load it from the cache if it was parsed before."""
+        if self.cache is None:
+            return self.parse_file()
+        if self.cache.load(self.scanner.path, self.names, self.devices, self.network, self.monitors):
+            self.check_outputs()
+            return True
+        if not self.parse_file():
+            return False
+        self.cache.save(self.scanner.path, self.names, self.devices, self.network, self.monitors)
+        return True
+
+    def parse_file(self) -> bool:
         """Parse the circuit definition file."""
+        self.tokens = self.scanner.get_tokens()
+        self.token_index = -1
+        self.symbol = Symbol()
         self.advance()
         while self.symbol.type != Scanner.EOF:
             if self.symbol.type == Scanner.KEYWORD:
-                keyword = self.names.get_name_string(self.symbol.id)
-                if self.block_parse_flags[keyword]:
-                    self.error_handler.line_error(self.error_handler.DUPLICATE_KEYWORD, self.symbol)
-                    self.skip_to_close_bracket()
-                    self.advance()
-                elif self.block_order_flags[keyword]:
-                    self.error_handler.line_error(self.error_handler.WRONG_BLOCK_ORDER, self.symbol)
-                    self.skip_to_close_bracket()
-                    self.advance()
-                elif keyword == "DEVICE":
-                    self.device_list()
-                    self.advance()
-                elif keyword == "SWITCH":
-                    self.switch_list()
-                    self.advance()
-                elif keyword == "CLOCK":
-                    self.clock_list()
-                    self.advance()
-                elif keyword == "MONITOR":
-                    self.monitor_list()
-                    self.advance()
-                elif keyword == "CONNECTION":
-                    if self.block_parse_flags["MONITOR"]:
-                        self.connect_list()
-                        self.advance()
-                    else:
-                        self.error_handler.line_error(self.error_handler.WRONG_BLOCK_ORDER, self.symbol)
-                        self.skip_to_close_bracket()
-                        self.advance()
-                self.set_flag(keyword)
+                self.parse_block()
             else:
                 self.error_handler.line_error(self.error_handler.EXPECT_KEYWORD, self.symbol)
                 self.skip_to_close_bracket()
-                self.advance()
+            self.advance()
 
-        # check file level error
+        self.check_file()
+        if self.fetch_error_output():
+            return False
+        self.check_outputs()
+        return True
+
+    def parse_block(self) -> None:
+        """Parse the list of the keyword at the current symbol, or report why it is not allowed there."""
+        keyword = self.names.get_name_string(self.symbol.id)
+        block_lists = {"DEVICE": self.device_list, "SWITCH": self.switch_list, "CLOCK": self.clock_list,
+                       "MONITOR": self.monitor_list, "CONNECTION": self.connect_list}
+        if self.block_parse_flags[keyword]:
+            self.error_handler.line_error(self.error_handler.DUPLICATE_KEYWORD, self.symbol)
+            self.skip_to_close_bracket()
+        elif self.block_order_flags[keyword] or (keyword == "CONNECTION" and not self.block_parse_flags["MONITOR"]):
+            self.error_handler.line_error(self.error_handler.WRONG_BLOCK_ORDER, self.symbol)
+            self.skip_to_close_bracket()
+        else:
+            block_lists[keyword]()
+        self.set_flag(keyword)
+
+    def check_file(self) -> None:
+        """Report the errors in the scope of the whole file."""
         # missing monitor list
         if not self.block_parse_flags["MONITOR"]:
             self.error_handler.file_error(self.error_handler.MISSING_MONITOR)
@@ -125,14 +147,20 @@ class Parser:
             self.error_handler.file_error(self.error_handler.MISSING_CLOCK_OR_SWITCH)
         # missing input to pin
         if not self.error_count():
-            for device in self.devices.devices_list:
-                device_id = device.device_id
-                for input_id in device.inputs:
-                    input_signal = self.network.get_input_signal(device_id, input_id)
-                    if input_signal is None:  # this input is unconnected
-                        self.error_handler.file_error(self.error_handler.MISSING_INPUT_TO_PIN,
-                                                      self.devices.get_signal_name(device_id, input_id))
-        return False if self.fetch_error_output() else True
+            for device_id, input_id in self.network.get_unconnected_inputs():
+                self.error_handler.file_error(self.error_handler.MISSING_INPUT_TO_PIN,
+                                              self.devices.get_signal_name(device_id, input_id))
+
+    def check_outputs(self) -> None:
+        """Warn about every output that is neither connected to an input nor monitored, or is not driven."""
+        port_to_identifier = self.monitors.port_to_identifier
+        for device_id, output_id in self.network.get_unused_outputs():
+            if not port_to_identifier.get((device_id, output_id)):
+                self.error_handler.file_warning(self.error_handler.UNUSED_OUTPUT,
+                                                self.devices.get_signal_name(device_id, output_id))
+        for device_id, output_id in self.network.get_undriven_outputs():
+            self.error_handler.file_warning(self.error_handler.UNDRIVEN_OUTPUT,
+                                            self.devices.get_signal_name(device_id, output_id))
 
     def parse_list(self, sub_rule: bool()) -> None:
         """A generic function to parse all the list rules, with keyword specifying which list,
@@ -228,7 +256,7 @@ class Parser:
         # expect clock cycle
         if not self.clock_cycle():
             return False
-        self.current_qualifier = copy(self.symbol)
+        self.current_qualifier = self.retain_symbol()
         self.advance()
 
         # expect semicolon
@@ -254,7 +282,7 @@ class Parser:
         # expect initial state
         if not self.initial_state():
             return False
-        self.current_qualifier = copy(self.symbol)
+        self.current_qualifier = self.retain_symbol()
         self.advance()
 
         # expect semicolon
@@ -271,7 +299,7 @@ class Parser:
         # expect identifier
         if not self.identifier():
             return False
-        identifier_symbol = copy(self.symbol)
+        identifier_symbol = self.retain_symbol()
         self.advance()
 
         # expect colon
@@ -282,7 +310,7 @@ class Parser:
         # expect identifier
         if not self.identifier():
             return False
-        device_symbol = copy(self.symbol)
+        device_symbol = self.retain_symbol()
         self.advance()
 
         # except full stop or semicolon
@@ -293,7 +321,7 @@ class Parser:
             if not self.pin_in_or_out():
                 # expect pin in or out
                 return False
-            port_symbol = self.symbol
+            port_symbol = self.retain_symbol()
             self.advance()
         elif self.symbol.type != Scanner.SEMICOLON:  # not full stop or semicolon
             self.error_handler.line_error(self.error_handler.EXPECT_FULL_STOP_OR_SEMICOLON, self.symbol)
@@ -312,7 +340,7 @@ class Parser:
         # expect identifier
         if not self.identifier():
             return False
-        out_device_symbol = copy(self.symbol)
+        out_device_symbol = self.retain_symbol()
         self.advance()
         # expect full stop or arrow
         # optionally expect full stop
@@ -322,7 +350,7 @@ class Parser:
             # expect pin out
             if not self.pin_out():
                 return False
-            out_port_symbol = copy(self.symbol)
+            out_port_symbol = self.retain_symbol()
             self.advance()
         elif self.symbol.type != Scanner.ARROW:  # not full stop or arrow
             self.error_handler.line_error(self.error_handler.EXPECT_FULL_STOP_OR_ARROW, self.symbol)
@@ -336,7 +364,7 @@ class Parser:
         # expect identifier
         if not self.identifier():
             return False
-        in_device_symbol = copy(self.symbol)
+        in_device_symbol = self.retain_symbol()
         self.advance()
 
         # expect full stop
@@ -347,7 +375,7 @@ class Parser:
         # expect pin in
         if not self.pin_in():
             return False
-        in_port_symbol = copy(self.symbol)
+        in_port_symbol = self.retain_symbol()
         self.advance()
 
         # expect semicolon
@@ -387,7 +415,7 @@ class Parser:
         """Check if the current symbol is an identifier."""
         # Note: EBNF technically allows keywords to be used as identifier, but here the software will not allow
         if self.symbol.type == Scanner.NAME:
-            self.current_identifier = copy(self.symbol)
+            self.current_identifier = self.retain_symbol()
             return True
         else:
             self.error_handler.line_error(self.error_handler.EXPECT_IDENTIFIER, self.symbol)
@@ -430,7 +458,7 @@ class Parser:
         """Check if the current symbol is a valid variable input number (1-16)."""
         if (self.symbol.type == Scanner.NUMBER and self.symbol.id[0] != "0"
                 and 1 <= int(self.symbol.id) <= 16):
-            self.current_qualifier = copy(self.symbol)
+            self.current_qualifier = self.retain_symbol()
             return True
         else:
             # expect variable input number
@@ -509,7 +537,7 @@ class Parser:
     def check_rc_trigger_cycle(self) -> bool:
         """Check if the qualifier is a valid clock cycle number."""
         if self.symbol.type == Scanner.NUMBER and self.symbol.id[0] != "0":
-            self.current_qualifier = self.symbol
+            self.current_qualifier = self.retain_symbol()
             return True
         else:
             # expect RC trigger cycle
@@ -532,7 +560,15 @@ class Parser:
 
     def advance(self) -> None:
         """Advance to the next symbol."""
-        self.symbol = self.scanner.get_symbol()
+        self.token_index += 1
+        if self.token_index == len(self.tokens):  # past the end of the file
+            symbol = self.scanner.get_symbol()
+            self.tokens.append(symbol.type, symbol.id, symbol.line, symbol.character_in_line)
+        self.tokens.load_symbol(self.token_index, self.symbol)
+
+    def retain_symbol(self) -> Symbol:
+        """Return a new Symbol of the current symbol, to be kept after advancing."""
+        return self.tokens.get_symbol(self.token_index)
 
     def symbol_string(self) -> str:
         """Return the current symbol's string representation."""
@@ -542,6 +578,10 @@ class Parser:
         """Return the error list from error_handler."""
         return self.error_handler.error_output_list
 
+    def fetch_warning_output(self) -> List[Union[FileTerminalWarning, str]]:
+        """Return the warning list from error_handler."""
+        return self.error_handler.warning_output_list
+
     def error_count(self) -> int:
         """Return the number of total errors."""
         return len(self.error_handler.error_output_list)
@@ -7,6 +7,7 @@ Classes
 -------
 LimeTerminalOutput - stores terminal outputs for line errors reported by parser.
 FileTerminalOutput - stores terminal outputs for file errors reported by parser.
+FileTerminalWarning - stores terminal outputs for file warnings reported by parser.
 ParserErrorHandler - generates terminal outputs from errors reported by the parser.
 """
 
@@ -72,6 +73,33 @@ class FileTerminalOutput:
         return _(u"\nFile error: {message}\n").format(message=self.message)
 
 
+class FileTerminalWarning:
+
+    """Encapsulate a file warning and store the warning output to display on the terminal.
+
+    Warnings point out parts of the circuit that are probably mistakes, but
+    do not stop it from being simulated.
+
+    Parameters
+    ----------
+    message: string. Contains the warning message.
+    warning_code: integer.
+
+    Public methods
+    --------------
+     __str__(self): Returns the terminal output representation of the instance.
+    """
+
+    def __init__(self, message: str, warning_code: int):
+        """Initialise file terminal warning content."""
+        self.message = message
+        self.warning_code = warning_code
+
+    def __str__(self):
+        """Return the terminal output representation of the instance."""
+        return _(u"\nFile warning: {message}\n").format(message=self.message)
+
+
 class ParserErrorHandler:
 
     """Handle the syntactic and semantic errors reported by the parser.
@@ -92,6 +120,7 @@ class ParserErrorHandler:
     line_error(self, error_code, symbol): Create terminal outputs for errors appearing in a specific line.
     file_error(self, error_code, name): Create terminal outputs for errors related to the whole file,
                                 rather than a specific line.
+    file_warning(self, warning_code, name): Create terminal outputs for warnings related to the whole file.
 
     """
 
@@ -103,6 +132,7 @@ class ParserErrorHandler:
         self.monitors = monitors
         self.scanner = scanner
         self.error_output_list = []
+        self.warning_output_list = []
 
         # line error
         [self.EXPECT_IDENTIFIER, self.EXPECT_INPUT_DEVICE, self.EXPECT_VARIABLE_INPUT_NUMBER,
@@ -115,6 +145,9 @@ class ParserErrorHandler:
         # file error
         [self.MISSING_INPUT_TO_PIN, self.MISSING_MONITOR, self.MISSING_CLOCK_OR_SWITCH] = names.unique_error_codes(3)
 
+        # file warning
+        [self.UNUSED_OUTPUT, self.UNDRIVEN_OUTPUT] = names.unique_error_codes(2)
+
         self.error_limit = 25
 
     def symbol_to_name(self, symbol: Symbol) -> str:
@@ -171,6 +204,29 @@ class ParserErrorHandler:
         elif len(self.error_output_list) == (self.error_limit + 1):
             self.error_limit_exceeded()
 
+    def file_warning(self, warning_code: int, name: str) -> None:
+        """Add terminal output to warn about the whole file."""
+        if len(self.warning_output_list) < self.error_limit:
+            self.warning_output_list.append(FileTerminalWarning(
+                message=self.get_warning_message(warning_code=warning_code, name=name),
+                warning_code=warning_code
+            ))
+        elif len(self.warning_output_list) == self.error_limit:
+            self.warning_output_list.append("\n--------------------------------------------------------" +
+                                            _(u"\nOver {error_limit} warnings, further warnings will not be "
+                                              u"reported!!").format(error_limit=self.error_limit) +
+                                            "\n--------------------------------------------------------")
+
+    def get_warning_message(self, warning_code: int, name: str) -> str:
+        """Return the warning message based on the warning encountered."""
+        name = "\'" + name + "\'"
+        if warning_code == self.UNUSED_OUTPUT:
+            return _(u"Output {name} is neither connected nor monitored").format(name=name)
+        elif warning_code == self.UNDRIVEN_OUTPUT:
+            return _(u"Output {name} is not driven by any switch, clock, RC or D-type").format(name=name)
+        else:
+            raise ValueError(f"Invalid warning code '{warning_code}'")
+
     def get_line_terminal_output(self, line: int, character_in_line: int, error_code: int, name: str) -> (
             LineTerminalOutput):
         """Return terminal output based on information of the line error encountered."""
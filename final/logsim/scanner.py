@@ -6,9 +6,15 @@ file and translate them into symbols that are usable by the parser.
 Classes
 -------
 Scanner - reads definition file and translates characters into symbols.
+BufferedScanner - reads the definition file once and translates it into the
+                  same symbols with regular expressions.
 Symbol - encapsulates a symbol and stores its properties.
+TokenStream - stores all the symbols of a file in parallel arrays.
 """
-from typing import TextIO, List
+import functools
+import re
+from array import array
+from typing import TextIO, List, Tuple, Union
 
 from logsim.names import Names
 
@@ -34,6 +40,80 @@ class Symbol:
         self.character_in_line = None
 
 
+class TokenStream:
+
+    """Store all the symbols of a definition file in parallel arrays.
+
+    Symbol types, IDs, line numbers and character_in_line values are held in
+    one array each, so every symbol takes 13 bytes, however long the file,
+    and any symbol can be read back by its index. IDs are stored as:
+
+    KEYWORD, NAME: the name ID.
+    NUMBER, INVALID: the index of the ID string in strings.
+    other types: -1, for an ID of None.
+
+    Parameters
+    ----------
+    No parameters.
+
+    Public methods
+    --------------
+    append(self, symbol_type, symbol_id, line, character_in_line): Adds a
+                                                symbol to the end of the stream.
+
+    load_symbol(self, index, symbol): Sets the properties of symbol to those
+                                      of the symbol at index.
+
+    get_symbol(self, index): Returns a new Symbol of the symbol at index.
+    """
+
+    def __init__(self):
+        """Initialise the empty arrays."""
+        self.types = array("b")
+        self.ids = array("i")
+        self.lines = array("i")
+        self.characters_in_line = array("i")
+        self.strings = []  # ID strings of numbers and invalid characters
+        self.string_indices = {}  # {ID string: index in strings}
+
+    def __len__(self) -> int:
+        """Return the number of symbols in the stream."""
+        return len(self.types)
+
+    def append(self, symbol_type: int, symbol_id: Union[int, str, None], line: int, character_in_line: int) -> None:
+        """Add a symbol to the end of the stream."""
+        if symbol_id is None:
+            symbol_id = -1
+        elif symbol_type == Scanner.NUMBER or symbol_type == Scanner.INVALID:
+            if symbol_id not in self.string_indices:
+                self.string_indices[symbol_id] = len(self.strings)
+                self.strings.append(symbol_id)
+            symbol_id = self.string_indices[symbol_id]
+        self.types.append(symbol_type)
+        self.ids.append(symbol_id)
+        self.lines.append(line)
+        self.characters_in_line.append(character_in_line)
+
+    def load_symbol(self, index: int, symbol: Symbol) -> None:
+        """Set the properties of symbol to those of the symbol at index."""
+        symbol_type = self.types[index]
+        symbol_id = self.ids[index]
+        if symbol_id == -1:
+            symbol_id = None
+        elif symbol_type == Scanner.NUMBER or symbol_type == Scanner.INVALID:
+            symbol_id = self.strings[symbol_id]
+        symbol.type = symbol_type
+        symbol.id = symbol_id
+        symbol.line = self.lines[index]
+        symbol.character_in_line = self.characters_in_line[index]
+
+    def get_symbol(self, index: int) -> Symbol:
+        """Return a new Symbol of the symbol at index."""
+        symbol = Symbol()
+        self.load_symbol(index, symbol)
+        return symbol
+
+
 class Scanner:
 
     """Read circuit definition file and translate the characters into symbols.
@@ -52,6 +132,8 @@ class Scanner:
     -------------
     get_symbol(self): Translates the next sequence of characters into a symbol
                       and returns the symbol.
+
+    get_tokens(self): Translates the rest of the file into a TokenStream.
     """
 
     symbol_type_list = [COMMA, SEMICOLON, COLON, FULL_STOP, ARROW, OPEN_CURLY_BRACKET, CLOSE_CURLY_BRACKET, KEYWORD,
@@ -142,6 +224,19 @@ class Scanner:
 
         return symbol
 
+    def get_tokens(self) -> TokenStream:
+        """Translate the rest of the file into symbols and return them as a TokenStream.
+
+        The stream ends with the EOF symbol.
+        """
+        tokens = TokenStream()
+        symbol = self.get_symbol()
+        while symbol.type != self.EOF:
+            tokens.append(symbol.type, symbol.id, symbol.line, symbol.character_in_line)
+            symbol = self.get_symbol()
+        tokens.append(symbol.type, symbol.id, symbol.line, symbol.character_in_line)
+        return tokens
+
     def get_file(self) -> TextIO:
         return open(self.path, "r")
 
@@ -225,3 +320,215 @@ class Scanner:
         """Advance to the next character in file"""
 
         self.current_character = self.get_next_character()
+
+
+class BufferedScanner(Scanner):
+
+    """Read the whole circuit definition file once and translate it into symbols.
+
+    The file is read into a single string when the first symbol is read or
+    an error line is reported, so a circuit loaded from the netlist cache
+    never reads it. A file that is not unicode text raises
+    UnicodeDecodeError then, rather than when the scanner is made. Each symbol, with the spaces and
+    comments before it, is matched by one compiled regular expression over
+    the string instead of reading one character at a time. The end of the
+    file, comments running to it, and names and numbers starting with
+    non-ASCII characters are rare, and are translated character by
+    character instead.
+
+    The symbols, their IDs, line numbers and character_in_line values are the
+    same as those of Scanner, so error messages do not change. This includes
+    Scanner's counting of every read past the end of the file as one more
+    character in the line.
+
+    Parameters
+    ----------
+    path: path to the circuit definition file.
+    names: instance of the names.Names() class.
+
+    Public methods
+    -------------
+    get_symbol(self): Translates the next sequence of characters into a symbol
+                      and returns the symbol.
+
+    get_tokens(self): Translates the rest of the file into a TokenStream.
+    """
+
+    spaces = re.compile(r"\s*")  # \s matches the same characters as str.isspace
+    name_rest = re.compile(r"\w*")  # \w matches str.isalnum and underscore
+    decimal_digits = re.compile(r"\d*")  # \d matches str.isdecimal only
+
+    # Spaces and complete comments, then an ASCII name, a number or punctuation.
+    # No symbol starts with a space, # or /, so the comments matched are the
+    # same as those Scanner skips
+    token = re.compile(r"(?:\s|#[^\n]*\n|/[^/]*/)*(?:([A-Za-z]\w*)|(\d+)|([,;:.>{}]))")
+    [NAME_GROUP, NUMBER_GROUP, PUNCTUATION_GROUP] = range(1, 4)
+
+    def __init__(self, path: str, names: Names):
+        """Check that the specified file can be opened and initialise reserved words and IDs."""
+
+        if not isinstance(path, str):
+            raise TypeError("Expected path to be a string.")
+        if not isinstance(names, Names):
+            raise TypeError("Expected names to be a Names object.")
+
+        self.path = path
+        self.get_file().close()
+
+        self.names = names
+        [self.DEVICE_ID, self.CLOCK_ID, self.SWITCH_ID, self.MONITOR_ID, self.CONNECT_ID] \
+            = self.names.lookup(self.keywords_list)
+        self.punctuation = {",": self.COMMA, ";": self.SEMICOLON, ":": self.COLON, ".": self.FULL_STOP,
+                            ">": self.ARROW, "{": self.OPEN_CURLY_BRACKET, "}": self.CLOSE_CURLY_BRACKET}
+        self.name_ids = {}  # {name string: name ID} of the names already looked up
+
+        self.position = 0  # index in the buffer of the current character
+        self.current_line = 0
+        self.line_start = 0  # index in the buffer of the first character of the current line
+        self.reads_past_end = 0  # extra reads past the end of the file by Scanner
+
+    @functools.cached_property
+    def buffer(self) -> str:
+        """Return the contents of the file, read when first needed."""
+        with self.get_file() as file:
+            return file.read()
+
+    @functools.cached_property
+    def file_lines(self) -> List[str]:
+        """Return the lines of the file, with their line breaks and an empty line after the last."""
+        file_lines = [line + "\n" for line in self.buffer.split("\n")]
+        file_lines[-1] = file_lines[-1][:-1]  # the last line has no line break
+        if not file_lines[-1]:
+            file_lines.pop()
+        file_lines.append("")
+        return file_lines
+
+    def move_to(self, position: int) -> None:
+        """Move to the given position in the buffer, counting the line breaks passed."""
+        line_breaks = self.buffer.count("\n", self.position, position)
+        if line_breaks:
+            self.current_line += line_breaks
+            self.line_start = self.buffer.rindex("\n", self.position, position) + 1
+        self.position = position
+
+    def skip_spaces_and_comments(self) -> None:
+        """Move to the next character that is neither whitespace nor in a comment."""
+        buffer = self.buffer
+        position = self.spaces.match(buffer, self.position).end()
+        while position < len(buffer) and buffer[position] in "#/":
+            # A single-line comment ends after the line break, a multi-line one after the next /
+            comment_end = buffer.find("\n" if buffer[position] == "#" else "/", position + 1)
+            if comment_end == -1:  # comment runs to the end of the file
+                position = len(buffer)
+                self.reads_past_end += 1
+            else:
+                position = comment_end + 1
+            position = self.spaces.match(buffer, position).end()
+        self.move_to(position)
+
+    def get_symbol(self) -> Symbol:
+        """Translate the next sequence of characters into a symbol and return the symbol."""
+        symbol = Symbol()
+        [symbol.type, symbol.id, symbol.line, symbol.character_in_line] = self.get_token()
+        return symbol
+
+    def get_tokens(self) -> TokenStream:
+        """Translate the rest of the file into symbols and return them as a TokenStream.
+
+        The stream ends with the EOF symbol. No Symbol objects are made.
+        """
+        tokens = TokenStream()
+        append = tokens.append
+        while True:
+            token = self.get_token()
+            append(*token)
+            if token[0] == self.EOF:
+                return tokens
+
+    def get_token(self) -> Tuple[int, Union[int, str, None], int, int]:
+        """Translate the next sequence of characters into a symbol.
+
+        Return the symbol's type, ID, line and character_in_line.
+        """
+        buffer = self.buffer
+        match = self.token.match(buffer, self.position)
+        if match is None:  # end of file, comment running to it, non-ASCII or invalid character
+            return self.get_token_by_character()
+
+        group = match.lastindex
+        position = match.start(group)
+        end = match.end()
+        line_breaks = buffer.count("\n", self.position, position)
+        if line_breaks:
+            self.current_line += line_breaks
+            self.line_start = buffer.rindex("\n", self.position, position) + 1
+
+        symbol_id = None
+        if group == self.NAME_GROUP:
+            name_string = match.group(group)
+            if name_string in self.keywords_list:
+                symbol_type = self.KEYWORD
+            else:
+                symbol_type = self.NAME
+            if name_string not in self.name_ids:
+                [self.name_ids[name_string]] = self.names.lookup([name_string])
+            symbol_id = self.name_ids[name_string]
+        elif group == self.NUMBER_GROUP:
+            if end < len(buffer) and buffer[end].isdigit():  # continues with a digit that is not decimal
+                self.position = position
+                return self.get_token_by_character()
+            symbol_id = match.group(group)
+            symbol_type = self.NUMBER
+        else:
+            symbol_type = self.punctuation[buffer[position]]
+
+        self.position = end  # names, numbers and punctuation hold no line breaks
+        return symbol_type, symbol_id, self.current_line, position - self.line_start
+
+    def get_token_by_character(self) -> Tuple[int, Union[int, str, None], int, int]:
+        """Translate the next symbol character by character.
+
+        Return the symbol's type, ID, line and character_in_line.
+        """
+        self.skip_spaces_and_comments()
+        buffer = self.buffer
+        position = self.position
+
+        symbol_id = None
+        if position >= len(buffer):  # end of file
+            return self.EOF, None, self.current_line, position - self.line_start + self.reads_past_end
+
+        character = buffer[position]
+        if character.isalpha():  # name
+            end = self.name_rest.match(buffer, position + 1).end()
+            name_string = buffer[position:end]
+            if name_string in self.keywords_list:
+                symbol_type = self.KEYWORD
+            else:
+                symbol_type = self.NAME
+            if name_string not in self.name_ids:
+                [self.name_ids[name_string]] = self.names.lookup([name_string])
+            symbol_id = self.name_ids[name_string]
+
+        elif character.isdigit():  # number
+            end = position + 1
+            while True:
+                end = self.decimal_digits.match(buffer, end).end()
+                if end < len(buffer) and buffer[end].isdigit():  # a digit that is not decimal
+                    end += 1
+                else:
+                    break
+            symbol_id = buffer[position:end]
+            symbol_type = self.NUMBER
+
+        elif character in self.punctuation:
+            symbol_type = self.punctuation[character]
+            end = position + 1
+
+        else:  # not a valid character
+            symbol_id = character
+            symbol_type = self.INVALID
+            end = position + 1
+
+        self.position = end  # names, numbers and punctuation hold no line breaks
+        return symbol_type, symbol_id, self.current_line, position - self.line_start
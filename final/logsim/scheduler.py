@@ -0,0 +1,171 @@
+"""Schedule clock edges and RC triggers.
+
+Used in the Logic Simulator project to find the clocks and RCs that change
+their output in a simulation cycle without checking every one of them.
+
+Classes
+-------
+EventScheduler - counts the cycles and keeps the next event cycle of every
+                 clock and RC in min-heaps.
+"""
+import heapq
+from typing import List, Tuple
+
+
+class EventScheduler:
+
+    """Count the cycles and keep the next event cycle of every clock and RC.
+
+    A clock's event is the cycle in which its counter reaches its half
+    period and it starts to rise or fall, repeating every half period. An
+    RC's event is the cycle in which its counter reaches its trigger cycle.
+
+    The Device objects keep their clock and RC counters as the cycle of the
+    scheduler at which the counter was 0 (clock_start and rc_start), so the
+    counters advance with every cycle without being updated. Setting a
+    counter calls reschedule(), and the new event is scheduled before the
+    next cycle starts. Events made out of date by a later setting are left
+    in the heaps and dropped when they are reached.
+
+    Parameters
+    ----------
+    No parameters.
+
+    Public methods
+    --------------
+    reschedule(self, device): Schedules the next event of the device again
+                              once its counter is set.
+
+    advance(self): Starts the next cycle.
+
+    pop_clock_events(self): Returns the clocks with an event in the current
+                            cycle.
+
+    pop_rc_events(self): Returns the RCs with an event in the current cycle.
+
+    skip(self, cycles): Advances over cycles with no events.
+
+    get_idle_cycles(self): Returns the number of next cycles with no events.
+
+    get_events(self, cycles): Returns the events in the next cycles.
+    """
+
+    def __init__(self):
+        """Initialise the cycle count and the empty heaps."""
+        self.cycle = 0  # cycles started so far
+        self.pending_devices = set()  # devices whose counters were set since the last cycle
+        self.clock_heap = []  # [(event cycle, serial number, device)]
+        self.rc_heap = []
+        self.serial = 0  # orders events of the same cycle, as devices cannot be compared
+
+    def reschedule(self, device) -> None:
+        """Schedule the next event of the device again once its counter is set."""
+        self.pending_devices.add(device)
+
+    def get_clock_event(self, device) -> int or None:
+        """Return the cycle in which the counter of the clock reaches its half period.
+
+        The counter is compared before it is incremented, so this is the
+        cycle in which it has been incremented half period times since 0.
+        """
+        if device.clock_start is None or device.clock_half_period is None:
+            return None
+        return device.clock_start + device.clock_half_period + 1
+
+    def get_rc_event(self, device) -> int or None:
+        """Return the cycle in which the counter of the RC reaches its trigger cycle."""
+        if device.rc_start is None or device.trigger_cycle is None:
+            return None
+        return device.rc_start + device.trigger_cycle + 1
+
+    def schedule_pending_devices(self) -> None:
+        """Schedule the next events of the devices whose counters were set.
+
+        The heaps are rebuilt without out of date events when most of them
+        are, as after a cold start-up.
+        """
+        if not self.pending_devices:
+            return
+        pending_devices = self.pending_devices
+        self.pending_devices = set()
+        if 2 * len(pending_devices) >= len(self.clock_heap) + len(self.rc_heap):
+            self.clock_heap = [event for event in self.clock_heap if event[2] not in pending_devices]
+            self.rc_heap = [event for event in self.rc_heap if event[2] not in pending_devices]
+            heapq.heapify(self.clock_heap)
+            heapq.heapify(self.rc_heap)
+        for device in pending_devices:
+            for heap, event_cycle in [(self.clock_heap, self.get_clock_event(device)),
+                                      (self.rc_heap, self.get_rc_event(device))]:
+                if event_cycle is not None and event_cycle > self.cycle:
+                    heapq.heappush(heap, (event_cycle, self.serial, device))
+                    self.serial += 1
+
+    def advance(self) -> None:
+        """Start the next cycle."""
+        self.schedule_pending_devices()
+        self.cycle += 1
+
+    def pop_clock_events(self) -> list:
+        """Return the clocks with an event in the current cycle, restarting their counters."""
+        cycle = self.cycle
+        heap = self.clock_heap
+        fired_devices = []
+        while heap and heap[0][0] <= cycle:
+            event_cycle, __, device = heap[0]
+            if event_cycle == cycle and self.get_clock_event(device) == cycle:
+                fired_devices.append(device)
+                # The counter restarts at 0 and is incremented in this cycle
+                device.clock_start = cycle - 1
+                heapq.heapreplace(heap, (cycle + device.clock_half_period, self.serial, device))
+                self.serial += 1
+            else:  # out of date
+                heapq.heappop(heap)
+        return fired_devices
+
+    def pop_rc_events(self) -> list:
+        """Return the RCs with an event in the current cycle."""
+        cycle = self.cycle
+        heap = self.rc_heap
+        fired_devices = []
+        while heap and heap[0][0] <= cycle:
+            event_cycle, __, device = heapq.heappop(heap)
+            if event_cycle == cycle and self.get_rc_event(device) == cycle:
+                fired_devices.append(device)
+        return fired_devices
+
+    def skip(self, cycles: int) -> None:
+        """Advance over the given number of cycles, which must have no events."""
+        self.schedule_pending_devices()
+        self.cycle += cycles
+
+    def get_idle_cycles(self) -> int or None:
+        """Return the number of next cycles with no events, or None if no event is due."""
+        self.schedule_pending_devices()
+        next_events = []
+        for heap, get_event in [(self.clock_heap, self.get_clock_event), (self.rc_heap, self.get_rc_event)]:
+            # Out of date events are dropped from the top of the heap
+            while heap and (heap[0][0] <= self.cycle or get_event(heap[0][2]) != heap[0][0]):
+                heapq.heappop(heap)
+            if heap:
+                next_events.append(heap[0][0])
+        if not next_events:
+            return None
+        return min(next_events) - self.cycle - 1
+
+    def get_events(self, cycles: int) -> List[Tuple[int, int]]:
+        """Return the (cycle, device ID) of every event in the next cycles.
+
+        Cycles are counted from the next one, which is 1, and the events are
+        in order of cycle.
+        """
+        self.schedule_pending_devices()
+        events = set()
+        for event_cycle, __, device in self.clock_heap:
+            if event_cycle > self.cycle and self.get_clock_event(device) == event_cycle:
+                while event_cycle - self.cycle <= cycles:
+                    events.add((event_cycle - self.cycle, device.device_id))
+                    event_cycle += device.clock_half_period
+        for event_cycle, __, device in self.rc_heap:
+            if self.cycle < event_cycle <= self.cycle + cycles and self.get_rc_event(device) == event_cycle:
+                events.add((event_cycle - self.cycle, device.device_id))
+        return sorted(events)
@@ -0,0 +1,152 @@
+"""Run simulations that can be changed in the past.
+
+Used in the Logic Simulator project by the graphical user interface to run
+and continue the simulation, and to apply a switch change at an earlier
+cycle by simulating again only from the latest checkpoint before it.
+
+Classes
+-------
+Simulation - runs the network, keeping checkpoints and switch changes.
+"""
+from typing import Optional
+
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+from logsim.checkpoints import CheckpointStore
+
+
+class Simulation:
+
+    """Run the network, keeping checkpoints and the switch changes of the run.
+
+    Every switch change is stored with the cycle it applies from, and a
+    checkpoint of the network state is taken every checkpoint_interval
+    cycles. Changing a switch from an earlier cycle restores the latest
+    checkpoint at or before that cycle, removes the later signal levels from
+    the monitors and simulates up to the same cycle again, replaying the
+    stored switch changes. Idle cycles, in which no signal can change, are
+    skipped up to the next checkpoint or switch change.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+    checkpoint_interval: number of cycles between checkpoints.
+    max_checkpoints: largest number of checkpoints kept.
+
+    Public methods
+    --------------
+    run(self, cycles): Simulates the given number of cycles from a cold
+                       start-up.
+
+    continue_run(self, cycles): Simulates the given number of further cycles.
+
+    set_switch(self, switch_id, state, cycle=None): Sets a switch from the
+                                     given cycle on, simulating again the
+                                     cycles already run from that cycle.
+    """
+
+    def __init__(self, devices: Devices, network: Network, monitors: Monitors, checkpoint_interval: int = 10,
+                 max_checkpoints: int = 64):
+        """Initialise a simulation that has not been run yet."""
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+
+        self.checkpoints = CheckpointStore(network, checkpoint_interval, max_checkpoints)
+        self.initial_state = None  # network state straight after the cold start-up
+        self.cycles_completed = 0
+        self.switch_changes = {}  # {cycle: {switch_id: state}}, applied before simulating the cycle
+
+    def run(self, cycles: int) -> bool:
+        """Simulate the given number of cycles from a cold start-up.
+
+        Switches start in their current states and earlier switch changes are
+        forgotten. Return True if successful.
+        """
+        self.monitors.reset_monitors()
+        self.devices.cold_startup()
+        self.checkpoints.clear()
+        self.switch_changes = {}
+        self.cycles_completed = 0
+        self.initial_state = self.network.get_state()
+        return self.simulate(cycles)
+
+    def continue_run(self, cycles: int) -> bool:
+        """Simulate the given number of further cycles.
+
+        Return True if successful.
+        """
+        return self.simulate(self.cycles_completed + cycles)
+
+    def simulate(self, end_cycle: int) -> bool:
+        """Simulate up to end_cycle, applying the stored switch changes.
+
+        Return True if successful. Otherwise cycles_completed is the number
+        of cycles simulated successfully.
+        """
+        while self.cycles_completed < end_cycle:
+            for switch_id, state in self.switch_changes.get(self.cycles_completed, {}).items():
+                self.devices.set_switch(switch_id, state)
+            if not self.network.execute_network():
+                return False
+            self.monitors.record_signals()
+            self.cycles_completed += 1
+            self.checkpoints.record(self.cycles_completed)
+            self.skip_idle_cycles(end_cycle)
+        return True
+
+    def skip_idle_cycles(self, end_cycle: int) -> None:
+        """Skip the cycles before end_cycle in which no signal can change.
+
+        Skipping stops at every checkpoint, to take it, and at the next
+        switch change.
+        """
+        change_cycles = [cycle for cycle, states in self.switch_changes.items()
+                         if cycle >= self.cycles_completed and states]
+        stop_cycle = min(change_cycles + [end_cycle])
+        while True:
+            interval = self.checkpoints.interval
+            next_checkpoint = self.cycles_completed + interval - self.cycles_completed % interval
+            idle_cycles = self.network.get_idle_cycles(min(stop_cycle, next_checkpoint) - self.cycles_completed)
+            if not idle_cycles:
+                return
+            self.network.skip_cycles(idle_cycles)
+            self.monitors.record_repeated_signals(idle_cycles)
+            self.cycles_completed += idle_cycles
+            self.checkpoints.record(self.cycles_completed)
+
+    def set_switch(self, switch_id: int, state: int, cycle: Optional[int] = None) -> bool:
+        """Set the switch to state from the given cycle on.
+
+        If cycle is None or no earlier than cycles_completed, the switch is
+        set for the cycles simulated next. Otherwise the cycles already run
+        from the latest checkpoint at or before cycle are simulated again,
+        and later changes of the same switch are dropped. Return True if
+        successful.
+        """
+        device = self.devices.get_device(switch_id)
+        if device is None or device.device_kind != self.devices.SWITCH:
+            return False
+        if cycle is None or cycle > self.cycles_completed:
+            cycle = self.cycles_completed
+        for change_cycle, states in self.switch_changes.items():
+            if change_cycle > cycle:
+                states.pop(switch_id, None)
+        self.switch_changes.setdefault(cycle, {})[switch_id] = state
+        if cycle == self.cycles_completed:
+            return self.devices.set_switch(switch_id, state)
+
+        end_cycle = self.cycles_completed
+        checkpoint_cycle = self.checkpoints.find_checkpoint(cycle)
+        if checkpoint_cycle is None:
+            checkpoint_cycle = 0
+            self.network.set_state(self.initial_state)
+        else:
+            self.checkpoints.restore(checkpoint_cycle)
+        self.checkpoints.discard_after(checkpoint_cycle)
+        self.monitors.rewind_monitors(end_cycle - checkpoint_cycle)
+        self.cycles_completed = checkpoint_cycle
+        return self.simulate(end_cycle)
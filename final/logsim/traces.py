@@ -0,0 +1,508 @@
+"""Store monitor signal traces compactly.
+
+Used in the Logic Simulator project to record monitored signals for many
+cycles. Signal levels are small integers (see Devices.signal_types), so each
+sample is stored in a single byte instead of a Python int. Signals that are
+idle for long stretches can instead be stored as the cycles at which they
+change, and very long traces can spill their older samples to disk.
+
+Classes
+-------
+SignalTrace - a list-like trace of signal levels, one byte per sample.
+RunLengthTrace - a list-like trace storing only the changes of signal level.
+MemoryBudget - the memory shared by spilling traces.
+SpillingTrace - a list-like trace keeping older samples in a file on disk.
+"""
+import bisect
+import itertools
+import mmap
+import tempfile
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class SignalTrace:
+
+    """Store the signal levels recorded by one monitor, one byte per sample.
+
+    The trace behaves like a list of signal levels: it can be appended to,
+    indexed, sliced, iterated over and compared with lists, so code written
+    for list traces, such as Canvas.render, keeps working.
+
+    Parameters
+    ----------
+    signals: initial signal levels of the trace.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal level to the end of the trace.
+
+    extend(self, signals): Adds signal levels to the end of the trace.
+
+    append_repeated(self, signal, count): Adds a signal level count times.
+
+    clear(self): Removes every signal level from the trace.
+
+    truncate(self, length): Removes the signal levels after the first length.
+    """
+
+    def __init__(self, signals: Iterable[int] = ()):
+        """Store the initial signal levels."""
+        self.signals = array("b", signals)
+
+    def append(self, signal: int) -> None:
+        """Add a signal level to the end of the trace."""
+        self.signals.append(signal)
+
+    def extend(self, signals: Iterable[int]) -> None:
+        """Add signal levels to the end of the trace."""
+        self.signals.extend(signals)
+
+    def append_repeated(self, signal: int, count: int) -> None:
+        """Add a signal level count times to the end of the trace."""
+        self.signals.extend(array("b", [signal]) * count)
+
+    def clear(self) -> None:
+        """Remove every signal level from the trace."""
+        del self.signals[:]
+
+    def truncate(self, length: int) -> None:
+        """Remove the signal levels after the first length."""
+        del self.signals[length:]
+
+    def __len__(self) -> int:
+        """Return the number of samples in the trace."""
+        return len(self.signals)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the signal levels in the trace."""
+        return iter(self.signals)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, "SignalTrace"]:
+        """Return the signal level at index, or a new trace for a slice."""
+        if isinstance(index, slice):
+            return SignalTrace(self.signals[index])
+        return self.signals[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if other holds the same signal levels."""
+        if isinstance(other, SignalTrace):
+            return self.signals == other.signals
+        if isinstance(other, list):
+            return self.signals.tolist() == other
+        return NotImplemented
+
+    __hash__ = None  # traces are mutable
+
+    def __repr__(self) -> str:
+        """Return the trace as a list of signal levels."""
+        return repr(self.signals.tolist())
+
+
+class RunLengthTrace:
+
+    """Store the signal levels recorded by one monitor as their changes.
+
+    Only the cycle and level of every change are stored, so memory grows
+    with the activity of the signal, not with the length of the run. The
+    trace behaves like a list of signal levels, like SignalTrace, and levels
+    are decoded lazily when it is indexed or iterated over.
+
+    Parameters
+    ----------
+    signals: initial signal levels of the trace.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal level to the end of the trace.
+
+    extend(self, signals): Adds signal levels to the end of the trace.
+
+    append_repeated(self, signal, count): Adds a signal level count times.
+
+    clear(self): Removes every signal level from the trace.
+
+    truncate(self, length): Removes the signal levels after the first length.
+
+    get_changes(self): Returns the (cycle, signal level) of every change.
+    """
+
+    def __init__(self, signals: Iterable[int] = ()):
+        """Store the changes of the initial signal levels."""
+        self.change_cycles = array("q")  # cycle at which each run starts
+        self.change_signals = array("b")  # signal level of each run
+        self.length = 0
+        self.extend(signals)
+
+    def append(self, signal: int) -> None:
+        """Add a signal level to the end of the trace."""
+        if not self.change_signals or self.change_signals[-1] != signal:
+            self.change_cycles.append(self.length)
+            self.change_signals.append(signal)
+        self.length += 1
+
+    def extend(self, signals: Iterable[int]) -> None:
+        """Add signal levels to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def append_repeated(self, signal: int, count: int) -> None:
+        """Add a signal level count times to the end of the trace, as at most one change."""
+        if count > 0:
+            self.append(signal)
+            self.length += count - 1
+
+    def clear(self) -> None:
+        """Remove every signal level from the trace."""
+        del self.change_cycles[:]
+        del self.change_signals[:]
+        self.length = 0
+
+    def truncate(self, length: int) -> None:
+        """Remove the signal levels after the first length."""
+        runs = bisect.bisect_left(self.change_cycles, length)  # runs starting before length
+        del self.change_cycles[runs:]
+        del self.change_signals[runs:]
+        self.length = min(self.length, length)
+
+    def get_changes(self) -> List[Tuple[int, int]]:
+        """Return the (cycle, signal level) of every change, starting at cycle 0."""
+        return list(zip(self.change_cycles, self.change_signals))
+
+    def __len__(self) -> int:
+        """Return the number of samples in the trace."""
+        return self.length
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the signal levels in the trace, decoding each run."""
+        run_ends = itertools.chain(self.change_cycles[1:], [self.length])
+        for start, end, signal in zip(self.change_cycles, run_ends, self.change_signals):
+            yield from itertools.repeat(signal, end - start)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, "RunLengthTrace"]:
+        """Return the signal level at index, or a new trace for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            return RunLengthTrace(self[cycle] for cycle in range(start, stop, step))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trace index out of range")
+        return self.change_signals[bisect.bisect_right(self.change_cycles, index) - 1]
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if other holds the same signal levels."""
+        if isinstance(other, RunLengthTrace):
+            return (self.length == other.length and self.change_cycles == other.change_cycles
+                    and self.change_signals == other.change_signals)
+        if isinstance(other, (list, SignalTrace)):
+            return self.length == len(other) and all(
+                signal == other_signal for signal, other_signal in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # traces are mutable
+
+    def __repr__(self) -> str:
+        """Return the trace as a list of signal levels."""
+        return repr(list(self))
+
+
+class MemoryBudget:
+
+    """Share a memory budget and a spill file between spilling traces.
+
+    The budget counts the samples the traces hold in memory, one byte each.
+    When it is exceeded, the trace being appended to moves its samples to
+    disk, as long as it holds at least chunk_size of them, so the memory used
+    stays within about the budget plus chunk_size per trace.
+
+    The samples of every trace are written to one temporary file, which is
+    memory-mapped for reading, so the number of open files and maps does not
+    grow with the number of traces. Space released by a trace, as when it is
+    truncated, is written again before the file grows, so the file never
+    grows past the most samples spilled at once. Released space at the end
+    of the file is cut off, and the file is deleted once every trace has
+    released its samples, as when the monitors are reset.
+
+    Parameters
+    ----------
+    budget: number of bytes of samples to hold in memory.
+    directory: directory of the spill file, or None for the default
+               temporary directory.
+    chunk_size: smallest number of samples moved to disk at once.
+
+    Public methods
+    --------------
+    write(self, data): Adds samples to the spill file and returns the
+                       extents they were written to.
+
+    read(self, offset, size): Returns samples from the spill file.
+
+    release(self, offset, size): Marks samples of the spill file as no
+                                 longer used.
+
+    close(self): Deletes the spill file.
+    """
+
+    def __init__(self, budget: int, directory: Optional[str] = None, chunk_size: int = 4096):
+        """Start with no samples held in memory or on disk."""
+        self.budget = budget
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.in_memory = 0  # samples held in memory by all the traces
+        self.spill_file = None  # temporary file holding the spilled samples of every trace
+        self.spill_map = None  # read-only map of the spill file, made when needed
+        self.file_size = 0  # bytes written to the spill file
+        self.in_use = 0  # bytes of the spill file not yet released by their trace
+        self.free_extents = []  # [[offset, size]] released inside the file, in order of offset
+
+    def __del__(self) -> None:
+        """Delete the spill file."""
+        self.close()
+
+    def write(self, data: bytes) -> List[Tuple[int, int]]:
+        """Add the samples to the spill file and return the (offset, size) of the extents holding them, in order.
+
+        Released space is filled first, from the start of the file, and the
+        rest is added to the end.
+        """
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(dir=self.directory)
+        extents = []
+        written = 0
+        while written < len(data):
+            if self.free_extents:
+                offset, size = self.free_extents[0]
+                size = min(size, len(data) - written)
+                if size == self.free_extents[0][1]:
+                    del self.free_extents[0]
+                else:
+                    self.free_extents[0] = [offset + size, self.free_extents[0][1] - size]
+            else:
+                offset, size = self.file_size, len(data) - written
+                self.file_size += size
+            self.spill_file.seek(offset)
+            self.spill_file.write(data[written:written + size])
+            extents.append((offset, size))
+            written += size
+        self.spill_file.flush()
+        self.in_use += len(data)
+        return extents
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Return size bytes of samples from the offset in the spill file.
+
+        The file is mapped again only when it has grown past the map.
+        """
+        if self.spill_map is None or len(self.spill_map) < offset + size:
+            if self.spill_map is not None:
+                self.spill_map.close()
+            self.spill_map = mmap.mmap(self.spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.spill_map[offset:offset + size]
+
+    def release(self, offset: int, size: int) -> None:
+        """Mark size bytes from the offset in the spill file as no longer used.
+
+        The space is merged with the released space next to it, and cut off
+        at the end of the file. The file is deleted once no bytes are used.
+        """
+        self.in_use -= size
+        if self.in_use == 0:
+            self.close()
+            return
+        index = bisect.bisect_left(self.free_extents, [offset, size])
+        self.free_extents.insert(index, [offset, size])
+        if index + 1 < len(self.free_extents) and sum(self.free_extents[index]) == self.free_extents[index + 1][0]:
+            self.free_extents[index][1] += self.free_extents.pop(index + 1)[1]
+        if index > 0 and sum(self.free_extents[index - 1]) == self.free_extents[index][0]:
+            self.free_extents[index - 1][1] += self.free_extents.pop(index)[1]
+        if sum(self.free_extents[-1]) == self.file_size:
+            self.file_size = self.free_extents.pop()[0]
+            if self.spill_map is not None:  # the map must not outlast the end of the file
+                self.spill_map.close()
+                self.spill_map = None
+            self.spill_file.truncate(self.file_size)
+
+    def close(self) -> None:
+        """Delete the spill file."""
+        if self.spill_map is not None:
+            self.spill_map.close()
+            self.spill_map = None
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+        self.file_size = 0
+        self.in_use = 0
+        self.free_extents = []
+
+
+class SpillingTrace:
+
+    """Store the signal levels recorded by one monitor in memory and on disk.
+
+    New samples are appended in memory, one byte each. When the memory
+    budget is exceeded, they are moved to the spill file shared through the
+    budget, and the offset and length of each such extent of the trace is
+    kept, so any cycle range can still be indexed, sliced and iterated over
+    like in SignalTrace. The spilled samples are released when the trace is
+    cleared, truncated or deleted.
+
+    Parameters
+    ----------
+    signals: initial signal levels of the trace.
+    budget: the MemoryBudget shared with the other traces.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal level to the end of the trace.
+
+    extend(self, signals): Adds signal levels to the end of the trace.
+
+    append_repeated(self, signal, count): Adds a signal level count times.
+
+    clear(self): Removes every signal level from the trace.
+
+    truncate(self, length): Removes the signal levels after the first length.
+    """
+
+    def __init__(self, signals: Iterable[int], budget: MemoryBudget):
+        """Store the initial signal levels."""
+        self.budget = budget
+        self.signals = array("b")  # samples held in memory, after the spilled ones
+        self.extent_starts = []  # index in the trace of the first sample of each extent
+        self.extents = []  # [[offset in the spill file, number of samples]]
+        self.spilled = 0  # number of samples in the spill file
+        self.extend(signals)
+
+    def __del__(self) -> None:
+        """Release the memory budget and the spilled samples."""
+        self.clear()
+
+    def append(self, signal: int) -> None:
+        """Add a signal level to the end of the trace."""
+        self.signals.append(signal)
+        budget = self.budget
+        budget.in_memory += 1
+        if budget.in_memory > budget.budget and len(self.signals) >= budget.chunk_size:
+            self.spill()
+
+    def extend(self, signals: Iterable[int]) -> None:
+        """Add signal levels to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def append_repeated(self, signal: int, count: int) -> None:
+        """Add a signal level count times to the end of the trace.
+
+        Samples are added in chunks, spilling between them as append does.
+        """
+        budget = self.budget
+        while count > 0:
+            chunk = min(count, max(budget.chunk_size, 1))
+            self.signals.extend(array("b", [signal]) * chunk)
+            budget.in_memory += chunk
+            count -= chunk
+            if budget.in_memory > budget.budget and len(self.signals) >= budget.chunk_size:
+                self.spill()
+
+    def spill(self) -> None:
+        """Move the samples held in memory to the spill file."""
+        for offset, size in self.budget.write(self.signals.tobytes()):
+            if self.extents and sum(self.extents[-1]) == offset:
+                self.extents[-1][1] += size  # continues the last extent
+            else:
+                self.extent_starts.append(self.spilled)
+                self.extents.append([offset, size])
+            self.spilled += size
+        self.budget.in_memory -= len(self.signals)
+        del self.signals[:]
+
+    def clear(self) -> None:
+        """Remove every signal level from the trace."""
+        self.budget.in_memory -= len(self.signals)
+        del self.signals[:]
+        for offset, size in self.extents:
+            self.budget.release(offset, size)
+        self.extent_starts = []
+        self.extents = []
+        self.spilled = 0
+
+    def truncate(self, length: int) -> None:
+        """Remove the signal levels after the first length.
+
+        Spilled samples removed are released, and the kept ones stay where
+        they are in the spill file.
+        """
+        if length >= self.spilled:
+            kept = length - self.spilled
+            self.budget.in_memory -= max(len(self.signals) - kept, 0)
+            del self.signals[kept:]
+            return
+        self.budget.in_memory -= len(self.signals)
+        del self.signals[:]
+        # Release the extents after length, last first, and the end of the one holding it
+        extent = bisect.bisect_left(self.extent_starts, length)
+        for offset, size in reversed(self.extents[extent:]):
+            self.budget.release(offset, size)
+        del self.extent_starts[extent:]
+        del self.extents[extent:]
+        if self.extents and length - self.extent_starts[-1] < self.extents[-1][1]:
+            offset, size = self.extents[-1]
+            kept = length - self.extent_starts[-1]
+            self.budget.release(offset + kept, size - kept)
+            self.extents[-1][1] = kept
+        self.spilled = length
+
+    def read_spilled(self, start: int, stop: int) -> array:
+        """Return the spilled samples from start to stop."""
+        signals = array("b")
+        extent = bisect.bisect_right(self.extent_starts, start) - 1
+        while start < stop:
+            offset, size = self.extents[extent]
+            extent_start = self.extent_starts[extent]
+            end = min(stop, extent_start + size)
+            signals.frombytes(self.budget.read(offset + start - extent_start, end - start))
+            start = end
+            extent += 1
+        return signals
+
+    def __len__(self) -> int:
+        """Return the number of samples in the trace."""
+        return self.spilled + len(self.signals)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the signal levels in the trace, reading the spill file in chunks."""
+        spilled = self.spilled
+        for start in range(0, spilled, self.budget.chunk_size):
+            yield from self.read_spilled(start, min(start + self.budget.chunk_size, spilled))
+        yield from self.signals[:]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, "SignalTrace"]:
+        """Return the signal level at index, or a SignalTrace for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return SignalTrace(self[cycle] for cycle in range(start, stop, step))
+            signals = self.read_spilled(start, min(stop, self.spilled)) if start < self.spilled else array("b")
+            signals.extend(self.signals[max(start - self.spilled, 0):max(stop - self.spilled, 0)])
+            return SignalTrace(signals)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trace index out of range")
+        if index >= self.spilled:
+            return self.signals[index - self.spilled]
+        return self.read_spilled(index, index + 1)[0]
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if other holds the same signal levels."""
+        if isinstance(other, (list, SignalTrace, RunLengthTrace, SpillingTrace)):
+            return len(self) == len(other) and all(
+                signal == other_signal for signal, other_signal in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # traces are mutable
+
+    def __repr__(self) -> str:
+        """Return the trace as a list of signal levels."""
+        return repr(list(self))
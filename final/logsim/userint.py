@@ -21,8 +21,8 @@ class UserInterface:
 
     This class allows the user to enter certain commands.
     These commands enable the user to run or continue the simulation for a
-    number of cycles, set switches, add or zap monitors, show help, or quit
-    the program.
+    number of cycles, set switches, add or zap monitors, view the monitored
+    signals, show help, or quit the program.
 
     Parameters
     -----------
@@ -62,7 +62,7 @@ class UserInterface:
 
     monitor_command(self): Sets the specified monitor.
 
-    zap_command(self): Removes the specified monitor.
+    zap_command(self): Removes the monitors on the specified signals.
 
     run_network(self, cycles): Runs the network for the specified number of
                                simulation cycles.
@@ -70,6 +70,8 @@ class UserInterface:
     run_command(self): Runs the simulation from scratch.
 
     continue_command(self): Continues a previously run simulation.
+
+    view_command(self): Displays the monitored signals in a range of cycles.
     """
 
     def __init__(self, names: Names, devices: Devices, network: Network, monitors: Monitors):
@@ -104,6 +106,8 @@ class UserInterface:
                 self.run_command()
             elif command == "c":
                 self.continue_command()
+            elif command == "v":
+                self.view_command()
             else:
                 print("Invalid command. Enter 'h' for help.")
             self.get_line()  # get the user entry
@@ -231,12 +235,14 @@ class UserInterface:
     def help_command(self) -> None:
         """Print a list of valid commands."""
         print("User commands:")
-        print("r N       - run the simulation for N cycles")
+        print("r N [S]   - run the simulation for N cycles, optionally "
+              "from the random start-up given by seed S")
         print("c N       - continue the simulation for N cycles")
+        print("v A [B]   - view the monitored signals from cycle A to B")
         print("s X N     - set switch X to N (0 or 1)")
         print("m I:X     - set a monitor on signal X by identifier I "
               "(identifier: device_name OR device_name.port_number)")
-        print("z X       - zap the monitor on signal X")
+        print("z X [Y..] - zap the monitors on signals X, Y, ...")
         print("h         - help (this command)")
         print("q         - quit the program")
 
@@ -264,34 +270,73 @@ class UserInterface:
                 print("Error! Could not make monitor.")
 
     def zap_command(self) -> None:
-        """Remove the specified monitor."""
-        monitor = self.read_signal_name()
-        if monitor is not None:
-            [device, port] = monitor
-            if self.monitors.remove_monitor_by_port(device, port):
+        """Remove the monitors on the specified signals."""
+        ports = []
+        while not ports or (self.character + self.line[self.cursor:]).strip():  # until the end of the line
+            monitor = self.read_signal_name()
+            if monitor is None:
+                return
+            ports.append(tuple(monitor))
+
+        zapped = sum(self.monitors.remove_monitors_by_port(ports))
+        if len(ports) == 1:
+            if zapped:
                 print("Successfully zapped monitor")
             else:
                 print("Error! Could not zap monitor.")
+        else:
+            print(f"Successfully zapped {zapped} monitors")
+            if zapped < len(ports):
+                print(f"Error! Could not zap {len(ports) - zapped} monitors.")
 
     def run_network(self, cycles) -> bool:
         """Run the network for the specified number of simulation cycles.
 
         Return True if successful.
         """
-        for _ in range(cycles):
+        cycle = 0
+        while cycle < cycles:
             if self.network.execute_network():
                 self.monitors.record_signals()
             else:
-                print("Error! Network oscillating.")
+                self.print_network_error()
                 return False
+            cycle += 1
+
+            # Cycles before the next clock edge or RC trigger change nothing
+            idle_cycles = self.network.get_idle_cycles(cycles - cycle)
+            self.network.skip_cycles(idle_cycles)
+            self.monitors.record_repeated_signals(idle_cycles)
+            cycle += idle_cycles
         self.monitors.display_signals()
         return True
 
+    def print_network_error(self) -> None:
+        """Print why the last simulation cycle failed, naming the oscillating devices if they are known."""
+        loops = self.network.find_oscillating_loops() if self.network.oscillating else []
+        if loops:
+            print("Error! Network oscillating in " + "; ".join(
+                ", ".join(self.names.get_name_string(device_id) for device_id in loop) for loop in loops) + ".")
+        elif not self.network.steady_state and self.network.iterations == self.network.iteration_limit:
+            print(f"Error! Network did not settle within {self.network.iteration_limit} iterations.")
+        else:
+            print("Error! Network oscillating.")
+
     def run_command(self) -> None:
-        """Run the simulation from scratch."""
+        """Run the simulation from scratch.
+
+        If a seed follows the number of cycles, the random cold start-up is
+        seeded with it, so that the run can be repeated.
+        """
         self.cycles_completed = 0
         cycles = self.read_number(0, None)
 
+        if cycles is not None and self.character.isspace() and self.line[self.cursor:].strip():
+            seed = self.read_number(0, None)
+            if seed is None:
+                return
+            self.devices.set_seed(seed)
+
         if cycles is not None:  # if the number of cycles provided is valid
             self.monitors.reset_monitors()
             print("".join(["Running for ", str(cycles), " cycles"]))
@@ -299,6 +344,18 @@ class UserInterface:
             if self.run_network(cycles):
                 self.cycles_completed += cycles
 
+    def view_command(self) -> None:
+        """Display the monitored signals from the specified start cycle to the optional end cycle."""
+        start = self.read_number(0, self.cycles_completed)
+        if start is None:
+            return
+        end = self.cycles_completed
+        if self.character.isspace() and self.line[self.cursor:].strip():
+            end = self.read_number(start, self.cycles_completed)
+            if end is None:
+                return
+        self.monitors.display_signals(start, end)
+
     def continue_command(self) -> None:
         """Continue a previously run simulation."""
         cycles = self.read_number(0, None)
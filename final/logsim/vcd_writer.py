@@ -0,0 +1,205 @@
+"""Stream monitored signals to a Value Change Dump file.
+
+Used in the Logic Simulator project to export the signals recorded by the
+monitors to a VCD file that waveform viewers can open. Changes are handed
+to a background thread that formats and writes them, so the simulation does
+not wait for the disk.
+
+Classes
+-------
+VcdWriter - writes the changes of the monitored signals to a VCD file.
+"""
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from logsim.monitors import Monitors
+
+Port = Tuple[int, Optional[int]]  # (device_id, port_id)
+
+
+class VcdWriter:
+
+    """Write the changes of the monitored signals to a VCD file.
+
+    The writer is attached to the monitors, which pass it the signal levels
+    of every recorded cycle. Only the signals that changed are kept, and
+    they are queued in chunks of cycles for a background thread to write.
+    The queue is bounded, so a simulation much faster than the disk waits
+    for it instead of filling the memory. Each recorded cycle is one unit of
+    VCD time, counted from the first recorded cycle.
+
+    The header, which declares one variable per monitor identifier, is
+    written when the first cycle is recorded. Monitors made after that are
+    not dumped. When the monitors are reset for a new run, the file is
+    restarted, so that it holds the same run as the traces.
+
+    Parameters
+    ----------
+    path: path of the VCD file to write.
+    monitors: instance of the monitors.Monitors() class.
+    chunk_size: number of recorded cycles queued together.
+    queue_size: maximum number of chunks waiting to be written.
+
+    Public methods
+    --------------
+    record(self, signal_levels): Queues the changed signals of one cycle.
+
+    record_repeated(self, signal_levels, cycles): Queues the changed signals
+                                       of several cycles with the same levels.
+
+    restart(self): Empties the file for a new run.
+
+    flush(self): Queues the changes not yet queued.
+
+    close(self): Writes all queued changes, then closes the file.
+    """
+
+    RESTART = object()  # queued to empty the file
+
+    def __init__(self, path: str, monitors: Monitors, chunk_size: int = 256, queue_size: int = 64):
+        """Open the file and start the background writing thread."""
+        self.monitors = monitors
+        self.devices = monitors.devices
+        self.chunk_size = chunk_size
+        self.file = open(path, "w")
+
+        self.codes = None  # {port: VCD identifier code}, made with the header
+        self.last_levels = {}  # {port: last signal level written}
+        self.cycle = 0  # VCD time of the next recorded cycle
+        self.chunk = []  # [(cycle, [(port, signal level)])] not yet queued
+        self.queue = queue.Queue(queue_size)
+        self.error = None  # exception raised by the writing thread
+        self.thread = threading.Thread(target=self.write_chunks, daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> "VcdWriter":
+        """Return the writer, to be closed at the end of a with statement."""
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        """Close the writer."""
+        self.close()
+
+    @staticmethod
+    def make_code(index: int) -> str:
+        """Return the short VCD identifier code of the variable with the given index."""
+        code = ""
+        while True:
+            index, digit = divmod(index, 94)
+            code += chr(33 + digit)  # printable characters ! to ~
+            if index == 0:
+                return code
+            index -= 1
+
+    def get_value(self, signal_level: int) -> str:
+        """Return the VCD value of a signal level: 0, 1, or x if not settled or blank."""
+        if signal_level == self.devices.HIGH:
+            return "1"
+        if signal_level == self.devices.LOW:
+            return "0"
+        return "x"
+
+    def make_header(self) -> str:
+        """Assign a code to every monitored port and return the VCD header."""
+        self.codes = {}
+        lines = ["$timescale 1 ns $end", "$scope module logsim $end"]
+        for identifier, port in self.monitors.identifier_to_port.items():
+            if port not in self.codes:
+                self.codes[port] = self.make_code(len(self.codes))
+            lines.append(f"$var wire 1 {self.codes[port]} {identifier} $end")
+        lines += ["$upscope $end", "$enddefinitions $end", ""]
+        return "\n".join(lines)
+
+    def record(self, signal_levels: Dict[Port, int]) -> None:
+        """Queue the signals of one recorded cycle that changed since the last cycle."""
+        if self.error is not None:
+            raise self.error
+        if self.codes is None:
+            self.queue.put(self.make_header())
+
+        changes = []
+        last_levels = self.last_levels
+        for port, signal_level in signal_levels.items():
+            if last_levels.get(port) != signal_level and port in self.codes:
+                last_levels[port] = signal_level
+                changes.append((port, signal_level))
+        if changes or self.cycle == 0:
+            self.chunk.append((self.cycle, changes))
+        self.cycle += 1
+        if len(self.chunk) >= self.chunk_size:
+            self.flush()
+
+    def record_repeated(self, signal_levels: Dict[Port, int], cycles: int) -> None:
+        """Queue the signals of several recorded cycles with the same levels.
+
+        Only the first cycle can hold changes, so the others just advance
+        the VCD time.
+        """
+        if cycles > 0:
+            self.record(signal_levels)
+            self.cycle += cycles - 1
+
+    def restart(self) -> None:
+        """Empty the file for a new run, which starts again at VCD time 0 with a new header."""
+        if self.error is not None:
+            raise self.error
+        if self.codes is None:  # nothing recorded yet
+            return
+        self.chunk = []
+        self.queue.put(self.RESTART)
+        self.codes = None
+        self.last_levels = {}
+        self.cycle = 0
+
+    def flush(self) -> None:
+        """Queue the changes not yet queued for writing."""
+        if self.chunk:
+            self.queue.put(self.chunk)
+            self.chunk = []
+
+    def format_chunk(self, chunk: List[Tuple[int, List[Tuple[Port, int]]]]) -> str:
+        """Return the VCD text of a chunk of changes."""
+        lines = []
+        for cycle, changes in chunk:
+            lines.append(f"#{cycle}")
+            lines.extend(self.get_value(signal_level) + self.codes[port]
+                         for port, signal_level in changes)
+        lines.append("")
+        return "\n".join(lines)
+
+    def write_chunks(self) -> None:
+        """Write queued headers and chunks to the file until None is queued, emptying it for RESTART.
+
+        This runs in the background thread.
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue  # keep emptying the queue so that record never blocks
+            try:
+                if item is self.RESTART:
+                    self.file.seek(0)
+                    self.file.truncate()
+                else:
+                    self.file.write(item if isinstance(item, str) else self.format_chunk(item))
+            except Exception as error:
+                self.error = error
+
+    def close(self) -> None:
+        """Write all the queued changes and the final time, then close the file.
+
+        Raise the exception of the writing thread, if any.
+        """
+        if self.file.closed:
+            return
+        if self.codes is not None:
+            self.flush()
+            self.queue.put(f"#{self.cycle}\n")
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,150 @@
+"""Execute the gates of a compiled network with NumPy.
+
+Used in the Logic Simulator project to execute very large networks. The
+AND, OR, NAND, NOR and XOR gates of each kind are evaluated in batched NumPy
+operations instead of one at a time.
+
+Classes
+-------
+VectorizedNetwork - executes the gates of each kind in batches.
+"""
+from typing import List
+
+import numpy as np
+
+from logsim.compiled_network import CompiledNetwork
+from logsim.devices import Devices
+
+
+class VectorizedNetwork(CompiledNetwork):
+
+    """Execute the gates of each kind in batched NumPy operations.
+
+    The input signals of the gates of one kind are gathered into a matrix
+    with one row per gate, padded with a neutral signal up to the widest gate
+    of the batch (at most Devices.max_gate_inputs). The neutral signal is x,
+    the input level that never changes the output of the gate.
+
+    Executing a whole kind at once must give the same result as executing its
+    gates one after the other, where each gate already sees the new outputs
+    of the gates before it. The gates of a kind are therefore split into
+    waves: a gate is placed in a later wave than the gates of its kind before
+    it that drive it, and in the same or an earlier wave than the gates of
+    its kind after it that it reads. Waves are executed in order, so most
+    kinds need a single batch per settle iteration.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    Same as compiled_network.CompiledNetwork().
+    """
+
+    def __init__(self, devices: Devices):
+        """Lower the devices and their connections into NumPy arrays."""
+        super().__init__(devices)
+
+    def build_plan(self) -> None:
+        """Build the per-kind tuples and the gate waves from the arrays."""
+        super().build_plan()
+        devices = self.devices
+        slot_count = len(self.slot_ports)
+
+        # Two extra slots hold constant LOW and HIGH signals for padding
+        self.signals = np.full(slot_count + 2, devices.LOW, dtype=np.int8)
+        self.signals[slot_count + 1] = devices.HIGH
+        padding_slot = {devices.LOW: slot_count, devices.HIGH: slot_count + 1}
+        self.update_table = np.array(self.UPDATE_TABLE, dtype=np.int8)
+
+        # Plans of the gates of each kind, in execution order
+        kind_plans = [[plan for plan in self.gate_plan if plan[1] == x and plan[2] == y]
+                      for x, y in [(devices.HIGH, devices.HIGH), (devices.LOW, devices.LOW),
+                                   (devices.HIGH, devices.LOW), (devices.LOW, devices.HIGH)]]
+        kind_plans.append([(output_slot, None, None, None, (first_slot, second_slot))
+                           for output_slot, first_slot, second_slot in self.xor_plan])
+
+        self.gate_waves = []  # [(output slots, input slot matrix, x, y)], x is None for XOR
+        self.xor_waves = []
+        for plans in kind_plans:
+            waves = self.gate_waves if plans is not kind_plans[-1] else self.xor_waves
+            for wave in self.split_into_waves(plans):
+                width = max(len(fanin) for __, __, __, __, fanin in wave)
+                x, y = wave[0][1], wave[0][2]
+                padding = padding_slot[x] if x is not None else slot_count
+                output_slots = np.array([plan[0] for plan in wave], dtype=np.intp)
+                input_slots = np.array([list(fanin) + [padding] * (width - len(fanin))
+                                        for __, __, __, __, fanin in wave], dtype=np.intp)
+                waves.append((output_slots, input_slots, x, y))
+
+    @staticmethod
+    def split_into_waves(plans: List[tuple]) -> List[List[tuple]]:
+        """Split the gate plans of one kind into waves that can run as one batch."""
+        position = {plan[0]: index for index, plan in enumerate(plans)}  # {output slot: index}
+        readers = [[] for __ in plans]  # indices of the gates of this kind reading each gate
+        for index, plan in enumerate(plans):
+            for input_slot in plan[4]:
+                if input_slot in position:
+                    readers[position[input_slot]].append(index)
+
+        wave_of = []
+        for index, plan in enumerate(plans):
+            wave = 0
+            for input_slot in plan[4]:  # must see the new outputs of earlier drivers
+                driver = position.get(input_slot)
+                if driver is not None and driver < index:
+                    wave = max(wave, wave_of[driver] + 1)
+            for reader in readers[index]:  # must not overwrite what earlier readers see
+                if reader < index:
+                    wave = max(wave, wave_of[reader])
+            wave_of.append(wave)
+
+        waves = [[] for __ in range(max(wave_of, default=-1) + 1)]
+        for index, plan in enumerate(plans):
+            waves[wave_of[index]].append(plan)
+        return waves
+
+    def store_slots(self, slots: List[int]) -> None:
+        """Write the given signal slots back to the Device objects as integers."""
+        signals = self.signals
+        slot_outputs = self.slot_outputs
+        slot_ports = self.slot_ports
+        for slot in slots:
+            slot_outputs[slot][slot_ports[slot]] = int(signals[slot])
+
+    def get_signal_state(self) -> tuple:
+        """Return every signal slot, as bytes, and D-type memory."""
+        return self.signals.tobytes(), tuple(dtype[0].dtype_memory for dtype in self.dtype_plan)
+
+    def execute_waves(self, waves: List[tuple], changed_slots: List[int]) -> bool:
+        """Execute the given gate waves in order, adding changed slots to changed_slots.
+
+        Return True if no signal changed.
+        """
+        signals = self.signals
+        steady_state = True
+        for output_slots, input_slots, x, y in waves:
+            inputs = signals[input_slots]
+            if x is None:  # XOR: output is high only if both inputs are different
+                targets = inputs[:, 0] != inputs[:, 1]
+            elif y == self.devices.HIGH:
+                targets = (inputs == x).all(axis=1)
+            else:
+                targets = (inputs != x).any(axis=1)
+            old_signals = signals[output_slots]
+            new_signals = self.update_table[2 * old_signals + targets]
+            changed = new_signals != old_signals
+            if changed.any():
+                signals[output_slots] = new_signals
+                changed_slots.extend(output_slots[changed].tolist())
+                steady_state = False
+        return steady_state
+
+    def execute_gates(self, changed_slots: List[int]) -> bool:
+        """Execute the AND, OR, NAND and NOR gates, one batch per wave."""
+        return self.execute_waves(self.gate_waves, changed_slots)
+
+    def execute_xors(self, changed_slots: List[int]) -> bool:
+        """Execute the XOR gates, one batch per wave."""
+        return self.execute_waves(self.xor_waves, changed_slots)
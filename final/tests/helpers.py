@@ -0,0 +1,68 @@
+"""Build random networks shared by the network and simulation tests."""
+import random
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+
+
+def random_network(seed: int, size: int, compiled: bool, vectorized: bool = False,
+                   event_driven: bool = False, loop_free: bool = False) -> Network:
+    """Return a random network with every kind of device and feedback loops.
+
+    Two networks built from the same seed are identical, including the random
+    cold start-up state of their clocks and D-types. If loop_free is True,
+    gates are only driven by other kinds of device and earlier gates, and
+    D-types are only clocked, set and cleared by switches, clocks and RCs.
+    """
+    rng = random.Random(seed)
+    names = Names()
+    devices = Devices(names, seed)
+    network = Network(names, devices)
+    network.set_compiled_mode(compiled, vectorized)
+    network.set_event_driven_mode(event_driven)
+
+    outputs = []  # (device_id, port_id) of every output
+    inputs = []  # (device_id, input_id) of every input
+    kinds = [devices.AND, devices.OR, devices.NAND, devices.NOR, devices.XOR,
+             devices.D_TYPE, devices.SWITCH, devices.CLOCK, devices.RC]
+    for number in range(size):
+        [device_id] = names.lookup(["D" + str(number)])
+        kind = rng.choice(kinds)
+        if kind == devices.SWITCH:
+            devices.make_device(device_id, kind, rng.choice([0, 1]))
+        elif kind == devices.CLOCK:
+            devices.make_device(device_id, kind, rng.randint(1, 4))
+        elif kind == devices.RC:
+            devices.make_device(device_id, kind, rng.randint(1, 10))
+        elif kind in [devices.XOR, devices.D_TYPE]:
+            devices.make_device(device_id, kind)
+        else:
+            devices.make_device(device_id, kind, rng.randint(1, 4))
+        device = devices.get_device(device_id)
+        outputs += [(device_id, port_id) for port_id in device.outputs]
+        inputs += [(device_id, input_id) for input_id in device.inputs]
+
+    gate_outputs = [output for output in outputs if devices.get_device(output[0]).device_kind in devices.gate_types]
+    source_outputs = [output for output in outputs
+                      if devices.get_device(output[0]).device_kind in [devices.SWITCH, devices.CLOCK, devices.RC]]
+    other_outputs = [output for output in outputs if output not in gate_outputs]
+    for device_id, input_id in inputs:
+        if not loop_free:
+            candidates = outputs
+        elif devices.get_device(device_id).device_kind in devices.gate_types:
+            candidates = other_outputs + gate_outputs[:gate_outputs.index((device_id, None))]
+        elif input_id == devices.DATA_ID:
+            candidates = outputs
+        else:
+            candidates = source_outputs or outputs
+        output_device_id, output_port_id = rng.choice(candidates)
+        network.make_connection(output_device_id, output_port_id, device_id, input_id)
+    devices.cold_startup()
+    return network
+
+
+def network_state(network: Network) -> list:
+    """Return every output signal and D-type memory in the network."""
+    return [(device.device_id, dict(device.outputs), device.dtype_memory)
+            for device in network.devices.devices_list]
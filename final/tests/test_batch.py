@@ -0,0 +1,70 @@
+"""Test the batch module."""
+import os
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+from logsim.scanner import Scanner
+from logsim.parse import Parser
+from logsim.batch import BatchJob, BatchSimulator, read_jobs, run_batch
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_text",
+                    "test_parse_correct_text.txt")
+
+jobs = [BatchJob(30, seed, {"A": seed % 2, "D": seed // 2 % 2, "E": seed // 4 % 2})
+        for seed in range(8)]
+
+
+def run_separately(job: BatchJob) -> dict:
+    """Return the monitor traces of the job run on a freshly parsed network."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    assert Parser(names, devices, network, monitors, Scanner(path, names)).parse_network()
+    for switch_name, state in job.switch_states.items():
+        devices.set_switch(names.query(switch_name), state)
+    devices.set_seed(job.seed)
+    devices.cold_startup()
+    for __ in range(job.cycles):
+        assert network.execute_network()
+        monitors.record_signals()
+    return {identifier: monitors.signals_dictionary[port]
+            for identifier, port in monitors.identifier_to_port.items()}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(workers: int) -> None:
+    """Test if every job gives the same traces as running it on its own."""
+    results = run_batch(path, jobs, workers)
+
+    assert [result.job for result in results] == jobs
+    for result in results:
+        assert result.completed
+        assert result.traces == run_separately(result.job)
+
+
+def test_run_job_gives_errors() -> None:
+    """Test if run_job refuses invalid switch settings."""
+    simulator = BatchSimulator(path)
+    for switch_states in [{"G1": 1}, {"Missing": 0}, {"A": 2}]:
+        with pytest.raises(ValueError):
+            simulator.run_job(BatchJob(10, 0, switch_states))
+
+
+def test_read_jobs(tmp_path) -> None:
+    """Test if read_jobs reads every job and rejects invalid lines."""
+    jobs_path = tmp_path / "jobs.txt"
+    jobs_path.write_text("# cycles seed switches\n"
+                         "10 1 A=1 B=0\n"
+                         "\n"
+                         "20 2\n")
+    assert read_jobs(str(jobs_path)) == [BatchJob(10, 1, {"A": 1, "B": 0}),
+                                         BatchJob(20, 2, {})]
+
+    jobs_path.write_text("10 1 A:1\n")
+    with pytest.raises(ValueError):
+        read_jobs(str(jobs_path))
@@ -0,0 +1,56 @@
+"""Test the bit_parallel_network module."""
+import random
+
+import pytest
+
+from logsim.monitors import Monitors
+from logsim.bit_parallel_network import BitParallelNetwork, run_scenarios
+from tests.helpers import random_network
+
+
+def monitor_everything(network) -> Monitors:
+    """Return monitors on every output and input of the network."""
+    monitors = Monitors(network.names, network.devices, network)
+    for device in network.devices.devices_list:
+        for port_id in list(device.outputs) + list(device.inputs):
+            monitors.make_monitor(device.device_id, port_id, str((device.device_id, port_id)))
+    return monitors
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_scenarios_match_separate_runs(seed: int) -> None:
+    """Test if every scenario gives the same traces as running it on its own."""
+    network = random_network(seed, 40, compiled=False)
+    switches = network.devices.find_devices(network.devices.SWITCH)
+    rng = random.Random(seed)
+    # More settings than fit in one word
+    switch_settings = [{switch_id: rng.choice([0, 1]) for switch_id in switches}
+                       for __ in range(70)]
+
+    traces = run_scenarios(network, monitor_everything(network), switch_settings, 20)
+
+    assert len(traces) == len(switch_settings)
+    for switch_setting, scenario_traces in zip(switch_settings[::7], traces[::7]):
+        separate_network = random_network(seed, 40, compiled=False)
+        monitors = monitor_everything(separate_network)
+        for switch_id, state in switch_setting.items():
+            separate_network.devices.set_switch(switch_id, state)
+        for __ in range(20):
+            if not separate_network.execute_network():
+                break
+            monitors.record_signals()
+        assert scenario_traces == monitors.signals_dictionary
+
+
+def test_scenarios_leave_devices_unchanged() -> None:
+    """Test if running scenarios does not change the state of the devices."""
+    network = random_network(1, 40, compiled=False)
+    state = [(dict(device.outputs), device.dtype_memory, device.clock_counter, device.rc_counter)
+             for device in network.devices.devices_list]
+
+    bit_parallel_network = BitParallelNetwork(network.devices, [{}, {}])
+    for __ in range(10):
+        bit_parallel_network.execute(network.iteration_limit)
+
+    assert state == [(dict(device.outputs), device.dtype_memory, device.clock_counter,
+                      device.rc_counter) for device in network.devices.devices_list]
@@ -0,0 +1,102 @@
+"""Test the checkpoints module."""
+import random
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.checkpoints import CheckpointStore
+from tests.helpers import random_network
+
+
+def run(network: Network, first_cycle: int, last_cycle: int, store: CheckpointStore = None) -> list:
+    """Simulate from first_cycle up to last_cycle, flipping a switch every seventh cycle.
+
+    Return whether every cycle succeeded and the state after it. The switch
+    flips depend only on the cycle, so a run resumed from a checkpoint
+    repeats them.
+    """
+    switches = network.devices.find_devices(network.devices.SWITCH)
+    states = []
+    for cycle in range(first_cycle, last_cycle):
+        if switches and cycle % 7 == 3:
+            switch_id = switches[cycle % len(switches)]
+            network.devices.set_switch(switch_id, 1 - network.devices.get_device(switch_id).switch_state)
+        states.append((network.execute_network(), network.get_state()))
+        if store is not None:
+            store.record(cycle + 1)
+    return states
+
+
+@pytest.mark.parametrize("mode", ["interpreted", "compiled", "event_driven"])
+@pytest.mark.parametrize("seed", range(5))
+def test_restored_run_matches_original(mode: str, seed: int) -> None:
+    """Test if resuming from a checkpoint repeats the original run exactly."""
+    network = random_network(seed, 40, compiled=mode == "compiled", event_driven=mode == "event_driven")
+    store = CheckpointStore(network, interval=5)
+    store.record(0)
+    states = run(network, 0, 40, store)
+    assert len(store) == 9
+
+    for cycle in [0, 13, 20, 37]:
+        checkpoint_cycle = store.restore(cycle)
+        assert checkpoint_cycle == cycle - cycle % 5
+        if checkpoint_cycle:
+            assert network.get_state() == states[checkpoint_cycle - 1][1]
+        assert run(network, checkpoint_cycle, 40) == states[checkpoint_cycle:]
+
+
+def test_branch_from_checkpoint() -> None:
+    """Test if a what-if branch replaces the later checkpoints and the original can be resumed."""
+    network = random_network(2, 40, compiled=False)
+    switch_id = network.devices.find_devices(network.devices.SWITCH)[0]
+    store = CheckpointStore(network, interval=5)
+    store.record(0)
+    states = run(network, 0, 20, store)
+
+    store.restore(10)
+    store.discard_after(10)
+    assert store.cycles == [0, 5, 10]
+    network.devices.set_switch(switch_id, 1 - network.devices.get_device(switch_id).switch_state)
+    run(network, 10, 20, store)
+    assert store.cycles == [0, 5, 10, 15, 20]
+
+    assert store.restore(12) == 10
+    assert run(network, 10, 20) == states[10:]
+
+
+def test_least_recently_used_checkpoints_are_deleted() -> None:
+    """Test if only max_checkpoints checkpoints are kept, deleting the least recently used."""
+    network = random_network(1, 20, compiled=False)
+    store = CheckpointStore(network, interval=1, max_checkpoints=3)
+    for cycle in range(3):
+        store.save(cycle)
+    store.restore(0)  # cycle 0 becomes the most recently used
+    store.save(3)
+    assert store.cycles == [0, 2, 3]
+    assert 1 not in store
+    assert store.find_checkpoint(1) == 0
+
+    store.clear()
+    assert store.find_checkpoint(5) is None
+    with pytest.raises(KeyError):
+        store.restore(5)
+
+
+def test_state_of_different_circuit_is_rejected() -> None:
+    """Test if restoring a snapshot into a different circuit raises an error and changes nothing."""
+    network = random_network(3, 20, compiled=False)
+    state = network.get_state()
+    other_network = random_network(4, 20, compiled=False)
+    other_state = other_network.get_state()
+    with pytest.raises(ValueError):
+        other_network.set_state(state + b"\0")
+    assert other_network.get_state() == other_state
+
+    names = Names()
+    devices = Devices(names)
+    empty_network = Network(names, devices)
+    assert empty_network.get_state() == b""
+    with pytest.raises(ValueError):
+        empty_network.set_state(random.Random(0).randbytes(4))
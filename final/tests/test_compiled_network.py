@@ -0,0 +1,48 @@
+"""Test the compiled_network module."""
+import random
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from tests.helpers import random_network, network_state
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compiled_matches_interpreted(seed: int) -> None:
+    """Test if compiled execution gives the same signals as interpreted execution."""
+    interpreted = random_network(seed, 40, compiled=False)
+    compiled = random_network(seed, 40, compiled=True)
+    rng = random.Random(seed)
+    switches = interpreted.devices.find_devices(interpreted.devices.SWITCH)
+
+    for cycle in range(30):
+        if switches and cycle % 5 == 4:
+            switch_id = rng.choice(switches)
+            state = rng.choice([0, 1])
+            interpreted.devices.set_switch(switch_id, state)
+            compiled.devices.set_switch(switch_id, state)
+        assert interpreted.execute_network() == compiled.execute_network()
+        assert network_state(interpreted) == network_state(compiled)
+
+
+def test_compiled_recompiles_after_changes() -> None:
+    """Test if the compiled network is rebuilt when devices or connections are added."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    network.set_compiled_mode()
+    [SW1_ID, SW2_ID, AND1_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "And1", "I1", "I2"])
+
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+
+    # And1.I2 is unconnected
+    assert not network.execute_network()
+
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    network.make_connection(SW2_ID, None, AND1_ID, I2)
+    assert network.execute_network()
+    assert network.get_output_signal(AND1_ID, None) == devices.HIGH
@@ -38,6 +38,25 @@ def test_get_device(devices_with_items: Devices) -> None:
         assert devices_with_items.get_device(X_ID) is None
 
 
+def test_get_device_index(new_devices: Devices) -> None:
+    """Test if the device ID index stays in sync with devices_list."""
+    names = new_devices.names
+    [SW1_ID, AND1_ID] = names.lookup(["Sw1", "And1"])
+
+    assert new_devices.get_device(SW1_ID) is None
+
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 0)
+    new_devices.make_device(AND1_ID, new_devices.AND, 2)
+
+    assert new_devices.id_to_device == {device.device_id: device
+                                        for device in new_devices.devices_list}
+    assert new_devices.get_device(AND1_ID).device_kind == new_devices.AND
+
+    # Making a device twice is refused and leaves the index untouched
+    assert new_devices.make_device(SW1_ID, new_devices.SWITCH, 1) == new_devices.DEVICE_PRESENT
+    assert len(new_devices.id_to_device) == len(new_devices.devices_list) == 2
+
+
 def test_find_devices(devices_with_items: Devices) -> None:
     """Test if find_devices returns the correct devices of the given kind."""
     devices = devices_with_items
@@ -52,6 +71,36 @@ def test_find_devices(devices_with_items: Devices) -> None:
     assert devices.find_devices(devices.XOR) == []
 
 
+def test_find_devices_updates_with_new_devices(devices_with_items: Devices) -> None:
+    """Test if find_devices reflects devices added after the first call."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, NOR1_ID, SW1_ID, AND2_ID, XOR1_ID] = names.lookup(["And1", "Nor1", "Sw1",
+                                                                 "And2", "Xor1"])
+
+    and_devices = devices.find_devices(devices.AND)
+    assert and_devices == [AND1_ID]
+
+    devices.make_device(AND2_ID, devices.AND, 3)
+    devices.make_device(XOR1_ID, devices.XOR)
+
+    assert devices.find_devices(devices.AND) == [AND1_ID, AND2_ID]
+    assert devices.find_devices(devices.XOR) == [XOR1_ID]
+    assert devices.find_devices() == [AND1_ID, NOR1_ID, SW1_ID, AND2_ID, XOR1_ID]
+
+
+def test_find_devices_returns_copies(devices_with_items: Devices) -> None:
+    """Test if changing a list returned by find_devices leaves the devices unchanged."""
+    devices = devices_with_items
+    [AND1_ID, NOR1_ID, SW1_ID] = devices.names.lookup(["And1", "Nor1", "Sw1"])
+
+    devices.find_devices().clear()
+    devices.find_devices(devices.AND).append(SW1_ID)
+
+    assert devices.find_devices() == [AND1_ID, NOR1_ID, SW1_ID]
+    assert devices.find_devices(devices.AND) == [AND1_ID]
+
+
 def test_make_device(new_devices: Devices) -> None:
     """Test if make_device correctly makes devices with their properties."""
     names = new_devices.names
@@ -148,3 +197,73 @@ def test_set_switch(new_devices: Devices) -> None:
     # Set switch Sw1 to LOW
     new_devices.set_switch(SW1_ID, new_devices.LOW)
     assert switch_object.switch_state == new_devices.LOW
+
+
+def startup_devices(seed: int) -> Devices:
+    """Return devices with clocks and D-types, made with the given seed."""
+    names = Names()
+    devices = Devices(names, seed)
+    for number in range(10):
+        [CLOCK_ID, D_ID] = names.lookup(["Clock" + str(number), "D" + str(number)])
+        devices.make_device(CLOCK_ID, devices.CLOCK, 10)
+        devices.make_device(D_ID, devices.D_TYPE)
+    return devices
+
+
+def startup_signals(devices: Devices) -> list:
+    """Return the outputs, memory and counter of every device."""
+    return [(dict(device.outputs), device.dtype_memory, device.clock_counter)
+            for device in devices.devices_list]
+
+
+def test_cold_startup_seed() -> None:
+    """Test if seeded cold start-ups are repeatable."""
+    first_devices = startup_devices(1)
+    second_devices = startup_devices(1)
+    assert startup_signals(first_devices) == startup_signals(second_devices)
+
+    # Seeding again repeats the same start-up
+    first_devices.set_seed(7)
+    first_devices.cold_startup()
+    first_state = startup_signals(first_devices)
+    first_devices.cold_startup()
+    assert startup_signals(first_devices) != first_state
+    first_devices.set_seed(7)
+    first_devices.cold_startup()
+    assert startup_signals(first_devices) == first_state
+
+
+def test_cold_startup_replay() -> None:
+    """Test if a recorded start-up state is replayed exactly."""
+    devices = startup_devices(1)
+    devices.cold_startup()
+    startup_state = devices.get_startup_state()
+    state = startup_signals(devices)
+    assert len(startup_state) == len(devices.devices_list)
+
+    devices.cold_startup()
+    devices.cold_startup(startup_state)
+    assert startup_signals(devices) == state
+    assert devices.get_startup_state() == startup_state
+
+
+def test_state_round_trip() -> None:
+    """Test if a state snapshot restores every signal, memory and counter."""
+    devices = startup_devices(1)
+    [SW1_ID, RC1_ID] = devices.names.lookup(["Sw1", "Rc1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(RC1_ID, devices.RC, 5)
+    state = devices.get_state()
+    signals = startup_signals(devices)
+    # One byte per output, memory and switch, eight per counter
+    assert len(state) == 32 + 10 + 1 + 8 * 11
+
+    devices.cold_startup()
+    devices.set_switch(SW1_ID, devices.LOW)
+    devices.get_device(RC1_ID).rc_counter = 3
+    devices.set_state(state)
+    assert startup_signals(devices) == signals
+    assert devices.get_device(SW1_ID).switch_state == devices.HIGH
+    assert devices.get_device(RC1_ID).rc_counter is None  # not set before the snapshot
+    with pytest.raises(ValueError):
+        devices.set_state(state[1:])
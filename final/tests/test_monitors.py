@@ -5,6 +5,7 @@ from logsim.names import Names
 from logsim.network import Network
 from logsim.devices import Devices
 from logsim.monitors import Monitors
+from logsim.traces import RunLengthTrace, SpillingTrace
 
 
 @pytest.fixture
@@ -129,6 +130,36 @@ def test_remove_monitor_by_identifier(new_monitors: Monitors) -> None:
                                                (OR1_ID, I2): {"Input2"}}
 
 
+def test_bulk_make_and_remove(new_monitors: Monitors) -> None:
+    """Test if monitors are made and removed in bulk, keeping both indexes inverse."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "Or1",
+                                                     "I1", "I2"])
+    switch_ids = names.lookup([f"Sw{index}" for index in range(3, 1003)])
+    for switch_id in switch_ids:
+        devices.make_device(switch_id, devices.SWITCH, 0)
+
+    errors = new_monitors.make_monitors([(switch_id, None, f"M{switch_id}") for switch_id in switch_ids]
+                                        + [(SW1_ID, None, "B"), (SW1_ID, None, "B2")])
+    assert errors[:-2] == [new_monitors.NO_ERROR] * 1000
+    assert errors[-2:] == [new_monitors.MONITOR_IDENTIFIER_PRESENT, new_monitors.NO_ERROR]
+
+    assert new_monitors.remove_monitors_by_port(
+        [(switch_id, None) for switch_id in switch_ids[::2]] + [(SW1_ID, None), (SW1_ID, None)]
+    ) == [True] * 501 + [False]
+    assert new_monitors.remove_monitors_by_identifier(
+        [f"M{switch_id}" for switch_id in switch_ids[1::2]] + ["A1", "A1"]) == [True] * 501 + [False]
+
+    assert new_monitors.port_to_identifier == {(SW2_ID, None): {"C"},
+                                               (OR1_ID, None): {"A2"},
+                                               (OR1_ID, I1): {"Input1"},
+                                               (OR1_ID, I2): {"Input2"}}
+    assert new_monitors.identifier_to_port == {"C": (SW2_ID, None), "A2": (OR1_ID, None),
+                                               "Input1": (OR1_ID, I1), "Input2": (OR1_ID, I2)}
+    assert set(new_monitors.signals_dictionary) == set(new_monitors.port_to_identifier)
+
+
 def test_get_signal_names(new_monitors: Monitors) -> None:
     """Test if get_signal_names returns the correct signal name lists."""
     names = new_monitors.names
@@ -176,6 +207,58 @@ def test_record_signals(new_monitors: Monitors) -> None:
         (OR1_ID, I2): [LOW, LOW, HIGH]}
 
 
+def test_gather_plan_follows_changes(new_monitors: Monitors) -> None:
+    """Test if recording follows new connections and monitors after the plan is built."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID, AND1_ID, I1] = names.lookup(["Sw1", "Or1", "And1", "I1"])
+
+    HIGH = devices.HIGH
+    LOW = devices.LOW
+
+    devices.set_switch(SW1_ID, HIGH)
+    network.execute_network()
+    new_monitors.record_signals()
+    assert new_monitors.gather_plan is not None
+
+    # A monitored input is connected after the plan was built
+    devices.make_device(AND1_ID, devices.AND, 1)
+    assert new_monitors.make_monitor(AND1_ID, I1, "D", 1) == new_monitors.NO_ERROR
+    assert new_monitors.make_monitor(AND1_ID, None, "E", 1) == new_monitors.NO_ERROR
+    new_monitors.build_gather_plan()
+    network.make_connection(OR1_ID, None, AND1_ID, I1)
+    network.execute_network()
+    new_monitors.record_signals()
+    assert new_monitors.signals_dictionary[(AND1_ID, I1)] == [devices.BLANK, HIGH]
+    assert new_monitors.signals_dictionary[(AND1_ID, None)] == [devices.BLANK, HIGH]
+
+    new_monitors.remove_monitor_by_identifier("E")
+    devices.set_switch(SW1_ID, LOW)
+    network.execute_network()
+    new_monitors.record_signals()
+    assert new_monitors.signals_dictionary[(AND1_ID, I1)] == [devices.BLANK, HIGH, LOW]
+    assert (AND1_ID, None) not in new_monitors.signals_dictionary
+    for port, trace in new_monitors.signals_dictionary.items():
+        assert trace[-1] == new_monitors.get_monitor_signal(*port)
+
+
+def test_record_unconnected_input(new_monitors: Monitors) -> None:
+    """Test if a monitored input that is not connected is recorded as BLANK."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [AND1_ID, I1] = names.lookup(["And1", "I1"])
+
+    devices.make_device(AND1_ID, devices.AND, 1)
+    assert new_monitors.make_monitor(AND1_ID, I1, "D") == new_monitors.NO_ERROR
+    for _ in range(2):
+        network.execute_network()
+        new_monitors.record_signals()
+    new_monitors.record_repeated_signals(2)
+    assert new_monitors.signals_dictionary[(AND1_ID, I1)] == [devices.BLANK] * 4
+
+
 def test_get_margin(new_monitors: Monitors) -> None:
     """Test if get_margin returns the length of the longest monitor name."""
     names = new_monitors.names
@@ -215,6 +298,83 @@ def test_reset_monitors(new_monitors: Monitors) -> None:
                                                (OR1_ID, I2): []}
 
 
+def test_rewind_monitors(new_monitors: Monitors) -> None:
+    """Test if rewind_monitors removes the signal levels of the last cycles."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW3_ID] = names.lookup(["Sw1", "Sw3"])
+    devices.make_device(SW3_ID, devices.SWITCH, 1)
+
+    for __ in range(3):
+        new_monitors.record_signals()
+    devices.set_switch(SW1_ID, devices.HIGH)
+    new_monitors.network.execute_network()
+    new_monitors.make_monitor(SW3_ID, None, "D")  # monitored from the fourth cycle on
+    new_monitors.record_signals()
+    new_monitors.rewind_monitors(1)
+    assert new_monitors.signals_dictionary[(SW1_ID, None)] == [devices.LOW] * 3
+    assert new_monitors.signals_dictionary[(SW3_ID, None)] == []
+
+    # Recording continues from the rewound cycle
+    new_monitors.record_signals()
+    assert new_monitors.signals_dictionary[(SW1_ID, None)] == [devices.LOW] * 3 + [devices.HIGH]
+
+
+def test_run_length_encoding(new_monitors: Monitors) -> None:
+    """Test if run-length traces record the same signals as byte traces."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    HIGH = devices.HIGH
+    LOW = devices.LOW
+
+    network.execute_network()
+    new_monitors.record_signals()
+    new_monitors.set_run_length_encoding()  # converts the recorded traces
+    devices.set_switch(SW1_ID, HIGH)
+    for _ in range(3):
+        network.execute_network()
+        new_monitors.record_signals()
+
+    assert isinstance(new_monitors.signals_dictionary[(OR1_ID, None)], RunLengthTrace)
+    assert new_monitors.signals_dictionary[(OR1_ID, None)] == [LOW, HIGH, HIGH, HIGH]
+    assert new_monitors.signals_dictionary[(OR1_ID, None)].get_changes() == [(0, LOW), (1, HIGH)]
+
+    new_monitors.reset_monitors()
+    assert isinstance(new_monitors.signals_dictionary[(SW1_ID, None)], RunLengthTrace)
+
+    [SW3_ID] = names.lookup(["Sw3"])
+    devices.make_device(SW3_ID, devices.SWITCH, 0)
+    new_monitors.make_monitor(SW3_ID, None, "D", cycles_completed=2)
+    assert new_monitors.signals_dictionary[(SW3_ID, None)].get_changes() == [(0, devices.BLANK)]
+
+
+def test_memory_budget(tmp_path, new_monitors: Monitors) -> None:
+    """Test if traces spill to disk beyond the memory budget."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    new_monitors.set_memory_budget(10000, str(tmp_path))
+    for cycle in range(6000):
+        devices.set_switch(SW1_ID, cycle % 3 == 0)
+        network.execute_network()
+        new_monitors.record_signals()
+
+    trace = new_monitors.signals_dictionary[(OR1_ID, None)]
+    assert isinstance(trace, SpillingTrace) and trace.spilled > 0
+    assert trace == [devices.HIGH, devices.LOW, devices.LOW] * 2000
+    assert new_monitors.memory_budget.in_memory <= 10000 + 5 * 4096
+
+    new_monitors.reset_monitors()
+    assert new_monitors.memory_budget.in_memory == 0
+    new_monitors.set_memory_budget(None)
+    assert not isinstance(new_monitors.signals_dictionary[(OR1_ID, None)], SpillingTrace)
+
+
 def test_display_signals(capsys, new_monitors: Monitors) -> None:
     """Test if signal traces are displayed correctly on the console."""
     names = new_monitors.names
@@ -263,6 +423,36 @@ def test_display_signals(capsys, new_monitors: Monitors) -> None:
     assert "" in traces  # additional empty line at the end
 
 
+def test_display_signals_window(capsys, new_monitors: Monitors) -> None:
+    """Test if a range of cycles is displayed, summarised to fit the width."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    for cycle in range(100):
+        devices.set_switch(SW1_ID, cycle >= 50)
+        network.execute_network()
+        new_monitors.record_signals()
+
+    new_monitors.display_signals(45, 55)
+    traces = capsys.readouterr()[0].split("\n")
+    assert traces[:2] == ["A1    : _____-----", "B     : _____-----"]
+    assert len(traces) == 7
+
+    # 100 cycles in 10 columns of 10 cycles each
+    new_monitors.display_signals(width=18)
+    traces = capsys.readouterr()[0].split("\n")
+    assert traces[0] == "Cycles 0 to 100, 10 cycles per character (~: changing)"
+    assert "A1    : _____-----" in traces
+
+    # 100 cycles in 7 columns of 15 cycles each
+    new_monitors.display_signals(width=15)
+    traces = capsys.readouterr()[0].split("\n")
+    assert "C     : _______" in traces
+    assert "B     : ___~---" in traces
+
+
 def test_fetch_identifier_to_device_name(new_monitors: Monitors) -> None:
     assert new_monitors.fetch_identifier_to_device_port_name()["A1"] == ("Or1", None)
     assert new_monitors.fetch_identifier_to_device_port_name()["A2"] == ("Or1", None)
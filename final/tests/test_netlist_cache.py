@@ -0,0 +1,161 @@
+"""Test the netlist_cache module."""
+import json
+import os
+import shutil
+from typing import Optional
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+from logsim.scanner import BufferedScanner
+from logsim.parse import Parser
+from logsim.netlist_cache import NetlistCache
+
+text_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_text")
+
+
+@pytest.fixture
+def definition_path(tmp_path) -> str:
+    """Return the path of a copy of a correct definition file."""
+    path = str(tmp_path / "circuit.txt")
+    shutil.copy(os.path.join(text_directory, "test_parse_correct_text.txt"), path)
+    return path
+
+
+def new_parser(path: str, cache: Optional[NetlistCache], seed: Optional[int] = None) -> Parser:
+    """Return a parser of the file at path with newly made simulator classes."""
+    names = Names()
+    devices = Devices(names, seed)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    return Parser(names, devices, network, monitors, BufferedScanner(path, names), cache)
+
+
+def run(parser: Parser, cycles: int = 30) -> dict:
+    """Run the parsed network and return the traces of every monitor identifier."""
+    for __ in range(cycles):
+        assert parser.network.execute_network()
+        parser.monitors.record_signals()
+    return {identifier: list(parser.monitors.signals_dictionary[port])
+            for identifier, port in parser.monitors.identifier_to_port.items()}
+
+
+def test_cached_circuit_matches_parsed(tmp_path, definition_path: str) -> None:
+    """Test if a cached circuit is loaded without parsing and simulates like the parsed one."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    parsed = new_parser(definition_path, cache, seed=3)
+    assert parsed.parse_network()
+    assert len(os.listdir(cache.directory)) == 1
+
+    cached = new_parser(definition_path, cache, seed=3)
+    assert cached.parse_network()
+    assert cached.tokens is None  # the file was not scanned
+    assert cached.names.name_to_id == parsed.names.name_to_id
+    assert cached.devices.find_devices() == parsed.devices.find_devices()
+    assert cached.network.connection_count == parsed.network.connection_count
+    assert list(cached.monitors.identifier_to_port.items()) == list(parsed.monitors.identifier_to_port.items())
+    assert cached.devices.get_startup_state() == parsed.devices.get_startup_state()
+    assert [str(warning) for warning in cached.fetch_warning_output()] == [
+        str(warning) for warning in parsed.fetch_warning_output()]
+    assert "buffer" not in vars(cached.scanner)  # nor read
+    assert run(cached) == run(parsed)
+
+
+def test_changed_file_is_parsed_again(tmp_path, definition_path: str) -> None:
+    """Test if changing the file, or a damaged cache file, makes the circuit be parsed again."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    assert new_parser(definition_path, cache).parse_network()
+
+    with open(definition_path, "a") as definition_file:
+        definition_file.write("\n# changed\n")
+    parser = new_parser(definition_path, cache)
+    assert parser.parse_network()
+    assert parser.tokens is not None
+    assert len(os.listdir(cache.directory)) == 2
+
+    with open(cache.get_cache_path(cache.get_key(definition_path)), "wb") as cache_file:
+        cache_file.write(b"not JSON")
+    parser = new_parser(definition_path, cache)
+    assert parser.parse_network()
+    assert parser.tokens is not None
+
+
+@pytest.mark.parametrize("change", [
+    lambda circuit: circuit.update(version=NetlistCache.VERSION - 1),
+    lambda circuit: circuit.update(names=circuit["names"][1:]),
+    lambda circuit: circuit["devices"].append([len(circuit["names"]), 0, None]),
+    lambda circuit: circuit["connections"].append(["S1", None, "G1", "I1"]),
+    lambda circuit: circuit.update(monitors={}),
+])
+def test_invalid_cache_file_is_ignored(tmp_path, definition_path: str, change) -> None:
+    """Test if a cache file of another version or with data not referring to its names is parsed again."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    assert new_parser(definition_path, cache).parse_network()
+    cache_path = cache.get_cache_path(cache.get_key(definition_path))
+    with open(cache_path) as cache_file:
+        circuit = json.load(cache_file)
+    change(circuit)
+    with open(cache_path, "w") as cache_file:
+        json.dump(circuit, cache_file)
+    parser = new_parser(definition_path, cache)
+    assert parser.parse_network()
+    assert parser.tokens is not None
+
+
+def test_cache_file_holds_only_data(tmp_path, definition_path: str) -> None:
+    """Test if the cache file lists the devices, connections and monitors by name ID."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    parser = new_parser(definition_path, cache)
+    assert parser.parse_network()
+    with open(cache.get_cache_path(cache.get_key(definition_path))) as cache_file:
+        circuit = json.load(cache_file)
+    devices = parser.devices
+    assert circuit["format"] == NetlistCache.FORMAT
+    assert circuit["names"][:3] == [parser.names.get_name_string(name_id) for name_id in range(3)]
+    assert [device_id for device_id, __, __ in circuit["devices"]] == devices.find_devices()
+    assert len(circuit["connections"]) == parser.network.connection_count
+    assert [identifier for __, __, identifier in circuit["monitors"]] == list(parser.monitors.identifier_to_port)
+
+    # A device property no device can have is only found when the circuit is made
+    circuit["devices"][0][2] = -1
+    with open(cache.get_cache_path(cache.get_key(definition_path)), "w") as cache_file:
+        json.dump(circuit, cache_file)
+    with pytest.raises(ValueError):
+        new_parser(definition_path, cache).parse_network()
+
+
+def test_circuits_with_errors_are_not_cached(tmp_path) -> None:
+    """Test if circuits with errors are reported again instead of being cached."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    path = os.path.join(text_directory, "test_parse_all_error_1.txt")
+    for __ in range(2):
+        parser = new_parser(path, cache)
+        assert not parser.parse_network()
+        assert parser.fetch_error_output()
+    assert not os.path.exists(cache.directory)
+
+
+def test_old_entries_are_removed(tmp_path, definition_path: str) -> None:
+    """Test if only the most recently used circuits are kept."""
+    cache = NetlistCache(str(tmp_path / "cache"), max_entries=2)
+    for version in range(4):
+        with open(definition_path, "a") as definition_file:
+            definition_file.write(f"\n# version {version}\n")
+        assert new_parser(definition_path, cache).parse_network()
+    assert len(os.listdir(cache.directory)) == 2
+    assert cache.get_key(definition_path) + ".json" in os.listdir(cache.directory)
+
+
+def test_unseeded_circuit_gets_new_start_up(tmp_path, definition_path: str) -> None:
+    """Test if a circuit cached without a seed is loaded with a new random start-up."""
+    cache = NetlistCache(str(tmp_path / "cache"))
+    assert new_parser(definition_path, cache).parse_network()
+    cached = new_parser(definition_path, cache)
+    assert cached.parse_network()
+    assert cached.tokens is None
+    assert set(cached.devices.get_startup_state()) == set(cached.devices.find_devices(cached.devices.D_TYPE)
+                                                          + cached.devices.find_devices(cached.devices.CLOCK))
+    assert len(run(cached)["S1"]) == 30
@@ -1,17 +1,27 @@
 """Test the network module."""
+import functools
+import random
+
 import pytest
 
 from logsim.names import Names
 from logsim.devices import Devices
 from logsim.network import Network
+from logsim.compiled_network import CompiledNetwork
+from logsim import network as network_module
+from tests.helpers import random_network, network_state
 
 
-@pytest.fixture
-def new_network() -> Network:
-    """Return a new instance of the Network class."""
+@pytest.fixture(params=["interpreted", "compiled", "event_driven", "levelized"])
+def new_network(request) -> Network:
+    """Return a new instance of the Network class, in each execution mode."""
     new_names = Names()
     new_devices = Devices(new_names)
-    return Network(new_names, new_devices)
+    network = Network(new_names, new_devices)
+    network.set_compiled_mode(request.param == "compiled")
+    network.set_event_driven_mode(request.param == "event_driven")
+    network.set_levelized_mode(request.param == "levelized")
+    return network
 
 
 @pytest.fixture
@@ -115,6 +125,43 @@ def test_check_network(network_with_devices: Network) -> None:
     assert network.check_network()
 
 
+def test_unconnected_inputs_and_unused_outputs(network_with_devices: Network) -> None:
+    """Test if unconnected inputs and outputs connected to no input are found."""
+    network = network_with_devices
+    names = network.devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "Or1", "I1",
+                                                     "I2"])
+    assert network.get_unconnected_inputs() == [(OR1_ID, I1), (OR1_ID, I2)]
+    assert network.get_unused_outputs() == [(SW1_ID, None), (SW2_ID, None), (OR1_ID, None)]
+
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+    network.make_connection(SW2_ID, None, OR1_ID, I2)  # input already connected
+
+    assert network.get_unconnected_inputs() == []
+    assert network.get_unused_outputs() == [(SW2_ID, None), (OR1_ID, None)]
+    assert network.output_loads[(SW1_ID, None)] == 2
+
+
+def test_undriven_outputs(network_with_devices: Network) -> None:
+    """Test if the outputs of gates only connected to each other are found."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, OR1_ID, G1_ID, G2_ID, G3_ID, I1, I2] = names.lookup(["Sw1", "Or1", "G1", "G2", "G3", "I1", "I2"])
+    for gate_id in [G1_ID, G2_ID, G3_ID]:
+        devices.make_device(gate_id, devices.NAND, 1)
+    network.make_connection(G1_ID, None, G2_ID, I1)
+    network.make_connection(G2_ID, None, G1_ID, I1)
+    network.make_connection(G2_ID, None, OR1_ID, I1)
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+    network.make_connection(OR1_ID, None, G3_ID, I1)
+
+    assert network.get_undriven_outputs() == [(G1_ID, None), (G2_ID, None)]
+
+
 def test_make_connection(network_with_devices: Network) -> None:
     """Test if the make_connection function correctly connects devices."""
     network = network_with_devices
@@ -341,3 +388,280 @@ def test_oscillating_network(new_network: Network) -> None:
     network.make_connection(NOR1, None, NOR1, I1)
 
     assert not network.execute_network()
+
+
+def test_oscillation_is_detected(new_network: Network) -> None:
+    """Test if oscillation is detected when a state repeats, and the loop causing it is found."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, G1, G2, G3, G4, I1] = names.lookup(["Sw1", "G1", "G2", "G3", "G4", "I1"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for gate_id in [G1, G2, G3, G4]:
+        devices.make_device(gate_id, devices.NAND, 1)
+    # Ring of three inverters, and an inverter outside the ring
+    network.make_connection(G1, None, G2, I1)
+    network.make_connection(G2, None, G3, I1)
+    network.make_connection(G3, None, G1, I1)
+    network.make_connection(SW1, None, G4, I1)
+
+    network.set_iteration_limit(1000)
+    assert not network.execute_network()
+    assert network.oscillating
+    assert network.iterations < 1000
+    assert network.find_oscillating_loops() == [[G1, G2, G3]]
+
+
+class CollidingState(tuple):
+
+    """A state whose hash is the hash of every other state."""
+
+    def __hash__(self) -> int:
+        """Return the same hash for every state."""
+        return 0
+
+
+def colliding(get_signal_state):
+    """Return a get_signal_state method returning the states of the given one with colliding hashes."""
+    return lambda self: CollidingState(get_signal_state(self))
+
+
+def test_hash_collisions_are_not_oscillation(monkeypatch, new_network: Network) -> None:
+    """Test if different states with equal hashes let deep logic settle instead of being taken as oscillation."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    for engine in [Network, CompiledNetwork]:
+        monkeypatch.setattr(engine, "get_signal_state", colliding(engine.get_signal_state))
+    monkeypatch.setattr(network_module, "hash", lambda value: 0, raising=False)
+
+    # Gates are defined in the reverse order of the chain, so every sweep
+    # moves a change one gate further
+    [SW1, I1] = names.lookup(["Sw1", "I1"])
+    gate_ids = names.lookup(["G" + str(number) for number in range(10)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for driver_id, gate_id in zip([SW1] + gate_ids, gate_ids):
+        network.make_connection(driver_id, None, gate_id, I1)
+
+    for switch_state in [devices.LOW, devices.HIGH]:
+        devices.set_switch(SW1, switch_state)
+        assert network.execute_network()
+        assert not network.oscillating
+    assert network.get_output_signal(gate_ids[-1], None) == devices.HIGH
+
+
+def test_iteration_limit() -> None:
+    """Test if deep logic that needs more iterations than the limit settles once the limit is raised."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1, I1] = names.lookup(["Sw1", "I1"])
+
+    # Gates are defined in the reverse order of the chain, so every sweep
+    # moves a change one gate further
+    gate_ids = names.lookup(["G" + str(number) for number in range(30)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for driver_id, gate_id in zip([SW1] + gate_ids, gate_ids):
+        network.make_connection(driver_id, None, gate_id, I1)
+
+    assert not network.execute_network()
+    assert not network.oscillating
+    assert network.iterations == network.iteration_limit == 20
+
+    with pytest.raises(ValueError):
+        network.set_iteration_limit(0)
+    network.set_iteration_limit(100)
+    assert network.execute_network()
+    assert network.iterations > 20
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_event_driven_matches_interpreted(seed: int) -> None:
+    """Test if event-driven execution gives the same signals as interpreted execution."""
+    interpreted = random_network(seed, 40, compiled=False)
+    event_driven = random_network(seed, 40, compiled=False, event_driven=True)
+    rng = random.Random(seed)
+    switches = interpreted.devices.find_devices(interpreted.devices.SWITCH)
+
+    for cycle in range(30):
+        if switches and cycle % 5 == 4:
+            switch_id = rng.choice(switches)
+            state = rng.choice([0, 1])
+            interpreted.devices.set_switch(switch_id, state)
+            event_driven.devices.set_switch(switch_id, state)
+        if cycle == 20:  # restart both networks from the same random state
+            interpreted.devices.set_seed(seed)
+            interpreted.devices.cold_startup()
+            event_driven.devices.set_seed(seed)
+            event_driven.devices.cold_startup()
+        assert interpreted.execute_network() == event_driven.execute_network()
+        assert network_state(interpreted) == network_state(event_driven)
+
+
+def test_event_driven_executes_changed_devices() -> None:
+    """Test if event-driven execution only executes devices whose inputs changed."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    network.set_event_driven_mode()
+    [SW1_ID, SW2_ID, I1] = names.lookup(["Sw1", "Sw2", "I1"])
+
+    # Two independent chains of ten NOT gates, each driven by a switch
+    for switch_id in [SW1_ID, SW2_ID]:
+        devices.make_device(switch_id, devices.SWITCH, 0)
+        driver_id = switch_id
+        for number in range(10):
+            [gate_id] = names.lookup([names.get_name_string(switch_id) + "G" + str(number)])
+            devices.make_device(gate_id, devices.NAND, 1)
+            network.make_connection(driver_id, None, gate_id, I1)
+            driver_id = gate_id
+    assert network.execute_network()
+
+    executed = []
+
+    def record_execution(execute_function, device_id: int) -> bool:
+        executed.append(device_id)
+        return execute_function(device_id)
+
+    network.execution_list = [(device_id, functools.partial(record_execution, execute_function))
+                              for device_id, execute_function in network.execution_list]
+
+    # Nothing changed: only the switches are executed
+    assert network.execute_network()
+    assert sorted(executed) == sorted([SW1_ID, SW2_ID])
+
+    # Only the chain of the toggled switch is executed again
+    executed.clear()
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert network.execute_network()
+    assert {names.get_name_string(device_id)[:3] for device_id in executed} == {"Sw1", "Sw2"}
+    assert not any(names.get_name_string(device_id).startswith("Sw2G") for device_id in executed)
+    assert network.get_output_signal(SW1_ID, None) == devices.HIGH
+
+
+def test_find_gate_loops(new_network: Network) -> None:
+    """Test if find_gate_loops groups the gates of each loop in levelized order."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    [SW1, G1, G2, G3, G4, I1, I2] = names.lookup(["Sw1", "G1", "G2", "G3", "G4", "I1", "I2"])
+
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for gate_id in [G1, G2, G3, G4]:
+        devices.make_device(gate_id, devices.NAND, 2)
+    # G1 drives the loop of G2 and G3, which drives G4
+    network.make_connection(G3, None, G4, I1)
+    network.make_connection(G3, None, G4, I2)
+    network.make_connection(G1, None, G2, I1)
+    network.make_connection(G3, None, G2, I2)
+    network.make_connection(G2, None, G3, I1)
+    network.make_connection(G2, None, G3, I2)
+    network.make_connection(SW1, None, G1, I1)
+    network.make_connection(SW1, None, G1, I2)
+
+    assert network.find_gate_loops() == [[G1], [G2, G3], [G4]]
+
+
+@pytest.mark.parametrize("depth", [5, 30])
+def test_levelized_settles_chains_in_one_pass(depth: int) -> None:
+    """Test if levelized mode settles a chain of gates of any depth in one pass."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    network.set_levelized_mode()
+    [SW1, I1] = names.lookup(["Sw1", "I1"])
+
+    # Gates are defined in the reverse order of the chain
+    gate_ids = names.lookup(["G" + str(number) for number in range(depth)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for driver_id, gate_id in zip([SW1] + gate_ids, gate_ids):
+        network.make_connection(driver_id, None, gate_id, I1)
+
+    assert network.execute_network()
+    devices.set_switch(SW1, devices.HIGH)
+    assert network.execute_network()
+
+    # One pass propagates the change, one completes the RISING and FALLING
+    # transitions and one confirms the steady state
+    assert network.iterations == 3
+    expected = devices.LOW if depth % 2 else devices.HIGH
+    assert network.get_output_signal(gate_ids[-1], None) == expected
+
+
+def latched_chain(depth: int) -> Network:
+    """Return a network of a chain of gates of the given depth, the first of which drives a latch."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1, SW2, SET, RESET, I1, I2] = names.lookup(["Sw1", "Sw2", "Set", "Reset", "I1", "I2"])
+
+    # Gates are defined in the reverse order of the chain
+    gate_ids = names.lookup(["G" + str(number) for number in range(depth)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for driver_id, gate_id in zip([SW1] + gate_ids, gate_ids):
+        network.make_connection(driver_id, None, gate_id, I1)
+
+    # A latch, held set by a switch
+    devices.make_device(SW2, devices.SWITCH, 1)
+    devices.make_device(SET, devices.NOR, 2)
+    devices.make_device(RESET, devices.NOR, 2)
+    network.make_connection(SW2, None, SET, I1)
+    network.make_connection(RESET, None, SET, I2)
+    network.make_connection(gate_ids[0], None, RESET, I1)
+    network.make_connection(SET, None, RESET, I2)
+    return network
+
+
+def test_levelized_keeps_kind_order_only_for_loops() -> None:
+    """Test if only a latch and the gates driving it keep the kind order, and the saved iterations are counted."""
+    interpreted = latched_chain(10)
+    levelized = latched_chain(10)
+    levelized.set_levelized_mode(count_saved_iterations=True)
+    names = levelized.names
+    [SW1, SET, RESET, G0] = names.lookup(["Sw1", "Set", "Reset", "G0"])
+    assert levelized.get_kind_order_gates() == {SET, RESET, G0}
+
+    for switch_state in [0, 1, 0]:
+        interpreted.devices.set_switch(SW1, switch_state)
+        levelized.devices.set_switch(SW1, switch_state)
+        assert interpreted.execute_network()
+        assert levelized.execute_network()
+        assert network_state(interpreted) == network_state(levelized)
+        assert levelized.iterations_saved == interpreted.iterations - levelized.iterations
+    # The chain after the first gate is levelized
+    assert levelized.iterations_saved > 0
+    assert interpreted.iterations_saved is None
+
+
+@pytest.mark.parametrize("loop_free", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_levelized_matches_interpreted(seed: int, loop_free: bool) -> None:
+    """Test if levelized execution settles to the same signals as interpreted execution."""
+    interpreted = random_network(seed, 40, compiled=False, loop_free=loop_free)
+    levelized = random_network(seed, 40, compiled=False, loop_free=loop_free)
+    levelized.set_levelized_mode()
+    # Only networks with gate loops keep gates in the kind order
+    assert bool(levelized.get_kind_order_gates()) != loop_free
+    rng = random.Random(seed)
+    switches = interpreted.devices.find_devices(interpreted.devices.SWITCH)
+
+    for cycle in range(30):
+        if switches and cycle % 5 == 4:
+            switch_id = rng.choice(switches)
+            state = rng.choice([0, 1])
+            interpreted.devices.set_switch(switch_id, state)
+            levelized.devices.set_switch(switch_id, state)
+        # The levelized order can settle deeper logic within the iteration limit
+        if not interpreted.execute_network():
+            break
+        assert levelized.execute_network()
+        assert network_state(interpreted) == network_state(levelized)
@@ -243,6 +243,36 @@ def test_parse_network(new_parser, path, expected_result):
     assert new_parser.parse_network() == expected_result
 
 
+@pytest.mark.parametrize("path, expected_warnings", [
+    (path_correct, ["'D2.QBAR'", "'G3'", "'G5'"]),
+    (path_correct_2, []),
+    (path_test_parse_oscillating, ["'SW1'"])
+])
+def test_parse_unused_output_warnings(new_parser, path, expected_warnings):
+    """Test if outputs neither connected nor monitored are warned about without failing the parse."""
+
+    assert new_parser.parse_network()
+    warnings = [warning for warning in new_parser.fetch_warning_output()
+                if warning.warning_code == new_parser.error_handler.UNUSED_OUTPUT]
+    assert len(warnings) == len(expected_warnings)
+    assert all(name in warning.message for warning, name in zip(warnings, expected_warnings))
+
+
+@pytest.mark.parametrize("path, expected_warnings", [
+    (path_correct, []),
+    (path_correct_2, []),
+    (path_test_parse_oscillating, ["'NOR1'"])
+])
+def test_parse_undriven_output_warnings(new_parser, path, expected_warnings):
+    """Test if gate outputs that no switch, clock, RC or D-type drives are warned about."""
+
+    assert new_parser.parse_network()
+    warnings = [warning for warning in new_parser.fetch_warning_output()
+                if warning.warning_code == new_parser.error_handler.UNDRIVEN_OUTPUT]
+    assert [warning.message for warning in warnings] == [
+        f"Output {name} is not driven by any switch, clock, RC or D-type" for name in expected_warnings]
+
+
 @pytest.mark.parametrize("path, expected_content", [
     (path_all_error_1, all_error_1_expected_content),
     (path_all_error_2, all_error_2_expected_content),
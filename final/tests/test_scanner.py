@@ -1,9 +1,10 @@
 """Test the scanner module with 'test_scanner_text.txt'."""
 import pytest
+import glob
 import os
 from contextlib import contextmanager
 
-from logsim.scanner import Scanner
+from logsim.scanner import Scanner, BufferedScanner, Symbol, TokenStream
 from logsim.names import Names
 
 
@@ -102,10 +103,10 @@ def raise_unicode_decode_error_or_no_error():
         pass
 
 
-@pytest.fixture
-def new_scanner():
-    """Return a new instance of the Scanner class."""
-    return Scanner(path=path_scanner, names=Names())
+@pytest.fixture(params=[Scanner, BufferedScanner])
+def new_scanner(request):
+    """Return a new instance of the Scanner or BufferedScanner class."""
+    return request.param(path=path_scanner, names=Names())
 
 
 def test_get_symbol(new_scanner: Scanner) -> None:
@@ -127,3 +128,88 @@ def test_scanner_raise_exception():
         Scanner(path=path_chinese, names=Names())
     with pytest.raises(UnicodeDecodeError):
         Scanner(path=path_not_text, names=Names())
+
+
+def get_all_symbols(scanner: Scanner) -> list:
+    """Return the type, ID, line and character of every symbol, including two at the end of the file."""
+    symbols = []
+    while not symbols or symbols[-1][0] != scanner.EOF:
+        symbol = scanner.get_symbol()
+        symbols.append((symbol.type, symbol.id, symbol.line, symbol.character_in_line))
+    symbol = scanner.get_symbol()
+    symbols.append((symbol.type, symbol.id, symbol.line, symbol.character_in_line))
+    return symbols
+
+
+tricky_texts = ["", "#", "# comment", "# comment\n", "/ open comment", "A/ comment / B",
+                "A\n\n  B12_x, 3\u00b24 ;:.>{}  \t\r\nC", "\u540d\u5b57 \u00e99 \u00bdx", "x\r\ny\rz",
+                "a#\n#\n/x\n/", " a\x0cb", "A\n", "12\u06634x 5\u00b2", "  x  # tail", "x /", "\u3000y z"]
+
+
+@pytest.mark.parametrize("text", tricky_texts)
+def test_buffered_scanner_matches_scanner_on_text(tmp_path, text: str) -> None:
+    """Test if BufferedScanner gives the same symbols and positions as Scanner on unusual text."""
+    text_path = str(tmp_path / "text.txt")
+    with open(text_path, "w", encoding="utf-8", newline="") as text_file:
+        text_file.write(text)
+    scanner = Scanner(path=text_path, names=Names())
+    buffered_scanner = BufferedScanner(path=text_path, names=Names())
+    assert get_all_symbols(buffered_scanner) == get_all_symbols(scanner)
+    assert buffered_scanner.file_lines == scanner.file_lines
+
+
+@pytest.mark.parametrize("text_path", sorted(glob.glob(path("..", "**", "*.txt"), recursive=True)))
+def test_buffered_scanner_matches_scanner(text_path: str) -> None:
+    """Test if BufferedScanner gives the same symbols and positions as Scanner on the test files."""
+    scanner = Scanner(path=text_path, names=Names())
+    buffered_scanner = BufferedScanner(path=text_path, names=Names())
+    assert get_all_symbols(buffered_scanner) == get_all_symbols(scanner)
+    assert buffered_scanner.file_lines == scanner.file_lines
+
+
+@pytest.mark.parametrize("text", tricky_texts)
+def test_get_tokens_matches_get_symbol(tmp_path, new_scanner: Scanner, text: str) -> None:
+    """Test if the token stream holds the symbols returned by get_symbol, ending with EOF."""
+    text_path = str(tmp_path / "text.txt")
+    with open(text_path, "w", encoding="utf-8", newline="") as text_file:
+        text_file.write(text)
+    scanner_class = type(new_scanner)
+    tokens = scanner_class(path=text_path, names=Names()).get_tokens()
+    symbols = get_all_symbols(scanner_class(path=text_path, names=Names()))[:-1]
+
+    assert len(tokens) == len(symbols)
+    symbol = Symbol()
+    for index, expected in enumerate(symbols):
+        tokens.load_symbol(index, symbol)
+        assert (symbol.type, symbol.id, symbol.line, symbol.character_in_line) == expected
+
+
+def test_token_stream() -> None:
+    """Test if a token stream stores symbols compactly and returns them unchanged."""
+    tokens = TokenStream()
+    tokens.append(Scanner.NAME, 7, 0, 2)
+    tokens.append(Scanner.NUMBER, "10", 1, 0)
+    tokens.append(Scanner.INVALID, "!", 1, 3)
+    tokens.append(Scanner.NUMBER, "10", 2, 5)
+    tokens.append(Scanner.SEMICOLON, None, 2, 7)
+
+    assert len(tokens) == 5
+    assert tokens.strings == ["10", "!"]
+    symbols = [tokens.get_symbol(index) for index in range(len(tokens))]
+    assert [(symbol.type, symbol.id, symbol.line, symbol.character_in_line) for symbol in symbols] == [
+        (Scanner.NAME, 7, 0, 2), (Scanner.NUMBER, "10", 1, 0), (Scanner.INVALID, "!", 1, 3),
+        (Scanner.NUMBER, "10", 2, 5), (Scanner.SEMICOLON, None, 2, 7)]
+    assert symbols[1] is not symbols[3]
+
+
+def test_buffered_scanner_raise_exception():
+    """Test if BufferedScanner raises the exceptions of Scanner, decoding errors once the file is read."""
+    with pytest.raises(TypeError):
+        BufferedScanner(path=1, names=Names())
+    with pytest.raises(TypeError):
+        BufferedScanner(path=path_scanner, names="name")
+    with pytest.raises(FileNotFoundError):
+        BufferedScanner(path=path_non_existent, names=Names())
+    scanner = BufferedScanner(path=path_not_text, names=Names())
+    with pytest.raises(UnicodeDecodeError):
+        scanner.get_tokens()
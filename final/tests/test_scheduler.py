@@ -0,0 +1,163 @@
+"""Test the scheduler module."""
+import random
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+
+
+@pytest.fixture
+def new_network() -> Network:
+    """Return a network of clocks with different half periods and RCs with different trigger cycles."""
+    names = Names()
+    devices = Devices(names, 0)
+    network = Network(names, devices)
+    generator = random.Random(1)
+    for number in range(30):
+        [device_id] = names.lookup(["CLK" + str(number)])
+        devices.make_device(device_id, devices.CLOCK, generator.randint(1, 12))
+    for number in range(5):
+        [device_id] = names.lookup(["RC" + str(number)])
+        devices.make_device(device_id, devices.RC, generator.randint(1, 40))
+    devices.cold_startup()
+    return network
+
+
+def counting_cycle(devices: Devices, counters: dict) -> dict:
+    """Update the counters by checking every clock and RC, and return the clock edges and RC triggers.
+
+    This is how the network updated them before the event schedulers.
+    """
+    outputs = {}
+    for device in devices.devices_list:
+        counter = counters[device.device_id]
+        if device.device_kind == devices.CLOCK:
+            if counter == device.clock_half_period:
+                counter = 0
+                outputs[device.device_id] = "edge"
+            counter += 1
+        elif device.device_kind == devices.RC:
+            if counter == device.trigger_cycle:
+                outputs[device.device_id] = "trigger"
+            counter += 1
+        counters[device.device_id] = counter
+    return outputs
+
+
+def get_counters(devices: Devices) -> dict:
+    """Return the counter of every clock and RC."""
+    return {device.device_id: device.clock_counter if device.device_kind == devices.CLOCK else device.rc_counter
+            for device in devices.devices_list}
+
+
+def test_events_match_checking_every_counter(new_network: Network) -> None:
+    """Test if the scheduled clock edges, RC triggers and counters match checking every counter each cycle."""
+    network = new_network
+    devices = network.devices
+    counters = get_counters(devices)
+    for _ in range(200):
+        expected_events = counting_cycle(devices, counters)
+        previous = {device.device_id: device.outputs[None] for device in devices.devices_list}
+        assert network.execute_network()
+        events = {device.device_id for device in devices.devices_list
+                  if device.outputs[None] != previous[device.device_id]}
+        assert events == set(expected_events)
+        assert get_counters(devices) == counters
+
+
+def test_skipped_cycles_match_executed_cycles(new_network: Network) -> None:
+    """Test if skipping up to the next event keeps the counters of executing every cycle."""
+    network = new_network
+    devices = network.devices
+    counters = get_counters(devices)
+    cycles = 0
+    while cycles < 300:
+        network.execute_network()
+        counting_cycle(devices, counters)
+        cycles += 1
+        idle_cycles = network.get_idle_cycles(300 - cycles)
+        network.skip_cycles(idle_cycles)
+        for _ in range(idle_cycles):
+            assert not counting_cycle(devices, counters)
+        cycles += idle_cycles
+        assert get_counters(devices) == counters
+
+
+def test_get_scheduled_events(new_network: Network) -> None:
+    """Test if the scheduled events are the edges and triggers of the next cycles, in order."""
+    network = new_network
+    devices = network.devices
+    network.execute_network()
+    events = network.get_scheduled_events(25)
+    assert events == sorted(events)
+
+    counters = get_counters(devices)
+    expected = []
+    for cycle in range(1, 26):
+        expected.extend((cycle, device_id) for device_id in sorted(counting_cycle(devices, counters)))
+    assert events == expected
+    assert network.get_scheduled_events(0) == []
+
+
+def test_set_counters_are_rescheduled(new_network: Network) -> None:
+    """Test if counters set directly, by a cold start-up or by a restored state take effect in the next cycle."""
+    network = new_network
+    devices = network.devices
+    for _ in range(7):
+        network.execute_network()
+    state = network.get_state()
+    counters = get_counters(devices)
+
+    # Clocks moved to their half period rise or fall in the next cycle,
+    # and clocks moved past it never do
+    [first_clock, second_clock] = [devices.get_device(device_id) for device_id in devices.find_devices(devices.CLOCK)[:2]]
+    first_clock.clock_counter = first_clock.clock_half_period
+    second_clock.clock_counter = second_clock.clock_half_period + 1
+    first_signal = first_clock.outputs[None]
+    second_signal = second_clock.outputs[None]
+    for _ in range(3 * second_clock.clock_half_period):
+        network.execute_network()
+        assert second_clock.outputs[None] == second_signal
+        if first_clock.clock_counter == 1:
+            assert first_clock.outputs[None] != first_signal
+            break
+    else:
+        assert False, "the clock did not change"
+
+    devices.cold_startup()
+    expected = get_counters(devices)
+    counting_cycle(devices, expected)
+    network.execute_network()
+    assert get_counters(devices) == expected
+
+    network.set_state(state)
+    assert get_counters(devices) == counters
+    counting_cycle(devices, counters)
+    network.execute_network()
+    assert get_counters(devices) == counters
+
+
+def test_counters_of_new_devices() -> None:
+    """Test if clocks added after cycles were run keep the counters of the existing ones."""
+    names = Names()
+    devices = Devices(names, 0)
+    network = Network(names, devices)
+    [first_clock_id, second_clock_id, rc_id] = names.lookup(["CLK1", "CLK2", "RC"])
+    devices.make_device(first_clock_id, devices.CLOCK, 3)
+    for _ in range(5):
+        network.execute_network()
+    first_counter = devices.get_device(first_clock_id).clock_counter
+
+    # An RC made after the last cold start-up has no counter and is never triggered
+    devices.make_device(rc_id, devices.RC, 1)
+    devices.add_device(second_clock_id, devices.CLOCK)
+    devices.get_device(second_clock_id).clock_half_period = 2
+    devices.get_device(second_clock_id).clock_counter = 2
+    devices.add_output(second_clock_id, None)
+    assert (1, second_clock_id) in network.get_scheduled_events(1)
+    network.execute_network()
+    assert devices.get_device(second_clock_id).clock_counter == 1
+    assert devices.get_device(rc_id).rc_counter is None
+    assert devices.get_device(first_clock_id).clock_counter == (1 if first_counter == 3 else first_counter + 1)
@@ -0,0 +1,145 @@
+"""Test the simulation module."""
+import os
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.monitors import Monitors
+from logsim.scanner import BufferedScanner
+from logsim.parse import Parser
+from logsim.simulation import Simulation
+from tests.helpers import random_network
+
+
+example_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ebnf", "examples")
+
+
+def new_simulation(seed: int, compiled: bool = False, mode: str = "interpreted",
+                   skip_idle: bool = True) -> Simulation:
+    """Return a simulation of a random network with every output monitored."""
+    network = random_network(seed, 40, compiled=compiled or mode == "compiled",
+                             event_driven=mode == "event_driven")
+    network.set_levelized_mode(mode == "levelized")
+    network.set_idle_skipping(skip_idle)
+    devices = network.devices
+    monitors = Monitors(devices.names, devices, network)
+    for device in devices.devices_list:
+        for port_id in device.outputs:
+            monitors.make_monitor(device.device_id, port_id, devices.get_signal_name(device.device_id, port_id))
+    return Simulation(devices, network, monitors, checkpoint_interval=10)
+
+
+def get_traces(simulation: Simulation) -> dict:
+    """Return the recorded traces as lists."""
+    return {port: list(trace) for port, trace in simulation.monitors.signals_dictionary.items()}
+
+
+def count_cycles(simulation: Simulation) -> list:
+    """Count the cycles the network of the simulation executes from now on."""
+    cycles = [0]
+    execute_network = simulation.network.execute_network
+
+    def counted_execute_network() -> bool:
+        cycles[0] += 1
+        return execute_network()
+
+    simulation.network.execute_network = counted_execute_network
+    return cycles
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+@pytest.mark.parametrize("seed", [0, 1, 2, 11, 12])  # networks that do not oscillate
+def test_switch_change_in_the_past_matches_full_run(seed: int, compiled: bool) -> None:
+    """Test if changing switches from earlier cycles gives the traces of a run with those changes."""
+    simulation = new_simulation(seed, compiled)
+    [first_switch, second_switch] = simulation.devices.find_devices(simulation.devices.SWITCH)[:2]
+    assert simulation.run(30)
+    assert simulation.continue_run(20)
+
+    cycles = count_cycles(simulation)
+    assert simulation.set_switch(first_switch, 1, 27)
+    assert 0 < cycles[0] <= 30  # simulated again from the checkpoint at cycle 20, skipping idle cycles
+    assert simulation.set_switch(second_switch, 1, 13)
+    assert simulation.set_switch(first_switch, 0, 35)
+    assert simulation.cycles_completed == 50
+    assert all(len(trace) == 50 for trace in simulation.monitors.signals_dictionary.values())
+
+    expected = new_simulation(seed, compiled)
+    expected.run(13)
+    expected.devices.set_switch(second_switch, 1)
+    expected.continue_run(14)
+    expected.devices.set_switch(first_switch, 1)
+    expected.continue_run(8)
+    expected.devices.set_switch(first_switch, 0)
+    expected.continue_run(15)
+    assert get_traces(simulation) == get_traces(expected)
+
+
+def test_later_changes_of_a_switch_are_dropped() -> None:
+    """Test if setting a switch from a cycle replaces its changes after that cycle."""
+    simulation = new_simulation(0)
+    switch_id = simulation.devices.find_devices(simulation.devices.SWITCH)[0]
+    simulation.run(50)
+    simulation.set_switch(switch_id, 1, 30)
+    simulation.set_switch(switch_id, 0, 5)
+    assert simulation.switch_changes == {5: {switch_id: 0}, 30: {}}
+    assert simulation.devices.get_device(switch_id).switch_state == 0
+
+    expected = new_simulation(0)
+    expected.run(5)
+    expected.devices.set_switch(switch_id, 0)
+    expected.continue_run(45)
+    assert get_traces(simulation) == get_traces(expected)
+
+
+def test_switch_change_now_applies_to_next_cycles() -> None:
+    """Test if a switch change at the last cycle only applies to the cycles simulated next."""
+    simulation = new_simulation(1)
+    switch_id = simulation.devices.find_devices(simulation.devices.SWITCH)[0]
+    simulation.run(10)
+    traces = get_traces(simulation)
+    cycles = count_cycles(simulation)
+    assert simulation.set_switch(switch_id, 1)
+    assert cycles[0] == 0
+    assert get_traces(simulation) == traces
+    assert simulation.switch_changes == {10: {switch_id: 1}}
+    assert not simulation.set_switch(simulation.devices.find_devices(simulation.devices.AND)[0], 1, 3)
+
+
+@pytest.mark.parametrize("mode", ["interpreted", "compiled", "event_driven", "levelized"])
+@pytest.mark.parametrize("seed", range(10))
+def test_idle_skipping_matches_executing_every_cycle(seed: int, mode: str) -> None:
+    """Test if skipping idle cycles records the same traces as executing every cycle."""
+    skipping = new_simulation(seed, mode=mode)
+    executing = new_simulation(seed, mode=mode, skip_idle=False)
+    switch_id = skipping.devices.find_devices(skipping.devices.SWITCH)[0]
+    for simulation in [skipping, executing]:
+        simulation.run(60)
+        simulation.set_switch(switch_id, 1, 25)
+        simulation.continue_run(40)
+    assert skipping.cycles_completed == executing.cycles_completed
+    assert get_traces(skipping) == get_traces(executing)
+    assert skipping.network.get_state() == executing.network.get_state()
+
+
+def test_idle_cycles_of_slow_clock_are_skipped() -> None:
+    """Test if a circuit with a slow clock only executes the cycles with clock edges or RC triggers."""
+    simulations = []
+    for skip_idle in [True, False]:
+        names = Names()
+        devices = Devices(names, 0)
+        network = Network(names, devices)
+        network.set_idle_skipping(skip_idle)
+        monitors = Monitors(names, devices, network)
+        scanner = BufferedScanner(os.path.join(example_directory, "example_1.txt"), names)
+        assert Parser(names, devices, network, monitors, scanner).parse_network()
+        simulations.append(Simulation(devices, network, monitors))
+    [skipping, executing] = simulations
+
+    cycles = count_cycles(skipping)
+    assert skipping.run(200) and executing.run(200)
+    assert get_traces(skipping) == get_traces(executing)
+    # One cycle per edge of CLK1, which has a half period of 10, and the RC trigger
+    assert cycles[0] <= 200 // 10 + 2
@@ -0,0 +1,194 @@
+"""Test the traces module."""
+import os
+import random
+
+import pytest
+
+from logsim.traces import MemoryBudget, RunLengthTrace, SignalTrace, SpillingTrace
+
+
+def test_signal_trace_is_list_like() -> None:
+    """Test if SignalTrace behaves like a list of signal levels."""
+    trace = SignalTrace([4, 4])
+    trace.append(0)
+    trace.extend([1, 2, 3])
+
+    assert trace == [4, 4, 0, 1, 2, 3]
+    assert [4, 4, 0, 1, 2, 3] == trace
+    assert trace != [4, 4, 0]
+    assert len(trace) == 6
+    assert list(trace) == [4, 4, 0, 1, 2, 3]
+    assert trace[2] == 0 and trace[-1] == 3
+    assert trace[2:4] == [0, 1]
+    assert trace == SignalTrace([4, 4, 0, 1, 2, 3])
+    assert repr(trace) == "[4, 4, 0, 1, 2, 3]"
+
+    trace.clear()
+    assert trace == [] and len(trace) == 0
+
+
+def test_signal_trace_uses_one_byte_per_sample() -> None:
+    """Test if samples are stored in one byte each."""
+    trace = SignalTrace([0, 1] * 1000)
+    assert trace.signals.itemsize == 1
+    assert trace.signals.buffer_info()[1] == 2000
+
+
+def test_run_length_trace_is_list_like() -> None:
+    """Test if RunLengthTrace behaves like a list of signal levels."""
+    trace = RunLengthTrace([4, 4])
+    trace.append(0)
+    trace.extend([1, 1, 1, 3])
+
+    assert trace == [4, 4, 0, 1, 1, 1, 3]
+    assert [4, 4, 0, 1, 1, 1, 3] == trace
+    assert trace != [4, 4, 0]
+    assert len(trace) == 7
+    assert list(trace) == [4, 4, 0, 1, 1, 1, 3]
+    assert trace[2] == 0 and trace[4] == 1 and trace[-1] == 3
+    assert trace[1:5] == [4, 0, 1, 1]
+    assert trace == SignalTrace([4, 4, 0, 1, 1, 1, 3])
+    assert SignalTrace([4, 4, 0, 1, 1, 1, 3]) == trace
+    assert repr(trace) == "[4, 4, 0, 1, 1, 1, 3]"
+    with pytest.raises(IndexError):
+        trace[7]
+
+    trace.clear()
+    assert trace == [] and len(trace) == 0
+
+
+def test_run_length_trace_stores_only_changes() -> None:
+    """Test if only the cycles at which the signal changes are stored."""
+    trace = RunLengthTrace([0] * 1000 + [1] * 1000 + [0])
+    assert trace.get_changes() == [(0, 0), (1000, 1), (2000, 0)]
+    assert len(trace) == 2001
+
+
+def test_spilling_trace_is_list_like(tmp_path) -> None:
+    """Test if SpillingTrace reads the same signal levels from memory and disk."""
+    budget = MemoryBudget(4, str(tmp_path), chunk_size=3)
+    signals = [0, 1, 2, 3, 4] * 7
+    trace = SpillingTrace(signals[:2], budget)
+    trace.extend(signals[2:])
+
+    assert trace.spilled > 0 and len(trace.signals) < len(signals)
+    assert trace == signals and signals == trace
+    assert len(trace) == len(signals)
+    assert list(trace) == signals
+    assert [trace[index] for index in range(-len(signals), len(signals))] == signals * 2
+    for start in range(len(signals)):
+        assert trace[start:start + 9] == signals[start:start + 9]
+    assert trace[::4] == signals[::4]
+    assert trace == SignalTrace(signals) and trace == RunLengthTrace(signals)
+    with pytest.raises(IndexError):
+        trace[len(signals)]
+
+    trace.clear()
+    assert trace == [] and budget.in_memory == 0
+
+
+def test_spilling_traces_share_the_memory_budget(tmp_path) -> None:
+    """Test if traces keep within the budget, and release it when deleted."""
+    budget = MemoryBudget(100, str(tmp_path), chunk_size=10)
+    traces = [SpillingTrace([], budget) for __ in range(5)]
+    for cycle in range(1000):
+        for trace in traces:
+            trace.append(cycle % 2)
+        assert budget.in_memory <= 100 + 5 * 10
+        assert budget.in_memory == sum(len(trace.signals) for trace in traces)
+
+    assert all(trace == [0, 1] * 500 for trace in traces)
+    del traces, trace
+    assert budget.in_memory == 0
+
+
+def test_spilling_traces_share_one_spill_file(tmp_path) -> None:
+    """Test if traces spilling in turn read their own samples from one file, deleted once all are cleared."""
+    budget = MemoryBudget(0, str(tmp_path), chunk_size=2)
+    traces = [SpillingTrace([], budget) for __ in range(3)]
+    for cycle in range(50):
+        for number, trace in enumerate(traces):
+            trace.append((cycle + number) % 5)
+    spill_file = budget.spill_file
+    assert spill_file is not None and budget.file_size == sum(trace.spilled for trace in traces)
+    for number, trace in enumerate(traces):
+        signals = [(cycle + number) % 5 for cycle in range(50)]
+        assert trace == signals and trace[3:41] == signals[3:41]
+
+    traces[0].clear()
+    assert budget.spill_file is spill_file and traces[1] == [(cycle + 1) % 5 for cycle in range(50)]
+    for trace in traces[1:]:
+        trace.clear()
+    assert budget.spill_file is None and spill_file.closed
+    traces[0].extend([1] * 5)
+    assert traces[0] == [1] * 5 and budget.file_size == traces[0].spilled
+
+
+@pytest.mark.parametrize("length", [0, 1, 6, 9, 17, 35, 40])
+def test_truncate(tmp_path, length: int) -> None:
+    """Test if every kind of trace keeps only its first signal levels when truncated."""
+    budget = MemoryBudget(4, str(tmp_path), chunk_size=3)
+    signals = [0, 0, 1, 1, 1, 2, 3] * 5
+    for trace in [SignalTrace(signals), RunLengthTrace(signals), SpillingTrace(signals, budget)]:
+        trace.truncate(length)
+        assert trace == signals[:length]
+        trace.extend([4, 0])
+        assert trace == signals[:length] + [4, 0]
+    assert budget.in_memory == len(trace.signals)
+
+
+def test_rewinding_reuses_the_spill_file(tmp_path) -> None:
+    """Test if traces truncated and appended to again and again keep the spill file within their spilled samples."""
+    budget = MemoryBudget(0, str(tmp_path), chunk_size=4)
+    generator = random.Random(0)
+    traces = [SpillingTrace([], budget) for __ in range(3)]
+    expected = [[] for __ in traces]
+    largest_spilled = 0
+    for __ in range(300):
+        number = generator.randrange(len(traces))
+        if generator.random() < 0.3:
+            length = generator.randint(0, len(expected[number]))
+            traces[number].truncate(length)
+            del expected[number][length:]
+        else:
+            signals = [generator.randint(0, 4) for __ in range(generator.randint(1, 30))]
+            traces[number].extend(signals)
+            expected[number].extend(signals)
+        spilled = sum(trace.spilled for trace in traces)
+        largest_spilled = max(largest_spilled, spilled)
+        assert budget.in_use == spilled
+        if budget.spill_file is not None:
+            assert os.fstat(budget.spill_file.fileno()).st_size == budget.file_size
+        assert budget.file_size <= largest_spilled
+    for trace, signals in zip(traces, expected):
+        assert trace == signals
+        assert trace[5:50] == signals[5:50]
+
+    # Rewinding a single trace over and over, as re-simulation does, does not grow the file
+    trace = traces[0]
+    trace.clear()
+    trace.extend([1, 2] * 100)
+    file_size = budget.file_size
+    for __ in range(100):
+        trace.truncate(150)
+        trace.extend([3] * 50)
+    assert budget.file_size == file_size
+    assert trace == [1, 2] * 75 + [3] * 50
+
+
+def test_append_repeated(tmp_path) -> None:
+    """Test if every kind of trace adds repeated signal levels like single appends."""
+    budget = MemoryBudget(4, str(tmp_path), chunk_size=3)
+    for trace in [SignalTrace(), RunLengthTrace(), SpillingTrace([], budget)]:
+        trace.append_repeated(1, 5)
+        trace.append_repeated(1, 0)
+        trace.append(0)
+        trace.append_repeated(0, 2)
+        trace.append_repeated(3, 1)
+        assert trace == [1] * 5 + [0] * 3 + [3]
+    assert trace.spilled > 0 and budget.in_memory == len(trace.signals)
+
+    # Run-length traces store one change whatever the count
+    trace = RunLengthTrace([0])
+    trace.append_repeated(1, 10 ** 9)
+    assert len(trace) == 10 ** 9 + 1 and trace.get_changes() == [(0, 0), (1, 1)]
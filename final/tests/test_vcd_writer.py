@@ -0,0 +1,122 @@
+"""Test the vcd_writer module."""
+import pytest
+
+from logsim.names import Names
+from logsim.network import Network
+from logsim.devices import Devices
+from logsim.monitors import Monitors
+from logsim.vcd_writer import VcdWriter
+
+
+@pytest.fixture
+def new_monitors() -> Monitors:
+    """Return a Monitors class instance monitoring a switch and a NOT-like NAND gate."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    new_monitors = Monitors(new_names, new_devices, new_network)
+
+    [SW1_ID, NAND1_ID, I1] = new_names.lookup(["Sw1", "Nand1", "I1"])
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 0)
+    new_devices.make_device(NAND1_ID, new_devices.NAND, 1)
+    new_network.make_connection(SW1_ID, None, NAND1_ID, I1)
+
+    new_monitors.make_monitor(SW1_ID, None, "A")
+    new_monitors.make_monitor(NAND1_ID, None, "B")
+    new_monitors.make_monitor(NAND1_ID, None, "C")  # alias of B
+    return new_monitors
+
+
+def run(monitors: Monitors, switch_states: list) -> None:
+    """Run one cycle for each switch state and record the monitors."""
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    for state in switch_states:
+        monitors.devices.set_switch(SW1_ID, state)
+        assert monitors.network.execute_network()
+        monitors.record_signals()
+
+
+def test_make_code() -> None:
+    """Test if variable codes are short, printable and unique."""
+    codes = [VcdWriter.make_code(index) for index in range(20000)]
+    assert codes[0] == "!" and codes[93] == "~" and codes[94] == "!!"
+    assert len(set(codes)) == len(codes)
+    assert all(33 <= ord(character) <= 126 for code in codes for character in code)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 256])
+def test_vcd_writer_writes_changes(tmp_path, new_monitors: Monitors, chunk_size: int) -> None:
+    """Test if only the changed signals of each cycle are written."""
+    path = tmp_path / "trace.vcd"
+    with VcdWriter(str(path), new_monitors, chunk_size=chunk_size, queue_size=1) as writer:
+        new_monitors.add_trace_writer(writer)
+        run(new_monitors, [0, 0, 1, 1, 0])
+
+    assert path.read_text() == ("$timescale 1 ns $end\n"
+                                "$scope module logsim $end\n"
+                                "$var wire 1 ! A $end\n"
+                                "$var wire 1 \" B $end\n"
+                                "$var wire 1 \" C $end\n"
+                                "$upscope $end\n"
+                                "$enddefinitions $end\n"
+                                "#0\n0!\n1\"\n"
+                                "#2\n1!\n0\"\n"
+                                "#4\n0!\n1\"\n"
+                                "#5\n")
+
+
+def test_monitor_memory_can_be_disposed(tmp_path, new_monitors: Monitors) -> None:
+    """Test if signals are only streamed when traces are not kept."""
+    names = new_monitors.names
+    [SW1_ID] = names.lookup(["Sw1"])
+    new_monitors.set_keep_traces(False)
+
+    path = tmp_path / "trace.vcd"
+    with VcdWriter(str(path), new_monitors) as writer:
+        new_monitors.add_trace_writer(writer)
+        run(new_monitors, [0, 1] * 50)
+        new_monitors.remove_trace_writer(writer)
+
+    assert new_monitors.signals_dictionary[(SW1_ID, None)] == []
+    assert path.read_text().count("1!") == 50
+    assert path.read_text().endswith("#99\n1!\n0\"\n#100\n")
+
+
+def test_trace_encoding_keeps_writers(tmp_path, new_monitors: Monitors) -> None:
+    """Test if changing the trace encoding keeps the writers and memory setting."""
+    with VcdWriter(str(tmp_path / "trace.vcd"), new_monitors) as writer:
+        new_monitors.add_trace_writer(writer)
+        new_monitors.set_keep_traces(False)
+        new_monitors.set_run_length_encoding()
+        assert new_monitors.trace_writers == [writer]
+        assert not new_monitors.keep_traces
+
+
+def test_repeated_cycles_advance_time(tmp_path, new_monitors: Monitors) -> None:
+    """Test if cycles recorded in bulk are written as one change and a later time."""
+    [SW1_ID] = new_monitors.names.lookup(["Sw1"])
+    path = tmp_path / "trace.vcd"
+    with VcdWriter(str(path), new_monitors, chunk_size=2) as writer:
+        new_monitors.add_trace_writer(writer)
+        run(new_monitors, [0])
+        new_monitors.record_repeated_signals(10)
+        new_monitors.devices.set_switch(SW1_ID, 1)
+        assert new_monitors.network.execute_network()
+        new_monitors.record_repeated_signals(5)
+
+    assert path.read_text().endswith("#0\n0!\n1\"\n#11\n1!\n0\"\n#16\n")
+    assert new_monitors.signals_dictionary[(SW1_ID, None)] == [0] * 11 + [1] * 5
+
+
+def test_reset_restarts_file(tmp_path, new_monitors: Monitors) -> None:
+    """Test if resetting the monitors for a new run restarts the file at time 0."""
+    path = tmp_path / "trace.vcd"
+    with VcdWriter(str(path), new_monitors, chunk_size=1) as writer:
+        new_monitors.add_trace_writer(writer)
+        run(new_monitors, [0, 1, 0, 1])
+        new_monitors.reset_monitors()
+        run(new_monitors, [1, 1])
+
+    text = path.read_text()
+    assert text.count("$enddefinitions") == 1
+    assert text.endswith("$enddefinitions $end\n#0\n1!\n0\"\n#2\n")
@@ -0,0 +1,52 @@
+"""Test the vectorized_network module."""
+import random
+
+import pytest
+
+from logsim.names import Names
+from logsim.devices import Devices
+from logsim.network import Network
+from logsim.vectorized_network import VectorizedNetwork
+from tests.helpers import random_network, network_state
+
+
+@pytest.mark.parametrize("seed, size", [(seed, 40) for seed in range(10)]
+                         + [(seed, 300) for seed in range(10)])
+def test_vectorized_matches_interpreted(seed: int, size: int) -> None:
+    """Test if vectorized execution gives the same signals as interpreted execution."""
+    interpreted = random_network(seed, size, compiled=False)
+    vectorized = random_network(seed, size, compiled=True, vectorized=True)
+    rng = random.Random(seed)
+    switches = interpreted.devices.find_devices(interpreted.devices.SWITCH)
+
+    for cycle in range(30):
+        if switches and cycle % 5 == 4:
+            switch_id = rng.choice(switches)
+            state = rng.choice([0, 1])
+            interpreted.devices.set_switch(switch_id, state)
+            vectorized.devices.set_switch(switch_id, state)
+        assert interpreted.execute_network() == vectorized.execute_network()
+        assert network_state(interpreted) == network_state(vectorized)
+    assert isinstance(vectorized.compiled_network, VectorizedNetwork)
+
+
+def test_split_into_waves() -> None:
+    """Test if a chain of gates of one kind is split into one wave per gate."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, AND1_ID, AND2_ID, AND3_ID, I1] = names.lookup(["Sw1", "And1", "And2",
+                                                            "And3", "I1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    for gate_id in [AND1_ID, AND2_ID, AND3_ID]:
+        devices.make_device(gate_id, devices.AND, 1)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(AND1_ID, None, AND2_ID, I1)
+    network.make_connection(AND2_ID, None, AND3_ID, I1)
+
+    compiled_network = VectorizedNetwork(devices)
+    assert len(compiled_network.gate_waves) == 3
+
+    assert compiled_network.execute(20)
+    assert [devices.get_device(gate_id).outputs[None]
+            for gate_id in [AND1_ID, AND2_ID, AND3_ID]] == [devices.HIGH] * 3